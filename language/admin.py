@@ -1,4 +1,4 @@
-from .models import ForeignLanguage, LearningLanguage, Synonym, TranslatableWord, Translation
+from .models import ForeignLanguage, LearningLanguage, Synonym, TranslatableWord, Translation, TranslationJob, TranslationMemory
 from django.contrib import admin
 
 
@@ -53,9 +53,32 @@ class TranslatableWordAdmin(admin.ModelAdmin):
 @admin.register(Translation)
 class TranslationAdmin(admin.ModelAdmin):
     # Main list
-    list_display = ('translatable_word', 'foreign_language', 'foreign_word', 'pronunciation',)
+    list_display = ('translatable_word', 'foreign_language', 'foreign_word', 'pronunciation', 'dam', 'jar',)
     list_display_links = ('translatable_word',)
     list_filter = ('foreign_language',)
 
     # Specific Translation instance
-    readonly_fields = ['last_modified',]
+    readonly_fields = ['last_modified', 'dam', 'jar',]
+
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    # Main list
+    list_display = ('english_word', 'dest_key', 'foreign_word', 'pronunciation', 'created',)
+    list_display_links = ('english_word',)
+    list_filter = ('dest_key',)
+    search_fields = ('english_word', 'foreign_word',)
+
+    # Specific TranslationMemory instance
+    readonly_fields = ['created',]
+
+
+@admin.register(TranslationJob)
+class TranslationJobAdmin(admin.ModelAdmin):
+    # Main list
+    list_display = ('id', 'foreign_language', 'book', 'status', 'progress', 'worker', 'created', 'finished',)
+    list_display_links = ('id',)
+    list_filter = ('status', 'foreign_language',)
+
+    # Specific TranslationJob instance
+    readonly_fields = ['worker', 'total_words', 'translated_words', 'error', 'created', 'started', 'heartbeat', 'finished',]
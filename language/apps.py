@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class LanguageConfig(AppConfig):
     name = 'language'
+
+    def ready(self):
+        # Connect signal receivers
+        from . import signals
@@ -0,0 +1,193 @@
+from . import memory
+from .models import ForeignLanguage, TranslatableWord, Translation, TranslationJob
+from .similarity import readable_word, similarity
+from .translators import TranslationFailure
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from read.models import Book
+from read.rendering import bump_versions
+from read.stats import refresh_language_stats
+from tracking.management.commands._slutil import tprint
+from tracking.management.commands._vocabulary import bump_vocabulary_version
+from wordtest.answers import bump_answer_index_version
+import time
+
+
+# Times a job may be claimed before it is marked as failed rather than queued again
+MAX_ATTEMPTS = 3
+
+
+# Returns a list of TranslationJobs
+#   created for every pair of Book and ForeignLanguage given.
+#   books may be None for one job per ForeignLanguage covering every TranslatableWord.
+#   Pairs which already have a pending or running job are not queued again.
+def queue_jobs(books, foreign_languages):
+    jobs = []
+    for book in books if books is not None else [None]:
+        for foreign_language in foreign_languages:
+            job, created = (TranslationJob.objects
+                .filter(status__in = ['PENDING', 'RUNNING'])
+                .get_or_create(book = book, foreign_language = foreign_language))
+            if created:
+                jobs.append(job)
+    return jobs
+
+
+# Put running jobs whose worker has not reported progress for stale_after seconds back in the queue.
+# Jobs which have already been claimed MAX_ATTEMPTS times are marked as failed instead.
+# Returns the amount of jobs requeued.
+def requeue_stale_jobs(stale_after):
+    stale = (TranslationJob.objects
+        .filter(status = 'RUNNING')
+        .filter(heartbeat__lt = timezone.now() - timedelta(seconds=stale_after)))
+    (stale
+        .filter(attempts__gte = MAX_ATTEMPTS)
+        .update(status = 'FAILED', error = f'worker stopped responding {MAX_ATTEMPTS} times', finished = timezone.now()))
+    return stale.filter(attempts__lt = MAX_ATTEMPTS).update(status = 'PENDING', worker = '')
+
+
+# Returns a TranslationJob
+#   which is the oldest pending job, now marked as running by this worker.
+#   A job is claimed with a conditional UPDATE, so two workers can never claim the same one.
+#   Returns None if no job is pending.
+def claim_job(worker):
+    while True:
+        job = TranslationJob.objects.filter(status = 'PENDING').order_by('created', 'id').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = (TranslationJob.objects
+            .filter(id = job.id, status = 'PENDING')
+            .update(status = 'RUNNING', worker = worker, started = now, heartbeat = now, attempts = F('attempts') + 1))
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+# Returns a QuerySet of TranslatableWords
+#   a TranslationJob covers.
+def job_words(job):
+    if job.book_id is None:
+        return TranslatableWord.objects.all()
+    return TranslatableWord.objects.filter(books__id = job.book_id)
+
+
+# Create Translations for TranslatableWords, from (foreign_word, pronunciation) tuples.
+# Words which gained a Translation since they were chosen are left as they are.
+# Returns a list of the IDs of TranslatableWords given a new Translation.
+def upsert_translations(foreign_language, translatable_words, translated):
+    rows = {}
+    for translatable_word, (foreign_word, pronunciation) in zip(translatable_words, translated):
+        # Don't accept empty foreign words
+        if foreign_word is None or foreign_word.strip() == '':
+            continue
+        foreign_word = foreign_word.lower()
+
+        # Pronunciations are only stored for ForeignLanguages not using Latin script
+        if foreign_language.uses_latin_script or pronunciation is None:
+            pronunciation = ''
+        else:
+            pronunciation = pronunciation.lower()
+
+        # Bulk creation does not call Translation.save, so calculate similarity here
+        dam, jar = similarity(
+            translatable_word.english_word,
+            readable_word(foreign_word, pronunciation, foreign_language.uses_latin_script))
+        rows[translatable_word.id] = Translation(
+            translatable_word = translatable_word,
+            foreign_language = foreign_language,
+            foreign_word = foreign_word,
+            pronunciation = pronunciation,
+            dam = dam,
+            jar = jar)
+
+    with transaction.atomic():
+        # Lock the ForeignLanguage, so jobs sharing words cannot create the same Translation twice
+        ForeignLanguage.objects.select_for_update().get(pk = foreign_language.pk)
+        existing = set(Translation.objects
+            .filter(foreign_language = foreign_language)
+            .filter(translatable_word__id__in = list(rows.keys()))
+            .values_list('translatable_word__id', flat=True))
+        created = [row for id, row in rows.items() if id not in existing]
+        Translation.objects.bulk_create(created)
+
+    return [row.translatable_word_id for row in created]
+
+
+# Bulk creation bypasses the signals of Translation, so invalidate what depends on Translations.
+def translations_created(foreign_language, translatable_word_ids):
+    if not translatable_word_ids:
+        return
+    book_ids = list(Book.objects
+        .filter(translatable_words__id__in = translatable_word_ids)
+        .values_list('id', flat=True)
+        .distinct())
+    bump_versions(book_ids)
+    refresh_language_stats(book_ids, [foreign_language.id])
+    bump_vocabulary_version()
+    bump_answer_index_version()
+
+
+# Translate every word of a TranslationJob without a Translation, in chunks, and mark it done.
+# Words which already have a Translation are skipped, so an interrupted job resumes where it stopped.
+# Any error marks the job as failed, with the error saved, so the worker can carry on with other jobs.
+def run_job(job, chunk_size=100, verbose=False):
+    foreign_language = job.foreign_language
+    words = job_words(job)
+    missing = (words
+        .exclude(translations__foreign_language = foreign_language)
+        .order_by('id'))
+    try:
+        job.total_words = words.count()
+        job.translated_words = job.total_words - missing.count()
+        job.save(update_fields=['total_words', 'translated_words'])
+
+        # Walk through missing TranslatableWords by ID, so each chunk is a fresh query
+        last_id = 0
+        while True:
+            chunk = list(missing.filter(id__gt = last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            translated = memory.translate([word.english_word for word in chunk], foreign_language)
+            created_ids = upsert_translations(foreign_language, chunk, translated)
+            translations_created(foreign_language, created_ids)
+
+            # Report progress, which also shows the worker is still alive
+            job.translated_words = job.total_words - missing.count()
+            job.heartbeat = timezone.now()
+            job.save(update_fields=['translated_words', 'heartbeat'])
+            if verbose: tprint(f'{job}: {job.translated_words}/{job.total_words} words ({job.progress})')
+
+    except Exception as e:
+        job.status = 'FAILED'
+        job.error = f'{type(e).__name__}: {e}' if not isinstance(e, TranslationFailure) else str(e)
+        if verbose: tprint(f'{job} failed: {job.error}')
+    else:
+        job.status = 'DONE'
+        job.error = ''
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished'])
+    return job
+
+
+# Run TranslationJobs until the queue is empty, or forever, polling every poll_interval seconds.
+# Returns the amount of jobs run.
+def run_worker(worker, burst=False, poll_interval=5.0, stale_after=600, chunk_size=100, verbose=False):
+    count = 0
+    while True:
+        requeue_stale_jobs(stale_after)
+        job = claim_job(worker)
+        if job is None:
+            if burst:
+                return count
+            time.sleep(poll_interval)
+            continue
+
+        if verbose: tprint(f'{worker} started {job}')
+        run_job(job, chunk_size=chunk_size, verbose=verbose)
+        if verbose: tprint(f'{worker} finished {job}')
+        count += 1
@@ -0,0 +1,56 @@
+"""
+Benchmark translating English words into many languages through a ThrottledTranslator,
+one request at a time against concurrent requests, using the offline StubTranslator.
+"""
+
+from django.core.management.base import BaseCommand
+from language.translators import StubTranslator, ThrottledTranslator
+from tracking.management.commands._slutil import tprint
+import time
+
+
+class Command(BaseCommand):
+    help = ('Benchmark translating English words into many languages through a ThrottledTranslator, '
+            'one request at a time against concurrent requests, using the offline StubTranslator.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', type=int, default=500, help='Number of English words')
+        parser.add_argument('--languages', type=int, default=10, help='Number of languages')
+        parser.add_argument('--chunk-size', type=int, default=50, help='Maximum number of words per request')
+        parser.add_argument('--latency', type=float, default=0.2, help='Seconds the stub takes per request')
+        parser.add_argument('--stub-limit', type=float, default=20, help='Requests per second the stub accepts')
+        parser.add_argument('--rate', type=float, default=15, help='Requests per second the ThrottledTranslator sends')
+        parser.add_argument('--burst', type=int, default=5, help='Largest burst the ThrottledTranslator sends')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            nargs='+',
+            default=[1, 4, 16],
+            help='Numbers of concurrent requests')
+
+
+    def handle(self, *args, **kwargs):
+        english_words = [f'word{i}' for i in range(kwargs['words'])]
+        dests = [f'l{i}' for i in range(kwargs['languages'])]
+
+        tprint(f'{"workers":>7} {"seconds":>8} {"requests":>9} {"rejected":>9}')
+        for max_workers in kwargs['workers']:
+            stub = StubTranslator(latency=kwargs['latency'], max_requests_per_second=kwargs['stub_limit'])
+            throttled = ThrottledTranslator(
+                stub,
+                chunk_size = kwargs['chunk_size'],
+                rate = kwargs['rate'],
+                burst = kwargs['burst'],
+                backoff = 0.1,
+                max_workers = max_workers)
+
+            start = time.perf_counter()
+            for dest in dests:
+                translations = throttled.translate(english_words, dest)
+                assert len(translations) == len(english_words)
+            seconds = time.perf_counter() - start
+
+            tprint(f'{max_workers:>7} {seconds:>8.2f} {len(stub.requests):>9} {stub.rejected:>9}')
+
+        tprint('done.')
@@ -0,0 +1,59 @@
+"""
+Queue TranslationJobs to translate the TranslatableWords of Books, or of the whole catalogue,
+into every ForeignLanguage. Jobs are run in the background by translation_worker.
+With --status, shows the progress of queued jobs instead.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from language.jobs import queue_jobs
+from language.models import ForeignLanguage, TranslationJob
+from read.models import Book
+from tracking.management.commands._slutil import tprint
+
+
+class Command(BaseCommand):
+    help = ('Queue TranslationJobs to translate the TranslatableWords of Books, or of the whole catalogue, '
+            'into every ForeignLanguage. Jobs are run in the background by translation_worker.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, nargs='+', help='IDs of Books to translate, instead of the whole catalogue')
+        parser.add_argument('--languages', nargs='+', help='Keys of ForeignLanguages to translate into, instead of all')
+        parser.add_argument('--retry-failed', action='store_true', help='Queue failed jobs again')
+        parser.add_argument('--status', action='store_true', help='Show the progress of TranslationJobs')
+
+
+    def handle(self, *args, **kwargs):
+        if kwargs['status']:
+            self.show_status()
+            return
+
+        if kwargs['retry_failed']:
+            count = TranslationJob.objects.filter(status = 'FAILED').update(status = 'PENDING', error = '', attempts = 0)
+            tprint(f'queued {count} failed TranslationJobs again')
+            tprint('done.')
+            return
+
+        books = None
+        if kwargs['books']:
+            books = list(Book.objects.filter(id__in = kwargs['books']))
+            if len(books) != len(set(kwargs['books'])):
+                raise CommandError('could not find every Book')
+
+        foreign_languages = ForeignLanguage.objects.all()
+        if kwargs['languages']:
+            foreign_languages = foreign_languages.filter(key__in = kwargs['languages'])
+            if foreign_languages.count() != len(set(kwargs['languages'])):
+                raise CommandError('could not find every ForeignLanguage')
+
+        jobs = queue_jobs(books, list(foreign_languages))
+        tprint(f'queued {len(jobs)} TranslationJobs')
+        tprint('done.')
+
+
+    def show_status(self):
+        jobs = TranslationJob.objects.select_related('book', 'foreign_language').exclude(status = 'DONE')
+        for job in jobs:
+            self.stdout.write(f'{job.id:>6} {job} {job.translated_words}/{job.total_words} ({job.progress}) {job.error}')
+        counts = {status: TranslationJob.objects.filter(status = status).count() for status, name in TranslationJob.STATUS_CHOICES}
+        tprint(', '.join(f'{count} {status.lower()}' for status, count in counts.items()))
@@ -0,0 +1,57 @@
+"""
+Run queued TranslationJobs in the background, translating words in chunks and saving Translations in bulk.
+Several workers may run at once, on one or more machines, sharing the queue in the database.
+Interrupted jobs are queued again once stale, and resume with the words still missing a Translation.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from language.jobs import run_worker
+from multiprocessing import Process
+import os, socket
+
+
+class Command(BaseCommand):
+    help = ('Run queued TranslationJobs in the background, translating words in chunks and saving Translations in bulk. '
+            'Several workers may run at once, on one or more machines, sharing the queue in the database.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--burst', action='store_true', help='Stop once the queue is empty')
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait before checking an empty queue again')
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Seconds without progress before a running job is queued again')
+        parser.add_argument('--chunk-size', type=int, default=100, help='Number of words per chunk')
+
+
+    def handle(self, *args, **kwargs):
+        options = {
+            'burst': kwargs['burst'],
+            'poll_interval': kwargs['poll_interval'],
+            'stale_after': kwargs['stale_after'],
+            'chunk_size': kwargs['chunk_size'],
+            'verbose': True,
+        }
+        if kwargs['processes'] == 1:
+            work(**options)
+            return
+
+        # Each process opens its own database connections
+        connections.close_all()
+        processes = [Process(target=work, kwargs=options) for i in range(kwargs['processes'])]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+
+def work(**options):
+    run_worker(f'{socket.gethostname()}:{os.getpid()}', **options)
@@ -0,0 +1,40 @@
+"""
+Calculate and save the dam and jar similarity measures of every Translation in bulk.
+Translations calculate their own when saved, so this is only needed after bulk writes or to backfill.
+"""
+
+from django.core.management.base import BaseCommand
+from language.models import Translation
+from language.similarity import update_similarity
+from tracking.management.commands._slutil import tprint
+import os
+
+
+class Command(BaseCommand):
+    help = ('Calculate and save the dam and jar similarity measures of every Translation in bulk. '
+            'Translations calculate their own when saved, so this is only needed after bulk writes or to backfill.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help='Only Translations without similarity measures')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of Translations per UPDATE')
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of processes calculating similarity measures')
+
+
+    def handle(self, *args, **kwargs):
+        translations = Translation.objects.all()
+        if kwargs['missing']:
+            translations = translations.filter(dam = None)
+
+        tprint(f'calculating similarity measures with {kwargs["processes"]} processes')
+        count = update_similarity(translations, batch_size=kwargs['batch_size'], processes=kwargs['processes'])
+        tprint(f'updated {count} Translations')
+        tprint('done.')
@@ -0,0 +1,112 @@
+from .models import Translation, TranslationMemory
+from .translators import TranslationFailure, get_translator
+from collections import OrderedDict
+from django.conf import settings
+import threading
+
+
+class LRUCache:
+    """
+    Keeps the most recently used items, up to a maximum size, in the memory of one process.
+
+    Initialisation Parameters
+    -------------------------
+    max_size : int
+        Maximum number of items kept. The least recently used item is dropped to make room.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    # Returns the item for key, or None if it is not kept.
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, item):
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# Machine translations by (english_word, dest_key), in front of the TranslationMemory table
+_recent = LRUCache(settings.TRANSLATION_MEMORY_SIZE)
+
+
+# Returns a list of (foreign_word, pronunciation) tuples
+#   for a list of English words, in the same order, translated into a ForeignLanguage.
+#   Words with a Translation in the ForeignLanguage use it. Other words are looked up in the
+#   in-process LRU cache, then the TranslationMemory table, and only the remaining words are
+#   sent to the Translator, in one request. Its results are saved to both.
+#   Raises TranslationFailure if the Translator fails.
+def translate(english_words, foreign_language):
+    dest = foreign_language.key
+    results = {}
+
+    # Translations already saved by staff
+    translations = (Translation.objects
+        .filter(foreign_language = foreign_language)
+        .filter(translatable_word__english_word__in = english_words)
+        .values_list('translatable_word__english_word', 'foreign_word', 'pronunciation'))
+    for english_word, foreign_word, pronunciation in translations:
+        results[english_word] = (foreign_word, pronunciation or None)
+
+    # Machine translations kept in this process
+    misses = []
+    for english_word in dict.fromkeys(english_words):
+        if english_word in results:
+            continue
+        result = _recent.get((english_word, dest))
+        if result is None:
+            misses.append(english_word)
+        else:
+            results[english_word] = result
+
+    # Machine translations kept in the database
+    if misses:
+        memories = (TranslationMemory.objects
+            .filter(dest_key = dest)
+            .filter(english_word__in = misses)
+            .values_list('english_word', 'foreign_word', 'pronunciation'))
+        for english_word, foreign_word, pronunciation in memories:
+            results[english_word] = (foreign_word, pronunciation)
+            _recent.put((english_word, dest), (foreign_word, pronunciation))
+        misses = [english_word for english_word in misses if english_word not in results]
+
+    # Machine translations from upstream
+    if misses:
+        translated = get_translator().translate(misses, dest)
+        if len(translated) != len(misses):
+            raise TranslationFailure(f'{len(translated)} translations received for {len(misses)} words')
+        TranslationMemory.objects.bulk_create([
+            TranslationMemory(
+                english_word = english_word,
+                dest_key = dest,
+                foreign_word = foreign_word,
+                pronunciation = pronunciation)
+            for english_word, (foreign_word, pronunciation) in zip(misses, translated)
+        ], ignore_conflicts=True)
+        for english_word, result in zip(misses, translated):
+            results[english_word] = result
+            _recent.put((english_word, dest), result)
+
+    return [results[english_word] for english_word in english_words]
+
+
+# Forget every machine translation kept in this process.
+def clear():
+    _recent.clear()
@@ -0,0 +1,51 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:59
+
+from django.db import migrations, models
+import jellyfish
+
+
+# Backfill dam and jar for every existing Translation
+# A copy of language.similarity as it was, so later changes to it cannot break this migration
+def backfill_similarity(apps, schema_editor):
+    Translation = apps.get_model('language', 'Translation')
+    rows = (Translation.objects
+        .order_by('id')
+        .values_list(
+            'id',
+            'translatable_word__english_word',
+            'foreign_word',
+            'pronunciation',
+            'foreign_language__uses_latin_script'))
+
+    batch = []
+    for id, english_word, foreign_word, pronunciation, uses_latin_script in rows.iterator():
+        readable_word = pronunciation if not uses_latin_script and pronunciation else foreign_word
+        batch.append(Translation(
+            id = id,
+            dam = jellyfish.damerau_levenshtein_distance(english_word, readable_word),
+            jar = jellyfish.jaro_winkler_similarity(english_word, readable_word)))
+        if len(batch) >= 1000:
+            Translation.objects.bulk_update(batch, ['dam', 'jar'])
+            batch = []
+    Translation.objects.bulk_update(batch, ['dam', 'jar'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('language', '0041_auto_20210502_0807'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translation',
+            name='dam',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='translation',
+            name='jar',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_similarity, migrations.RunPython.noop),
+    ]
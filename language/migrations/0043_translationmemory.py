@@ -0,0 +1,29 @@
+# Generated by Django 3.1.14 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('language', '0042_translation_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('english_word', models.CharField(max_length=50)),
+                ('dest_key', models.CharField(max_length=5)),
+                ('foreign_word', models.CharField(max_length=50)),
+                ('pronunciation', models.CharField(max_length=50, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'translation memory',
+                'ordering': ['dest_key', 'english_word'],
+                'unique_together': {('english_word', 'dest_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.1.14 on 2026-10-18 13:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('read', '0016_booklanguagestats_bookstats'),
+        ('language', '0043_translationmemory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=7)),
+                ('worker', models.CharField(blank=True, max_length=50)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('total_words', models.PositiveIntegerField(default=0)),
+                ('translated_words', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(null=True)),
+                ('heartbeat', models.DateTimeField(null=True)),
+                ('finished', models.DateTimeField(null=True)),
+                ('book', models.ForeignKey(blank=True, help_text='The Book whose TranslatableWords are translated. Empty means every TranslatableWord.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='translation_jobs', to='read.book')),
+                ('foreign_language', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translation_jobs', to='language.foreignlanguage')),
+            ],
+            options={
+                'ordering': ['created', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='translationjob',
+            index=models.Index(fields=['status', 'created'], name='translationjob_status_idx'),
+        ),
+    ]
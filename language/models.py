@@ -1,7 +1,7 @@
 from django.db import models
 from read.models import Book
+from .similarity import readable_word, similarity
 from users.models import CustomUser
-import jellyfish
 
 
 class ForeignLanguage(models.Model):
@@ -94,33 +94,33 @@ class Translation(models.Model):
     pronunciation = models.CharField(max_length=50, blank=True)
     last_modified = models.DateTimeField(auto_now_add=True)
 
-    # Returns a string
-    #   representing the readable form of foreign_word.
-    @property
-    def readable_word(self):
-        if (not self.foreign_language.uses_latin_script
-            and self.pronunciation):
-                # Display pronunciation instead of native representation
-                # Ensures word is readable
-                return self.pronunciation
-        return self.foreign_word
-    
     # Similarity measure: Damerau-Levenshtein Distance
-    # Returns an int
-    #   representing the number of insertions, deletions, substitutions and transpositions required
+    #   the number of insertions, deletions, substitutions and transpositions required
     #   to get from the English to the Foreign word.
-    @property
-    def dam(self):
-        return jellyfish.damerau_levenshtein_distance(self.translatable_word.english_word, self.readable_word)
-    
+    # Calculated on save, see language.similarity.
+    dam = models.PositiveSmallIntegerField(null=True, editable=False)
     # Similarity measure: Jaro-Winkler Similarity
-    # Returns a float
     #   between 0 and 1 representing the similarity of the English and the Foreign word.
     #   0 means no similarity,
     #   1 means complete similarity.
+    # Calculated on save, see language.similarity.
+    jar = models.FloatField(null=True, editable=False)
+
+    # Returns a string
+    #   representing the readable form of foreign_word.
     @property
-    def jar(self):
-        return jellyfish.jaro_winkler_similarity(self.translatable_word.english_word, self.readable_word)
+    def readable_word(self):
+        return readable_word(self.foreign_word, self.pronunciation, self.foreign_language.uses_latin_script)
+
+    # Calculate dam and jar from the current English and readable words.
+    def update_similarity(self):
+        self.dam, self.jar = similarity(self.translatable_word.english_word, self.readable_word)
+
+    def save(self, *args, **kwargs):
+        self.update_similarity()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'dam', 'jar'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         if self.foreign_language.uses_latin_script:
@@ -129,3 +129,64 @@ class Translation(models.Model):
 
     class Meta:
         ordering = ['foreign_language', 'translatable_word']
+
+
+class TranslationMemory(models.Model):
+    english_word = models.CharField(max_length=50)
+    dest_key = models.CharField(max_length=5)
+    foreign_word = models.CharField(max_length=50)
+    pronunciation = models.CharField(max_length=50, null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'({self.dest_key}) {self.english_word} -> {self.foreign_word}'
+
+    class Meta:
+        ordering = ['dest_key', 'english_word']
+        unique_together = ['english_word', 'dest_key']
+        verbose_name_plural = 'translation memory'
+
+
+class TranslationJob(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    foreign_language = models.ForeignKey(to=ForeignLanguage, on_delete=models.CASCADE, related_name='translation_jobs')
+    book = models.ForeignKey(
+        to=Book,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='translation_jobs',
+        help_text='The Book whose TranslatableWords are translated. Empty means every TranslatableWord.')
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='PENDING')
+    worker = models.CharField(max_length=50, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    total_words = models.PositiveIntegerField(default=0)
+    translated_words = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True)
+    heartbeat = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    # Returns a string
+    #   representing progress as a percentage of words with a Translation.
+    @property
+    def progress(self):
+        if self.total_words == 0:
+            return '0%' if self.status != 'DONE' else '100%'
+        return f'{100 * self.translated_words // self.total_words}%'
+
+    def __str__(self):
+        book = self.book.title if self.book else 'All words'
+        return f'({self.foreign_language.key}) {book} : {self.status}'
+
+    class Meta:
+        ordering = ['created', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created'], name='translationjob_status_idx'),
+        ]
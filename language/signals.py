@@ -0,0 +1,35 @@
+from .models import ForeignLanguage, TranslatableWord
+from .similarity import update_similarity
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+
+# Translations save their own dam and jar, which also depend on the English word
+# and whether the ForeignLanguage uses Latin script.
+
+
+# Field of each sender which dam and jar depend on
+SIMILARITY_INPUTS = {
+    TranslatableWord: 'english_word',
+    ForeignLanguage: 'uses_latin_script',
+}
+
+
+@receiver(pre_save, sender=TranslatableWord)
+@receiver(pre_save, sender=ForeignLanguage)
+def similarity_inputs_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Remember whether the field changed while the stored value can still be read
+    # Other changes, e.g. to duolingo_learners, leave every Translation's dam and jar as they are
+    field = SIMILARITY_INPUTS[sender]
+    instance._similarity_changed = False
+    if raw or instance.pk is None or (update_fields is not None and field not in update_fields):
+        return
+    stored = sender.objects.filter(pk = instance.pk).values_list(field, flat=True).first()
+    instance._similarity_changed = stored is not None and stored != getattr(instance, field)
+
+
+@receiver(post_save, sender=TranslatableWord)
+@receiver(post_save, sender=ForeignLanguage)
+def similarity_inputs_changed(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw and getattr(instance, '_similarity_changed', False):
+        update_similarity(instance.translations.all())
@@ -0,0 +1,81 @@
+from multiprocessing import Pool
+import jellyfish
+
+
+# Fields read from each Translation to calculate its similarity measures
+SIMILARITY_FIELDS = (
+    'id',
+    'translatable_word__english_word',
+    'foreign_word',
+    'pronunciation',
+    'foreign_language__uses_latin_script',
+)
+
+
+# Returns a string
+#   representing the readable form of a foreign word.
+def readable_word(foreign_word, pronunciation, uses_latin_script):
+    if not uses_latin_script and pronunciation:
+        # Display pronunciation instead of native representation
+        # Ensures word is readable
+        return pronunciation
+    return foreign_word
+
+
+# Returns a tuple (dam, jar)
+#   of similarity measures between an English word and the readable form of its Translation.
+#   dam: Damerau-Levenshtein Distance, the number of insertions, deletions, substitutions and
+#        transpositions required to get from the English to the Foreign word.
+#   jar: Jaro-Winkler Similarity, between 0 (no similarity) and 1 (complete similarity).
+def similarity(english_word, readable):
+    return (
+        jellyfish.damerau_levenshtein_distance(english_word, readable),
+        jellyfish.jaro_winkler_similarity(english_word, readable))
+
+
+# Returns a list of (id, dam, jar) tuples
+#   for rows of SIMILARITY_FIELDS values.
+def similarity_rows(rows):
+    return [
+        (id, *similarity(english_word, readable_word(foreign_word, pronunciation, uses_latin_script)))
+        for id, english_word, foreign_word, pronunciation, uses_latin_script in rows
+    ]
+
+
+# Yields lists
+#   of SIMILARITY_FIELDS values for the Translations in a QuerySet, walking through them by ID.
+def similarity_batches(translations, batch_size):
+    rows = translations.order_by('id').values_list(*SIMILARITY_FIELDS)
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt = last_id)[:batch_size])
+        if not batch:
+            break
+        yield batch
+        last_id = batch[-1][0]
+
+
+# Calculate and save dam and jar for every Translation in a QuerySet, in batches.
+# Batches are calculated in parallel when processes > 1, and saved with one UPDATE query per batch.
+# Returns the amount of Translations updated.
+def update_similarity(translations, batch_size=1000, processes=1):
+    model = translations.model
+    batches = similarity_batches(translations, batch_size)
+
+    pool = Pool(processes) if processes > 1 else None
+    if pool:
+        # Pool reads batches in another thread, which would need its own database connection
+        batches = list(batches)
+    try:
+        results = pool.imap(similarity_rows, batches) if pool else map(similarity_rows, batches)
+        count = 0
+        for result in results:
+            model.objects.bulk_update(
+                [model(id=id, dam=dam, jar=jar) for id, dam, jar in result],
+                ['dam', 'jar'])
+            count += len(result)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return count
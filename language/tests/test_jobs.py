@@ -0,0 +1,166 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from language import jobs, memory
+from language.models import ForeignLanguage, TranslatableWord, Translation, TranslationJob
+from language.translators import FakeTranslator, TranslationFailure, get_translator
+from read.models import Author, Book
+from read.stats import book_language_stats
+from unittest import mock
+import io, tempfile
+
+
+@override_settings(LANGY_TRANSLATOR='language.translators.FakeTranslator')
+class TranslationJobTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = True,
+            duolingo_learners = 1260000)
+        ForeignLanguage.objects.create(
+            key = 'zh-cn',
+            english_name = 'Chinese',
+            foreign_name = '中文',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = False,
+            duolingo_learners = 1)
+        author = Author.objects.create(forename='First', surname='Last')
+        book = Book.objects.create(
+            title = 'Book Title',
+            author = author,
+            cover = tempfile.NamedTemporaryFile(suffix='.jpg').name,
+            pdf = tempfile.NamedTemporaryFile(suffix='.pdf').name)
+        for english_word in ['dog', 'cat', 'rabbit', 'house']:
+            TranslatableWord.objects.create(english_word=english_word).books.add(book)
+        TranslatableWord.objects.create(english_word='unused')
+        Translation.objects.create(
+            translatable_word = TranslatableWord.objects.get(english_word='rabbit'),
+            foreign_language = ForeignLanguage.objects.get(key='sv'),
+            foreign_word = 'kanin')
+
+    def setUp(self):
+        memory.clear()
+        self.addCleanup(memory.clear)
+        self.requests = get_translator().translator.requests
+        self.requests.clear()
+        self.book = Book.objects.get(title='Book Title')
+        self.swedish = ForeignLanguage.objects.get(key='sv')
+        self.chinese = ForeignLanguage.objects.get(key='zh-cn')
+
+    def translations(self, foreign_language):
+        return dict(Translation.objects
+            .filter(foreign_language = foreign_language)
+            .values_list('translatable_word__english_word', 'foreign_word'))
+
+    def test_queue_jobs(self):
+        queued = jobs.queue_jobs([self.book], [self.swedish, self.chinese])
+        self.assertEqual(len(queued), 2)
+
+        # Unfinished jobs are not queued twice
+        self.assertEqual(jobs.queue_jobs([self.book], [self.swedish]), [])
+        self.assertEqual(len(jobs.queue_jobs(None, [self.swedish])), 1)
+
+    def test_claim_job(self):
+        first, second = jobs.queue_jobs([self.book], [self.swedish, self.chinese])
+        self.assertEqual(jobs.claim_job('worker1'), first)
+        job = jobs.claim_job('worker2')
+        self.assertEqual((job, job.status, job.worker), (second, 'RUNNING', 'worker2'))
+        self.assertIsNone(jobs.claim_job('worker3'))
+
+    def test_run_job(self):
+        job, = jobs.queue_jobs([self.book], [self.swedish])
+        job = jobs.run_job(jobs.claim_job('worker'), chunk_size=2)
+
+        self.assertEqual((job.status, job.total_words, job.translated_words, job.progress), ('DONE', 4, 4, '100%'))
+        self.assertEqual(self.translations(self.swedish), {
+            'dog': 'hund',
+            'cat': 'katt',
+            'rabbit': 'kanin',
+            'house': 'house-sv',
+        })
+
+        # Only words without a Translation were sent to the Translator
+        self.assertEqual(self.requests, [(['dog', 'cat'], 'sv'), (['house'], 'sv')])
+
+        # Bulk created Translations have similarity measures
+        self.assertEqual(Translation.objects.get(foreign_word='hund').dam, 4)
+
+    def test_run_job_pronunciations(self):
+        job, = jobs.queue_jobs(None, [self.chinese])
+        jobs.run_job(jobs.claim_job('worker'))
+        translation = Translation.objects.get(foreign_language=self.chinese, translatable_word__english_word='dog')
+        self.assertEqual((translation.foreign_word, translation.pronunciation), ('狗', 'gǒu'))
+        self.assertEqual(len(self.translations(self.chinese)), 5)
+
+    def test_run_job_updates_stats(self):
+        self.assertEqual(book_language_stats(self.book, self.swedish).words_to_learn, 1)
+        jobs.queue_jobs([self.book], [self.swedish])
+        jobs.run_job(jobs.claim_job('worker'))
+        self.assertEqual(book_language_stats(self.book, self.swedish).words_to_learn, 4)
+
+    def test_run_job_failure(self):
+        jobs.queue_jobs([self.book], [self.swedish])
+        with mock.patch.object(FakeTranslator, 'translate', side_effect=TranslationFailure('too many requests')):
+            job = jobs.run_job(jobs.claim_job('worker'))
+        self.assertEqual((job.status, job.error), ('FAILED', 'too many requests'))
+
+    def test_run_job_error(self):
+        # Errors other than TranslationFailure also fail the job, and the worker carries on
+        jobs.queue_jobs([self.book], [self.swedish, self.chinese])
+        with mock.patch.object(jobs, 'upsert_translations', side_effect=[ValueError('broken'), []]):
+            self.assertEqual(jobs.run_worker('worker', burst=True), 2)
+        failed, done = TranslationJob.objects.order_by('id')
+        self.assertEqual((failed.status, failed.error), ('FAILED', 'ValueError: broken'))
+        self.assertEqual(done.status, 'DONE')
+
+    def test_requeue_stale_jobs_attempts(self):
+        job, = jobs.queue_jobs([self.book], [self.swedish])
+        for attempt in range(jobs.MAX_ATTEMPTS):
+            self.assertEqual(jobs.claim_job('worker'), job)
+            self.assertEqual(jobs.requeue_stale_jobs(stale_after=-1), 1 if attempt < jobs.MAX_ATTEMPTS - 1 else 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('FAILED', jobs.MAX_ATTEMPTS))
+        self.assertIsNone(jobs.claim_job('worker'))
+
+    def test_run_job_resumes(self):
+        jobs.queue_jobs([self.book], [self.swedish])
+        job = jobs.claim_job('worker')
+
+        # The worker dies after its first chunk
+        translate = memory.translate
+        with mock.patch.object(memory, 'translate', side_effect=[translate(['dog'], self.swedish), KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                jobs.run_job(job, chunk_size=1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.translated_words), ('RUNNING', 2))
+
+        # Stale jobs are queued again, and only the missing words are translated
+        self.assertEqual(jobs.requeue_stale_jobs(stale_after=600), 0)
+        self.assertEqual(jobs.requeue_stale_jobs(stale_after=-1), 1)
+        self.requests.clear()
+        jobs.run_worker('worker', burst=True, chunk_size=1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(self.requests, [(['cat'], 'sv'), (['house'], 'sv')])
+        self.assertEqual(Translation.objects.filter(foreign_language=self.swedish).count(), 4)
+
+    def test_upsert_translations_existing(self):
+        dog = TranslatableWord.objects.get(english_word='dog')
+        Translation.objects.create(translatable_word=dog, foreign_language=self.swedish, foreign_word='vovve')
+        created = jobs.upsert_translations(self.swedish, [dog], [('hund', None)])
+        self.assertEqual(created, [])
+        self.assertEqual(self.translations(self.swedish)['dog'], 'vovve')
+
+    def test_commands(self):
+        call_command('queue_translations', f'--books={self.book.id}', stdout=io.StringIO())
+        self.assertEqual(TranslationJob.objects.filter(status='PENDING').count(), 2)
+
+        call_command('translation_worker', '--burst', stdout=io.StringIO())
+        self.assertEqual(TranslationJob.objects.filter(status='DONE').count(), 2)
+        self.assertEqual(len(self.translations(self.chinese)), 4)
+
+        status = io.StringIO()
+        call_command('queue_translations', '--status', stdout=status)
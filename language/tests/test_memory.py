@@ -0,0 +1,118 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from language import memory
+from language.memory import LRUCache
+from language.models import ForeignLanguage, TranslatableWord, Translation, TranslationMemory
+from language.translators import FakeTranslator, TranslationFailure, get_translator
+from unittest import mock
+from users.models import CustomUser
+import json, tempfile
+
+
+class LRUCacheTest(SimpleTestCase):
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+
+        # 'b' is now the least recently used
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+
+
+@override_settings(LANGY_TRANSLATOR='language.translators.FakeTranslator')
+class TranslationMemoryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        CustomUser.objects.create_superuser(
+            email='superuser@email.com',
+            display_name='Superuser',
+            password='pass')
+        ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = True,
+            duolingo_learners = 1260000)
+        ForeignLanguage.objects.create(
+            key = 'zh-cn',
+            english_name = 'Chinese',
+            foreign_name = '中文',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = False,
+            duolingo_learners = 1)
+        Translation.objects.create(
+            translatable_word = TranslatableWord.objects.create(english_word='rabbit'),
+            foreign_language = ForeignLanguage.objects.get(key='sv'),
+            foreign_word = 'kanin')
+
+    def setUp(self):
+        memory.clear()
+        self.addCleanup(memory.clear)
+        self.requests = get_translator().translator.requests
+        self.requests.clear()
+        self.swedish = ForeignLanguage.objects.get(key='sv')
+
+    def test_translate(self):
+        translations = memory.translate(['dog', 'rabbit', 'house', 'dog'], self.swedish)
+        self.assertEqual(translations, [('hund', None), ('kanin', None), ('house-sv', None), ('hund', None)])
+
+        # Only words without a Translation are sent upstream, once each, and remembered
+        self.assertEqual(self.requests, [(['dog', 'house'], 'sv')])
+        self.assertEqual(
+            set(TranslationMemory.objects.values_list('english_word', 'dest_key', 'foreign_word')),
+            {('dog', 'sv', 'hund'), ('house', 'sv', 'house-sv')})
+
+    def test_translate_remembered(self):
+        memory.translate(['dog', 'cat'], self.swedish)
+
+        # Kept in this process
+        with self.assertNumQueries(1):
+            self.assertEqual(memory.translate(['cat', 'dog'], self.swedish), [('katt', None), ('hund', None)])
+
+        # Kept in the database
+        memory.clear()
+        self.assertEqual(memory.translate(['dog', 'cat', 'mouse'], self.swedish)[:2], [('hund', None), ('katt', None)])
+        self.assertEqual(self.requests, [(['dog', 'cat'], 'sv'), (['mouse'], 'sv')])
+
+    def test_translate_per_language(self):
+        chinese = ForeignLanguage.objects.get(key='zh-cn')
+        memory.translate(['dog'], self.swedish)
+        self.assertEqual(memory.translate(['dog'], chinese), [('狗', 'Gǒu')])
+        self.assertEqual(len(self.requests), 2)
+
+    def test_translate_failure(self):
+        with mock.patch.object(FakeTranslator, 'translate', return_value=[]):
+            with self.assertRaises(TranslationFailure):
+                memory.translate(['dog'], self.swedish)
+        self.assertFalse(TranslationMemory.objects.exists())
+
+    def test_translate_english_words_view(self):
+        self.client.login(email='superuser@email.com', password='pass')
+        response = self.client.post(
+            reverse('language:translate_english_words', kwargs={'key': 'zh-cn'}),
+            data = json.dumps({'english_words': ['cat']}),
+            content_type = 'application/json')
+        self.assertEqual(response.json(), {
+            'foreign_words': ['猫'],
+            'pronunciations': ['māo'],
+            'enable_pronunciations': True,
+        })
+
+    def test_translate_english_words_view_failure(self):
+        self.client.login(email='superuser@email.com', password='pass')
+        with mock.patch.object(FakeTranslator, 'translate', side_effect=TranslationFailure('too many requests')):
+            response = self.client.post(
+                reverse('language:translate_english_words', kwargs={'key': 'sv'}),
+                data = json.dumps({'english_words': ['cat']}),
+                content_type = 'application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content.decode(), 'Translation failure: too many requests')
@@ -1,8 +1,10 @@
+from django.core.management import call_command
 from django.test import TestCase
 from language.models import ForeignLanguage, LearningLanguage, Synonym, TranslatableWord, Translation
 from read.models import Author, Book
+from unittest import mock
 from users.models import CustomUser
-import tempfile
+import io, jellyfish, tempfile
 
 
 class ForeignLanguageModelTest(TestCase):
@@ -108,4 +110,68 @@ class TranslationModelTest(TestCase):
         self.assertEquals(translation.foreign_word, 'Foreign word')
         self.assertEquals(translation.pronunciation, 'Pronunciation')
         self.assertTrue(translation.last_modified is not None)
-        self.assertEquals(translation.readable_word, 'Foreign word')
\ No newline at end of file
+        self.assertEquals(translation.readable_word, 'Foreign word')
+
+    def test_translation_similarity(self):
+        translation = Translation.objects.create(
+            translatable_word = TranslatableWord.objects.get(english_word='English word'),
+            foreign_language = ForeignLanguage.objects.get(key='fl-tr'),
+            foreign_word = 'Foreign word')
+        translation.refresh_from_db()
+        self.assertEqual(translation.dam, jellyfish.damerau_levenshtein_distance('English word', 'Foreign word'))
+        self.assertAlmostEqual(translation.jar, jellyfish.jaro_winkler_similarity('English word', 'Foreign word'))
+
+        translation.foreign_word = 'English words'
+        translation.save(update_fields=['foreign_word'])
+        translation.refresh_from_db()
+        self.assertEqual(translation.dam, 1)
+
+    def test_translation_similarity_inputs_changed(self):
+        translation = Translation.objects.create(
+            translatable_word = TranslatableWord.objects.get(english_word='English word'),
+            foreign_language = ForeignLanguage.objects.get(key='fl-tr'),
+            foreign_word = 'Foreign word',
+            pronunciation = 'English word')
+
+        # English word changed
+        translatable_word = translation.translatable_word
+        translatable_word.english_word = 'Foreign word'
+        translatable_word.save()
+        translation.refresh_from_db()
+        self.assertEqual((translation.dam, translation.jar), (0, 1))
+
+        # Pronunciation is readable instead of the foreign word
+        foreign_language = translation.foreign_language
+        foreign_language.uses_latin_script = False
+        foreign_language.save()
+        translation.refresh_from_db()
+        self.assertEqual(translation.dam, jellyfish.damerau_levenshtein_distance('Foreign word', 'English word'))
+
+    def test_translation_similarity_other_changes(self):
+        Translation.objects.create(
+            translatable_word = TranslatableWord.objects.get(english_word='English word'),
+            foreign_language = ForeignLanguage.objects.get(key='fl-tr'),
+            foreign_word = 'Foreign word')
+
+        # Changes to other fields, or saves without changes, leave dam and jar alone
+        with mock.patch('language.signals.update_similarity') as update_similarity:
+            foreign_language = ForeignLanguage.objects.get(key='fl-tr')
+            foreign_language.duolingo_learners += 1
+            foreign_language.save()
+            TranslatableWord.objects.get(english_word='English word').save()
+            update_similarity.assert_not_called()
+
+    def test_update_similarity_command(self):
+        Translation.objects.bulk_create([
+            Translation(
+                translatable_word = TranslatableWord.objects.get(english_word='English word'),
+                foreign_language = ForeignLanguage.objects.get(key='fl-tr'),
+                foreign_word = foreign_word)
+            for foreign_word in ['English word', 'English ward', 'Foreign word']
+        ])
+        self.assertEqual(Translation.objects.filter(dam=None).count(), 3)
+
+        call_command('update_similarity', '--missing', '--batch-size=2', '--processes=2', stdout=io.StringIO())
+        self.assertEqual(
+            list(Translation.objects.order_by('dam').values_list('foreign_word', 'dam')),
+            [('English word', 0), ('English ward', 1), ('Foreign word', 6)])
@@ -0,0 +1,141 @@
+from django.test import SimpleTestCase
+from language.translators import (
+    FakeTranslator, GoogleTranslator, StubTranslator, TemporaryFailure, ThrottledTranslator, TokenBucket,
+    TooManyRequests, TranslationFailure, Translator)
+from unittest import mock
+import httpcore, threading, time
+
+
+class CountingTranslator(Translator):
+    def __init__(self, failures=0, latency=0):
+        self.failures = failures
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def translate(self, english_words, dest):
+        with self._lock:
+            self.calls += 1
+            if self.failures > 0:
+                self.failures -= 1
+                raise TooManyRequests('too many requests')
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return [(f'{english_word}-{dest}', None) for english_word in english_words]
+
+
+class TokenBucketTest(SimpleTestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=5)
+
+        # A burst up to capacity does not wait
+        start = time.monotonic()
+        for i in range(5):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.02)
+
+        # Further tokens wait for the bucket to refill
+        for i in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class ThrottledTranslatorTest(SimpleTestCase):
+    def throttled(self, translator, **kwargs):
+        throttled = ThrottledTranslator(translator, **{'rate': 1000, 'burst': 1000, **kwargs})
+        throttled.sleep = lambda seconds: None
+        return throttled
+
+    def test_translate_chunks(self):
+        translator = CountingTranslator()
+        english_words = [f'word{i}' for i in range(25)]
+        translations = self.throttled(translator, chunk_size=10).translate(english_words, 'sv')
+        self.assertEqual(translations, [(f'word{i}-sv', None) for i in range(25)])
+        self.assertEqual(translator.calls, 3)
+
+    def test_translate_bounded_concurrency(self):
+        translator = CountingTranslator(latency=0.02)
+        self.throttled(translator, chunk_size=1, max_workers=3).translate([f'word{i}' for i in range(12)], 'sv')
+        self.assertEqual(translator.max_in_flight, 3)
+
+    def test_translate_retries(self):
+        translator = CountingTranslator(failures=2)
+        throttled = self.throttled(translator)
+        waits = []
+        throttled.sleep = waits.append
+        self.assertEqual(throttled.translate(['dog'], 'sv'), [('dog-sv', None)])
+        self.assertEqual(translator.calls, 3)
+
+        # Exponential backoff with jitter
+        self.assertEqual(len(waits), 2)
+        self.assertLessEqual(waits[0], 1.0)
+        self.assertLessEqual(waits[1], 2.0)
+
+    def test_translate_retries_temporary_failures(self):
+        translator = CountingTranslator()
+        translate = translator.translate
+        translator.translate = mock.Mock(side_effect=[TemporaryFailure('ConnectError'), translate(['dog'], 'sv')])
+        self.assertEqual(self.throttled(translator).translate(['dog'], 'sv'), [('dog-sv', None)])
+        self.assertEqual(translator.translate.call_count, 2)
+
+    def test_translate_too_many_retries(self):
+        translator = CountingTranslator(failures=10)
+        with self.assertRaises(TooManyRequests):
+            self.throttled(translator, max_retries=3).translate(['dog'], 'sv')
+        self.assertEqual(translator.calls, 4)
+
+    def test_translate_wrong_number_of_translations(self):
+        translator = FakeTranslator()
+        translator.translate = lambda english_words, dest: []
+        with self.assertRaises(TranslationFailure):
+            self.throttled(translator).translate(['dog'], 'sv')
+
+    def test_translate_stub_rate_limited(self):
+        # The rate limit keeps requests within what the stub accepts, so none are rejected
+        stub = StubTranslator(latency=0, max_requests_per_second=20)
+        throttled = self.throttled(stub, chunk_size=1, rate=15, burst=5)
+        translations = throttled.translate([f'word{i}' for i in range(10)], 'sv')
+        self.assertEqual(len(translations), 10)
+        self.assertEqual(stub.rejected, 0)
+
+
+class StubTranslatorTest(SimpleTestCase):
+    def test_stub_translator(self):
+        stub = StubTranslator(latency=0, max_requests_per_second=2)
+        self.assertEqual(stub.translate(['dog'], 'sv'), [('hund', None)])
+        stub.translate(['cat'], 'sv')
+        with self.assertRaises(TooManyRequests):
+            stub.translate(['house'], 'sv')
+        self.assertEqual(stub.rejected, 1)
+
+
+class GoogleTranslatorTest(SimpleTestCase):
+    def translate(self, status_code=200, side_effect=None):
+        translation = mock.Mock(text='hund', pronunciation=None)
+        translation._response.status_code = status_code
+        with mock.patch('googletrans.Translator') as google:
+            google.return_value.translate.side_effect = side_effect
+            google.return_value.translate.return_value = [translation]
+            return GoogleTranslator().translate(['dog'], 'sv')
+
+    def test_translate(self):
+        self.assertEqual(self.translate(), [('hund', None)])
+
+    def test_translate_failures(self):
+        with self.assertRaises(TooManyRequests):
+            self.translate(status_code=429)
+        with self.assertRaises(TemporaryFailure):
+            self.translate(status_code=503)
+        with self.assertRaises(TranslationFailure) as context:
+            self.translate(status_code=404)
+        self.assertNotIsInstance(context.exception, TemporaryFailure)
+
+    def test_translate_transport_errors(self):
+        for error in [httpcore.ConnectError('Name or service not known'), httpcore.ReadTimeout('timed out')]:
+            with self.assertRaises(TemporaryFailure):
+                self.translate(side_effect=error)
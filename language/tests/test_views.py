@@ -1,5 +1,6 @@
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from language import memory
 from language.models import ForeignLanguage, TranslatableWord, Translation
 from language.views import translate_english_words, save_translations
 from read.models import Author, Book
@@ -215,7 +216,10 @@ class TranslateEnglishWordsView(TestCase):
         response = self.client.get(reverse('language:translate_english_words', kwargs={'key':key}))
         self.assertRedirects(response, f'/admin/login/?next=/language/translate-english-words/{key}')
 
+    @override_settings(LANGY_TRANSLATOR='language.translators.FakeTranslator')
     def test_translate_english_words(self):
+        memory.clear()
+        self.addCleanup(memory.clear)
         login = self.client.login(email='superuser@email.com', password='pass')
         key = 'sv'
 
@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.utils.module_loading import import_string
+import googletrans, httpcore, httpx, random, threading, time
+
+
+# Per process Translators by dotted path, so they are only set up once
+_translators = {}
+
+# Connection, timeout and protocol errors raised by googletrans, through httpx
+TRANSPORT_ERRORS = (httpx.HTTPError, httpcore.NetworkError, httpcore.ProtocolError, httpcore.TimeoutException)
+
+
+class TranslationFailure(Exception):
+    """Raised when a Translator cannot translate the English words it was given."""
+
+
+class TemporaryFailure(TranslationFailure):
+    """Raised when a Translator fails for a reason which may pass, e.g. a network error, so the request can be retried."""
+
+
+class TooManyRequests(TemporaryFailure):
+    """Raised when a Translator's upstream service refuses requests because of its rate limit."""
+
+
+class Translator:
+    """
+    Translates English words into a ForeignLanguage.
+
+    Subclasses implement translate, and are selected with the LANGY_TRANSLATOR setting.
+    """
+
+    # Returns a list of (foreign_word, pronunciation) tuples
+    #   for a list of English words, in the same order, translated into the language with key dest.
+    #   pronunciation is None if the Translator has none.
+    #   Raises TranslationFailure if the words cannot be translated.
+    def translate(self, english_words, dest):
+        raise NotImplementedError
+
+
+class GoogleTranslator(Translator):
+    """Translates with Google Translate, through googletrans."""
+
+    def translate(self, english_words, dest):
+        try:
+            translations = googletrans.Translator().translate(english_words, src='en', dest=dest)
+        except AttributeError:
+            raise TranslationFailure('attribute error')
+        except TRANSPORT_ERRORS as e:
+            raise TemporaryFailure(f'{type(e).__name__}: {e}')
+        if len(translations) == 0:
+            raise TranslationFailure('no translations received')
+
+        # googletrans returns the English word as its translation when a response fails
+        for translation in translations:
+            status_code = translation._response.status_code
+            if status_code == 429:
+                raise TooManyRequests('too many requests')
+            elif status_code >= 500:
+                raise TemporaryFailure(f'response status code {status_code}')
+            elif status_code != 200:
+                raise TranslationFailure(f'response status code {status_code}')
+
+        return [(translation.text, translation.pronunciation) for translation in translations]
+
+
+class FakeTranslator(Translator):
+    """
+    Translates locally without any network requests, for tests and development.
+
+    Words in FakeTranslator.words are translated as given, and any other word is translated
+    into '<english_word>-<dest>'. Every call is recorded in the instance's requests list.
+    """
+
+    # Maps (english_word, dest) to (foreign_word, pronunciation) tuples
+    words = {
+        ('dog', 'sv'): ('hund', None),
+        ('cat', 'sv'): ('katt', None),
+        ('dog', 'zh-cn'): ('狗', 'Gǒu'),
+        ('cat', 'zh-cn'): ('猫', 'Māo'),
+    }
+
+    def __init__(self):
+        # List of (english_words, dest) tuples, one per call to translate
+        self.requests = []
+
+    def translate(self, english_words, dest):
+        self.requests.append((list(english_words), dest))
+        return [
+            self.words.get((english_word, dest), (f'{english_word}-{dest}', None))
+            for english_word in english_words
+        ]
+
+
+class StubTranslator(FakeTranslator):
+    """
+    Translates like FakeTranslator, but behaves like a remote service, for offline tests and benchmarks.
+
+    Initialisation Parameters
+    -------------------------
+    latency : float, default=0.05
+        Time in seconds each call to translate takes.
+    max_requests_per_second : float, default=None
+        Calls beyond this rate, over the last second, raise TooManyRequests. None means no limit.
+    """
+
+    def __init__(self, latency=0.05, max_requests_per_second=None):
+        super().__init__()
+        self.latency = latency
+        self.max_requests_per_second = max_requests_per_second
+        self.rejected = 0
+        self._recent = []
+        self._lock = threading.Lock()
+
+    def translate(self, english_words, dest):
+        if self.max_requests_per_second is not None:
+            with self._lock:
+                now = time.monotonic()
+                self._recent = [t for t in self._recent if now - t < 1]
+                if len(self._recent) >= self.max_requests_per_second:
+                    self.rejected += 1
+                    raise TooManyRequests('too many requests')
+                self._recent.append(now)
+        time.sleep(self.latency)
+        return super().translate(english_words, dest)
+
+
+class TokenBucket:
+    """
+    Limits the rate of requests, allowing short bursts.
+
+    The bucket holds up to capacity tokens and refills at rate tokens per second.
+    Each request takes a token, waiting for one if the bucket is empty.
+
+    Initialisation Parameters
+    -------------------------
+    rate : float
+        Tokens added per second.
+    capacity : int
+        Maximum number of tokens, the largest burst allowed.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Take a token, waiting until one is available.
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ThrottledTranslator(Translator):
+    """
+    Sends English words to another Translator in chunks, concurrently, within a rate limit.
+
+    Each chunk waits for a token from a TokenBucket shared by every thread, and is retried with
+    exponential backoff and jitter when the Translator raises a TemporaryFailure, such as
+    TooManyRequests or a network error.
+
+    Initialisation Parameters
+    -------------------------
+    translator : Translator
+        The Translator chunks are sent to.
+    chunk_size : int, default=50
+        Maximum number of English words per request.
+    rate : float, default=5.0
+        Maximum requests per second, on average.
+    burst : int, default=10
+        Maximum requests sent at once after a quiet period.
+    max_retries : int, default=5
+        Retries per chunk before the TemporaryFailure is raised.
+    backoff : float, default=1.0
+        Longest wait in seconds before the first retry, doubling for each retry after.
+    max_workers : int, default=4
+        Maximum number of requests in flight at once.
+    """
+
+    def __init__(self, translator, chunk_size=50, rate=5.0, burst=10, max_retries=5, backoff=1.0, max_workers=4):
+        self.translator = translator
+        self.chunk_size = chunk_size
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.sleep = time.sleep
+
+    # Returns a list of (foreign_word, pronunciation) tuples
+    #   from the Translator for one chunk of English words.
+    #   Raises TemporaryFailure if every retry failed.
+    def translate_chunk(self, english_words, dest):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return self.translator.translate(english_words, dest)
+            except TemporaryFailure:
+                if attempt == self.max_retries:
+                    raise
+                self.sleep(random.uniform(0, self.backoff * 2**attempt))
+
+    def translate(self, english_words, dest):
+        english_words = list(english_words)
+        chunks = [english_words[start:start+self.chunk_size] for start in range(0, len(english_words), self.chunk_size)]
+
+        # A single chunk is sent from this thread
+        if len(chunks) == 1:
+            results = [self.translate_chunk(chunks[0], dest)]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='translator') as executor:
+                results = list(executor.map(lambda chunk: self.translate_chunk(chunk, dest), chunks))
+
+        translations = []
+        for chunk, result in zip(chunks, results):
+            if len(result) != len(chunk):
+                raise TranslationFailure(f'{len(result)} translations received for {len(chunk)} words')
+            translations.extend(result)
+        return translations
+
+
+# Returns a ThrottledTranslator
+#   sending requests to the Translator chosen by the LANGY_TRANSLATOR setting.
+#   Created once per process, so every request in the process shares its rate limit.
+#   The limit is per process: N web or worker processes may send N times the configured rate.
+def get_translator():
+    path = settings.LANGY_TRANSLATOR
+    if path not in _translators:
+        _translators[path] = ThrottledTranslator(import_string(path)(), **settings.TRANSLATOR_THROTTLING)
+    return _translators[path]
@@ -1,11 +1,12 @@
+from . import memory
 from .models import ForeignLanguage, LearningLanguage, TranslatableWord, Translation
+from .translators import TranslationFailure
 from read.models import Book
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseBadRequest, HttpResponseServerError, JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-from googletrans import Translator
 import json
 
 
@@ -104,37 +105,22 @@ def translate_english_words(request, key):
         if (len(english_words)==0):
             return HttpResponseBadRequest('No English words received')
 
-        # Translate words
+        # Translate words, only sending words without a Translation or TranslationMemory upstream
+        foreign_language = ForeignLanguage.objects.get(key=key)
         try:
-            translator = Translator()
-            translations = translator.translate(
-                english_words,
-                src='en',
-                dest=key
-            )
-        
-        # Check for translation request and response issues
-        except AttributeError:
-            return HttpResponseBadRequest('Translation failure: attribute error')
-        if (len(translations)==0):
-            return HttpResponseServerError('Translation failure: no translations received')
-        status_code = translations[0]._response.status_code
-        if (status_code==429):
-            return HttpResponseBadRequest('Translation failure: too many requests')
-        elif (status_code!=200):
-            print(f'Translation response status code not 200: received {status_code}')
+            translations = memory.translate(english_words, foreign_language)
+        except TranslationFailure as e:
+            return HttpResponseBadRequest(f'Translation failure: {e}')
 
         # Prepare response
         foreign_words = []
         pronunciations = []
-        for translation in translations:
-            foreign_words.append(translation.text.lower())
-            p = translation.pronunciation
+        for foreign_word, p in translations:
+            foreign_words.append(foreign_word.lower())
             if p is not None: p = p.lower()
             pronunciations.append(p)
 
         # For ForeignLanguages not using Latin script, pronunciations should be enabled and stored
-        foreign_language = ForeignLanguage.objects.get(key=key)
         enable_pronunciations = not foreign_language.uses_latin_script
         
         return JsonResponse({
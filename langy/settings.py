@@ -119,6 +119,54 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# Version stamps invalidating rendered Pages, the catalogue, the vocabulary and answer indexes
+# are kept here, so every web and worker process must share one cache: Redis, through django-redis, e.g.
+#   CACHE_URL=rediscache://127.0.0.1:6379/1
+# The default, locmemcache://, is only suitable for development with a single process:
+# manage.py check --deploy fails while it is in use.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+
+# LangyNet
+# Model used to predict p_trans for word tests
+
+LANGYNET_STATE_DICT = BASE_DIR / 'model_data' / 'model_state_dict.pt'
+LANGYNET_EMBEDDINGS = BASE_DIR / 'model_data' / 'embeddings.pt'
+LANGYNET_TORCHSCRIPT = env.bool('LANGYNET_TORCHSCRIPT', default=False)
+
+# Batch concurrent predictions from several worker threads into one forward pass
+LANGYNET_BATCHING = env.bool('LANGYNET_BATCHING', default=False)
+LANGYNET_BATCH_SIZE = env.int('LANGYNET_BATCH_SIZE', default=512)
+LANGYNET_BATCH_LATENCY = env.float('LANGYNET_BATCH_LATENCY', default=0.005)
+LANGYNET_BATCH_QUEUE = env.int('LANGYNET_BATCH_QUEUE', default=64)
+
+
+# Translation
+# Translator used for English words without a Translation or TranslationMemory, as a dotted path
+
+LANGY_TRANSLATOR = env('LANGY_TRANSLATOR', default='language.translators.GoogleTranslator')
+
+# Requests to the Translator are chunked, rate limited, retried and sent concurrently
+# The rate limit applies per process: with N web or worker processes, the Translator
+# may receive up to N times the rate, so divide the upstream limit between processes
+TRANSLATOR_THROTTLING = {
+    'chunk_size': env.int('TRANSLATOR_CHUNK_SIZE', default=50),
+    'rate': env.float('TRANSLATOR_RATE', default=5.0),
+    'burst': env.int('TRANSLATOR_BURST', default=10),
+    'max_retries': env.int('TRANSLATOR_MAX_RETRIES', default=5),
+    'backoff': env.float('TRANSLATOR_BACKOFF', default=1.0),
+    'max_workers': env.int('TRANSLATOR_MAX_WORKERS', default=4),
+}
+
+# Machine translations kept in memory per process, in front of the TranslationMemory table
+TRANSLATION_MEMORY_SIZE = env.int('TRANSLATION_MEMORY_SIZE', default=10000)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
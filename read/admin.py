@@ -1,4 +1,4 @@
-from .models import Author, Book, Page
+from .models import Author, Book, BookLanguageStats, BookStats, Page
 from django.contrib import admin
 
 
@@ -49,3 +49,20 @@ class BookAdmin(admin.ModelAdmin):
 
     # Specific Book
     inlines = [PageInline]
+
+
+@admin.register(BookStats)
+class BookStatsAdmin(admin.ModelAdmin):
+    # Main list
+    list_display = ('book', 'page_count', 'translatable_word_count', 'english_word_count', 'length', 'last_updated',)
+    list_display_links = ('book',)
+    readonly_fields = ['last_updated',]
+
+
+@admin.register(BookLanguageStats)
+class BookLanguageStatsAdmin(admin.ModelAdmin):
+    # Main list
+    list_display = ('book', 'foreign_language', 'words_to_learn', 'difficulty', 'last_updated',)
+    list_display_links = ('book',)
+    list_filter = ('foreign_language',)
+    readonly_fields = ['last_updated',]
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ReadConfig(AppConfig):
     name = 'read'
+
+    def ready(self):
+        # Connect signal receivers and register system checks
+        from . import checks, signals
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+# Version stamps for rendered Pages, the catalogue, the vocabulary and answer indexes are kept in
+# the default cache. A signal only changes a stamp in the cache of the process it ran in, so with a
+# cache per process, every other web or worker process keeps serving what the stamp was meant to
+# invalidate. Deployments must share one cache between processes, i.e. Redis.
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.CACHES['default']['BACKEND'] != LOCMEM_BACKEND:
+        return []
+    return [Error(
+        'The default cache is local to each process, so version stamps are not shared between processes.',
+        hint='Set CACHE_URL to a Redis cache shared by every process, e.g. rediscache://127.0.0.1:6379/1.',
+        id='read.E001',
+    )]
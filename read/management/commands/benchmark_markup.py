@@ -0,0 +1,97 @@
+"""
+Benchmark marking up Book Pages with interactable Translations.
+Compares one regex substitution per Translation with the single pass TranslationMarkup.
+"""
+
+from django.core.management.base import BaseCommand
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from read.markup import TranslationMarkup, translation_html
+from tracking.management.commands._slutil import tprint
+import random, re, time
+
+
+FILLER_WORDS = [
+    'the', 'a', 'and', 'was', 'very', 'then', 'they', 'went', 'into', 'with',
+    'happy', 'little', 'big', 'saw', 'said', 'look', 'over', 'under', 'there', 'here',
+]
+
+
+# Returns a list of strings
+#   of marked up Page text, using one regex substitution per Translation.
+#   This is how the reader originally performed replacements.
+def naive_markup(texts, translations, foreign_language):
+    texts = list(texts)
+    for t in translations:
+        pattern = rf'\b{t.translatable_word.english_word}\b'
+        replacement = translation_html(t, foreign_language)
+        for i, text in enumerate(texts):
+            texts[i] = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return texts
+
+
+# Returns the average time in milliseconds
+#   taken to call func over a number of repeats.
+def time_ms(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+class Command(BaseCommand):
+    help = ('Benchmark marking up Book Pages with interactable Translations. '
+            'Compares one regex substitution per Translation with the single pass TranslationMarkup.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', type=int, default=50, help='Number of TranslatableWords')
+        parser.add_argument('--pages', type=int, default=40, help='Number of Pages')
+        parser.add_argument('--page-length', type=int, default=120, help='Number of words per Page')
+        parser.add_argument('--repeats', type=int, default=20, help='Number of timed repeats')
+
+
+    def handle(self, *args, **kwargs):
+        random.seed(1)
+        num_words = kwargs['words']
+        num_pages = kwargs['pages']
+
+        # Unsaved objects: nothing is written to the database
+        foreign_language = ForeignLanguage(key='zz', english_name='Benchmark', uses_latin_script=False)
+        translations = []
+        for i in range(num_words):
+            tw = TranslatableWord(english_word=f'word{i}')
+            translations.append(Translation(
+                id=i+1,
+                translatable_word=tw,
+                foreign_language=foreign_language,
+                foreign_word=f'frn{i}',
+                pronunciation=f'pron{i}'))
+
+        # Pages of filler text, with roughly one in five words translatable
+        vocabulary = FILLER_WORDS * 4 + [t.translatable_word.english_word for t in translations]
+        texts = []
+        for _ in range(num_pages):
+            words = [random.choice(vocabulary) for _ in range(kwargs['page_length'])]
+            texts.append(' '.join(words) + '.')
+
+        tprint(f'{num_words} translatable words, {num_pages} pages, {kwargs["page_length"]} words per page')
+
+        # Check both approaches agree before timing them
+        markup = TranslationMarkup(translations, foreign_language)
+        if markup.apply_all(texts) != naive_markup(texts, translations, foreign_language):
+            tprint('warning: outputs differ')
+
+        naive = time_ms(
+            lambda: naive_markup(texts, translations, foreign_language),
+            kwargs['repeats'])
+        cold = time_ms(
+            lambda: TranslationMarkup(translations, foreign_language).apply_all(texts),
+            kwargs['repeats'])
+        warm = time_ms(
+            lambda: markup.apply_all(texts),
+            kwargs['repeats'])
+
+        tprint(f'per-translation re.sub:       {naive:8.3f} ms/request')
+        tprint(f'TranslationMarkup (compile):  {cold:8.3f} ms/request')
+        tprint(f'TranslationMarkup (reused):   {warm:8.3f} ms/request')
+        tprint('done.')
@@ -0,0 +1,24 @@
+"""Recalculate BookStats and BookLanguageStats for every Book in bulk."""
+
+from django.core.management.base import BaseCommand
+from read.stats import rebuild_stats
+from tracking.management.commands._slutil import tprint
+
+
+class Command(BaseCommand):
+    help = 'Recalculate BookStats and BookLanguageStats for every Book in bulk.'
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of rows to create per INSERT')
+
+
+    def handle(self, *args, **kwargs):
+        tprint('rebuilding book stats')
+        book_count, language_count = rebuild_stats(batch_size=kwargs['batch_size'])
+        tprint(f'created {book_count} BookStats and {language_count} BookLanguageStats')
+        tprint('done.')
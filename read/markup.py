@@ -0,0 +1,103 @@
+import re
+
+
+# Returns a string
+#   of interactable HTML to display in place of a Translation's English word.
+def translation_html(translation, foreign_language):
+    if foreign_language.uses_latin_script:
+        button_content = translation.foreign_word
+        popover_content = translation.foreign_word
+    else:
+        # Display pronunciation instead of native representation
+        # Ensures users can read the word
+        button_content = translation.pronunciation
+        popover_content = f'{translation.pronunciation} <br> {translation.foreign_word}'
+
+    return (
+        '<span data-toggle="popover" data-placement="top" data-trigger="focus" data-html="true"'
+            f'data-translation-id="{translation.id}"'
+            f'title="{translation.translatable_word.english_word}"'
+            f'data-content="{popover_content}">'
+            f'<a tabindex="0" class="btn btn-success btn-word" role="button">{button_content}</a>'
+        '</span>')
+
+
+class TranslationMarkup:
+    """
+    Replaces whole English words in text with interactable HTML for their
+    Translations.
+
+    All English words are compiled into a single case-insensitive regex
+    alternation, so each text is scanned once regardless of how many
+    Translations there are. Inserted HTML is never scanned again.
+
+    Initialisation Parameters
+    -------------------------
+    translations : list of Translation
+        Translations to mark up, e.g. from Book.available_translations().
+    foreign_language : ForeignLanguage
+        The language the Translations belong to.
+    """
+
+    def __init__(self, translations, foreign_language):
+        # Map lowercase English words to their replacement HTML
+        # The first Translation for a word takes precedence
+        self.replacements = {}
+        for t in translations:
+            self.replacements.setdefault(
+                t.translatable_word.english_word.lower(),
+                translation_html(t, foreign_language))
+
+        # Longest words first, so a word is never cut short by its own prefix
+        words = sorted(self.replacements, key=lambda w: (-len(w), w))
+        if words:
+            alternation = '|'.join(re.escape(w) for w in words)
+            self.pattern = re.compile(rf'\b(?:{alternation})\b', flags=re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    def replace(self, match):
+        word = match.group(0)
+        return self.replacements.get(word.lower(), word)
+
+    # Returns a string
+    #   of text with every translatable English word replaced by HTML.
+    def apply(self, text):
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self.replace, text)
+
+    # Returns a list of strings
+    #   of marked up text for each text in the given list e.g. a Book's Page text.
+    def apply_all(self, texts):
+        return [self.apply(text) for text in texts]
+
+
+# Compiled TranslationMarkups, keyed by (book_id, foreign_language_id)
+# Each value is a tuple of the form (signature, TranslationMarkup)
+_markups = {}
+
+
+# Returns a tuple
+#   identifying the content of the given Translations.
+#   Changes whenever a Translation is added, removed or edited.
+def translations_signature(translations):
+    return tuple(
+        (t.id, t.translatable_word.english_word, t.foreign_word, t.pronunciation)
+        for t in translations)
+
+
+# Returns a TranslationMarkup
+#   for a Book in a given ForeignLanguage.
+#   Compiled once per (Book, ForeignLanguage) and reused until its Translations change.
+def get_markup(book, foreign_language, translations):
+    key = (book.id, foreign_language.id)
+    signature = (foreign_language.uses_latin_script, translations_signature(translations))
+
+    cached = _markups.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    markup = TranslationMarkup(translations, foreign_language)
+    _markups[key] = (signature, markup)
+    return markup
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('language', '0041_auto_20210502_0807'),
+        ('read', '0015_auto_20210503_0406'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_count', models.PositiveIntegerField(default=0)),
+                ('translatable_word_count', models.PositiveIntegerField(default=0)),
+                ('english_word_count', models.PositiveIntegerField(default=0, help_text="Number of non-unique English words in the Book's Pages")),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='read.book')),
+            ],
+            options={
+                'verbose_name_plural': 'book stats',
+                'ordering': ['book'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookLanguageStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('words_to_learn', models.PositiveIntegerField(default=0, help_text="Number of the Book's TranslatableWords with a Translation in this language")),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='language_stats', to='read.book')),
+                ('foreign_language', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='book_stats', to='language.foreignlanguage')),
+            ],
+            options={
+                'verbose_name_plural': 'book language stats',
+                'ordering': ['book', 'foreign_language'],
+                'unique_together': {('book', 'foreign_language')},
+            },
+        ),
+    ]
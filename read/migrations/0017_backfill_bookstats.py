@@ -0,0 +1,42 @@
+# Generated by Django 3.1.14 on 2026-10-18 13:40
+
+from django.db import migrations
+from django.db.models import Count
+import nltk
+
+
+# Create BookStats for every existing Book, as the catalogue reads page counts from them
+# A copy of read.stats.calculate_book_stats as it was, so later changes to it cannot break this migration
+def backfill_bookstats(apps, schema_editor):
+    Book = apps.get_model('read', 'Book')
+    BookStats = apps.get_model('read', 'BookStats')
+    Page = apps.get_model('read', 'Page')
+
+    books = (Book.objects
+        .filter(stats__isnull=True)
+        .annotate(
+            page_count=Count('pages', distinct=True),
+            translatable_word_count=Count('translatable_words', distinct=True))
+        .order_by('id')
+        .values_list('id', 'page_count', 'translatable_word_count'))
+    for book_id, page_count, translatable_word_count in books.iterator():
+        english_word_count = 0
+        for text in Page.objects.filter(book_id=book_id).values_list('text', flat=True):
+            words = nltk.tokenize.word_tokenize(text)
+            english_word_count += len([w for w in words if w.isalnum()])
+        BookStats.objects.create(
+            book_id = book_id,
+            page_count = page_count,
+            translatable_word_count = translatable_word_count,
+            english_word_count = english_word_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('read', '0016_booklanguagestats_bookstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_bookstats, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,28 @@ from django.db import models
 import nltk
 
 
+# Returns a string
+#   representing how "difficult" a book is, with respect to the amount of foreign words
+def difficulty_rating(words_to_learn):
+    if words_to_learn <= 11:
+        return 'Easy'
+    elif words_to_learn <= 15:
+        return 'Medium'
+    else:
+        return 'Hard'
+
+
+# Returns a string
+#   representing how "long" a book is, with respect to the amount of English words in total
+def length_rating(english_word_count):
+    if english_word_count <= 700:
+        return 'Short'
+    elif english_word_count <= 1000:
+        return 'Medium'
+    else:
+        return 'Long'
+
+
 class Author(models.Model):
     forename = models.CharField(max_length=50)
     surname = models.CharField(max_length=50)
@@ -79,14 +101,34 @@ class Book(models.Model):
             return False
         return True
     
+    # Returns a QuerySet of Translations
+    #   for the TranslatableWords used by this Book for a given ForeignLanguage.
+    #   Related TranslatableWords and ForeignLanguages are fetched in the same query.
+    def translations(self, foreign_language):
+        from language.models import Translation
+        return (Translation.objects
+            .filter(translatable_word__books = self)
+            .filter(foreign_language = foreign_language)
+            .select_related('translatable_word', 'foreign_language')
+            .order_by('translatable_word__english_word', 'id'))
+
     # Returns a list of Translations
     #   for the TranslatableWords used by this Book for a given ForeignLanguage.
+    #   One Translation per TranslatableWord, fetched in a single query.
+    #   The result is remembered by this Book instance until the Book's version stamp changes,
+    #   which read.signals does whenever its TranslatableWords or their Translations change.
     def available_translations(self, foreign_language):
-        return [
-            tw.translation(foreign_language)
-            for tw in self.translatable_words.all()
-            if tw.translation(foreign_language) is not None
-        ]
+        from .rendering import book_version
+        version = book_version(self.id)
+        available = self.__dict__.get('_available_translations')
+        if available is None or available['version'] != version:
+            available = self.__dict__['_available_translations'] = {'version': version}
+        if foreign_language.id not in available:
+            translations = {}
+            for t in self.translations(foreign_language):
+                translations.setdefault(t.translatable_word_id, t)
+            available[foreign_language.id] = list(translations.values())
+        return available[foreign_language.id]
 
     # Returns an int
     #   for the amount of words that can be learnt from this Book for a given ForeignLanguage.
@@ -96,12 +138,7 @@ class Book(models.Model):
     # Returns a string
     #   representing how "difficult" the book is, with respect to the amount of foreign words
     def difficulty(self, foreign_language):
-        if self.words_to_learn(foreign_language) <= 11:
-            return 'Easy'
-        elif self.words_to_learn(foreign_language) <= 15:
-            return 'Medium'
-        else:
-            return 'Hard'
+        return difficulty_rating(self.words_to_learn(foreign_language))
     
     # Returns an int
     #   for the number of non-unique English words in the Book's Pages
@@ -114,12 +151,7 @@ class Book(models.Model):
     #   representing how "long" the book is, with respect to the amount of English words in total
     @property
     def length(self):
-        if self.english_word_count <= 700:
-            return 'Short'
-        elif self.english_word_count <= 1000:
-            return 'Medium'
-        else:
-            return 'Long'
+        return length_rating(self.english_word_count)
     
     def __str__(self):
         return self.title
@@ -157,3 +189,49 @@ class Page(models.Model):
 
     class Meta:
         ordering = ['book', 'number',]
+
+
+class BookStats(models.Model):
+    book = models.OneToOneField(to=Book, on_delete=models.CASCADE, related_name='stats')
+    page_count = models.PositiveIntegerField(default=0)
+    translatable_word_count = models.PositiveIntegerField(default=0)
+    english_word_count = models.PositiveIntegerField(
+        help_text='Number of non-unique English words in the Book\'s Pages',
+        default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    @property
+    def has_pages(self):
+        return self.page_count > 0
+
+    @property
+    def length(self):
+        return length_rating(self.english_word_count)
+
+    def __str__(self):
+        return f'{self.book} : {self.page_count} pages, {self.english_word_count} words'
+
+    class Meta:
+        ordering = ['book']
+        verbose_name_plural = 'book stats'
+
+
+class BookLanguageStats(models.Model):
+    book = models.ForeignKey(to=Book, on_delete=models.CASCADE, related_name='language_stats')
+    foreign_language = models.ForeignKey(to='language.ForeignLanguage', on_delete=models.CASCADE, related_name='book_stats')
+    words_to_learn = models.PositiveIntegerField(
+        help_text='Number of the Book\'s TranslatableWords with a Translation in this language',
+        default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    @property
+    def difficulty(self):
+        return difficulty_rating(self.words_to_learn)
+
+    def __str__(self):
+        return f'{self.book} : ({self.foreign_language.key}) {self.words_to_learn} words to learn'
+
+    class Meta:
+        ordering = ['book', 'foreign_language']
+        unique_together = ['book', 'foreign_language']
+        verbose_name_plural = 'book language stats'
@@ -0,0 +1,74 @@
+from .markup import get_markup
+from django.core.cache import cache
+import nltk, uuid
+
+
+# Rendered Pages rarely change and are invalidated by version stamps
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+# Returns a string
+#   which is a new, unique version stamp.
+#   Random rather than incremented, so a stamp lost from the cache can never be reissued.
+def new_version():
+    return uuid.uuid4().hex
+
+
+def version_key(book_id):
+    return f'read:version:{book_id}'
+
+
+# Returns a string
+#   which is the current version stamp for a Book's rendered Pages.
+def book_version(book_id):
+    return cache.get_or_set(version_key(book_id), new_version, timeout=None)
+
+
+# Invalidate rendered Pages for the given Books in every ForeignLanguage.
+def bump_versions(book_ids):
+    cache.set_many(
+        {version_key(book_id): new_version() for book_id in book_ids},
+        timeout=None)
+
+
+CATALOGUE_VERSION_KEY = 'read:version:catalogue'
+
+
+# Returns a string
+#   which is the current version stamp for the Book catalogue.
+def catalogue_version():
+    return cache.get_or_set(CATALOGUE_VERSION_KEY, new_version, timeout=None)
+
+
+# Invalidate cached catalogue fragments, e.g. when a Book is added or gains its first Page.
+def bump_catalogue_version():
+    cache.set(CATALOGUE_VERSION_KEY, new_version(), timeout=None)
+
+
+def rendered_pages_key(book, foreign_language):
+    return (f'read:pages:{book.id}:{foreign_language.id}:'
+        f'{int(foreign_language.uses_latin_script)}:{book_version(book.id)}')
+
+
+# Returns a list of lists of strings
+#   for each of a Book's Pages in order, where each string is a sentence of HTML.
+#   English words with a Translation in the given ForeignLanguage are made interactable.
+#   Pages may be given if they have already been fetched, ordered by number.
+def render_pages(book, foreign_language, pages=None):
+    if pages is None:
+        pages = book.pages.order_by('number')
+    translations = book.available_translations(foreign_language)
+    markup = get_markup(book, foreign_language, translations)
+    page_text_html = markup.apply_all([page.text for page in pages])
+    return [nltk.tokenize.sent_tokenize(pt) for pt in page_text_html]
+
+
+# Returns a list of lists of strings
+#   as render_pages, from the cache where possible.
+def rendered_pages(book, foreign_language, pages=None):
+    key = rendered_pages_key(book, foreign_language)
+    rendered = cache.get(key)
+    if rendered is None:
+        rendered = render_pages(book, foreign_language, pages)
+        cache.set(key, rendered, timeout=CACHE_TIMEOUT)
+    return rendered
@@ -0,0 +1,88 @@
+from .models import Book, BookStats, Page
+from .rendering import bump_catalogue_version, bump_versions
+from .stats import refresh_book_stats_on_commit, refresh_language_stats
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from language.models import TranslatableWord, Translation
+
+
+# Rendered Pages and BookStats depend on a Book's Pages and the Translations of its TranslatableWords.
+# Any change to these bumps the Book's version stamp, invalidating its cached Pages,
+# and refreshes the BookStats and BookLanguageStats of the affected Books only.
+# BookStats tokenise every Page, so they are refreshed once per Book when the transaction commits.
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def book_changed(sender, instance, **kwargs):
+    # A new Book has no Pages or TranslatableWords yet
+    # Its BookStats are created now and kept up to date, so the catalogue can rely on them
+    if kwargs.get('created'):
+        BookStats.objects.get_or_create(book = instance)
+    bump_catalogue_version()
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def page_changed(sender, instance, **kwargs):
+    bump_versions([instance.book_id])
+    refresh_book_stats_on_commit([instance.book_id])
+
+    # A Book's first or last Page changes whether it is readable
+    bump_catalogue_version()
+
+
+@receiver(post_save, sender=Translation)
+@receiver(post_delete, sender=Translation)
+def translation_changed(sender, instance, **kwargs):
+    book_ids = list(Book.objects
+        .filter(translatable_words__id=instance.translatable_word_id)
+        .values_list('id', flat=True))
+    bump_versions(book_ids)
+    refresh_language_stats(book_ids, [instance.foreign_language_id])
+
+
+@receiver(post_save, sender=TranslatableWord)
+def translatable_word_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_versions(instance.books.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=TranslatableWord)
+def translatable_word_deleting(sender, instance, **kwargs):
+    # Remember the Books while the links still exist
+    instance._book_ids = list(instance.books.values_list('id', flat=True))
+    bump_versions(instance._book_ids)
+
+
+@receiver(post_delete, sender=TranslatableWord)
+def translatable_word_deleted(sender, instance, **kwargs):
+    book_ids = getattr(instance, '_book_ids', [])
+    refresh_book_stats_on_commit(book_ids)
+    refresh_language_stats(book_ids)
+
+
+@receiver(m2m_changed, sender=TranslatableWord.books.through)
+def translatable_word_books_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # Remember the Books while the links still exist
+        if reverse:
+            instance._cleared_book_ids = [instance.pk]
+        else:
+            instance._cleared_book_ids = list(instance.books.values_list('id', flat=True))
+        return
+
+    if action == 'post_clear':
+        book_ids = getattr(instance, '_cleared_book_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            # Changed from the Book side, e.g. book.translatable_words.add(...)
+            book_ids = [instance.pk]
+        else:
+            book_ids = list(pk_set)
+    else:
+        return
+
+    bump_versions(book_ids)
+    refresh_book_stats_on_commit(book_ids)
+    refresh_language_stats(book_ids)
@@ -0,0 +1,192 @@
+from .models import Book, BookLanguageStats, BookStats, Page
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from language.models import ForeignLanguage, Translation
+import nltk, threading
+
+
+# Per thread set of Book IDs whose BookStats are refreshed when the current transaction commits
+_pending = threading.local()
+
+
+# Returns a dict
+#   mapping Book IDs to dicts of BookStats field values, calculated from the database.
+def calculate_book_stats(book_ids):
+    stats = {
+        book['id']: {
+            'page_count': book['page_count'],
+            'translatable_word_count': book['translatable_word_count'],
+            'english_word_count': 0,
+        }
+        for book in Book.objects
+            .filter(id__in=book_ids)
+            .annotate(
+                page_count=Count('pages', distinct=True),
+                translatable_word_count=Count('translatable_words', distinct=True))
+            .order_by()
+            .values('id', 'page_count', 'translatable_word_count')
+    }
+
+    # Count non-unique English words, as Page.english_word_count
+    for book_id, text in Page.objects.filter(book_id__in=stats.keys()).values_list('book_id', 'text'):
+        words = nltk.tokenize.word_tokenize(text)
+        stats[book_id]['english_word_count'] += len([w for w in words if w.isalnum()])
+
+    return stats
+
+
+# Returns a dict
+#   mapping (Book ID, ForeignLanguage ID) tuples to the amount of words to learn.
+#   Pairs with no Translations are omitted.
+def calculate_words_to_learn(book_ids, foreign_language_ids=None):
+    translations = Translation.objects.filter(translatable_word__books__in=book_ids)
+    if foreign_language_ids is not None:
+        translations = translations.filter(foreign_language__in=foreign_language_ids)
+
+    return {
+        (row['translatable_word__books'], row['foreign_language']): row['words_to_learn']
+        for row in translations
+            .order_by()
+            .values('translatable_word__books', 'foreign_language')
+            .annotate(words_to_learn=Count('translatable_word', distinct=True))
+    }
+
+
+# Refresh BookStats for the given Books once the current transaction commits.
+# Saving many Pages in one transaction, e.g. through pages_save or the Book admin's inline formset,
+# then tokenises each Book's Pages once rather than after every save.
+def refresh_book_stats_on_commit(book_ids):
+    book_ids = set(book_ids)
+    if not book_ids:
+        return
+    pending = getattr(_pending, 'book_ids', None)
+    if pending is None:
+        pending = _pending.book_ids = set()
+    pending |= book_ids
+    # Registered every time, as a rolled back transaction discards its callbacks
+    transaction.on_commit(refresh_pending_book_stats)
+
+
+# Refresh BookStats for every Book remembered by refresh_book_stats_on_commit.
+def refresh_pending_book_stats():
+    book_ids = getattr(_pending, 'book_ids', None)
+    if not book_ids:
+        return
+    _pending.book_ids = set()
+    refresh_book_stats(book_ids)
+
+
+# Recalculate existing BookStats for the given Books.
+# BookStats are created with their Book, see read.signals, so none are created here:
+#   Pages deleted along with their Book would otherwise create BookStats for it again.
+def refresh_book_stats(book_ids):
+    book_ids = set(book_ids)
+    if not book_ids:
+        return
+    rows = list(BookStats.objects.filter(book_id__in=book_ids))
+    if not rows:
+        return
+
+    stats = calculate_book_stats([row.book_id for row in rows])
+    now = timezone.now()
+    for row in rows:
+        for field, value in stats.get(row.book_id, {}).items():
+            setattr(row, field, value)
+        row.last_updated = now
+    BookStats.objects.bulk_update(
+        rows,
+        ['page_count', 'translatable_word_count', 'english_word_count', 'last_updated'])
+
+
+# Recalculate BookLanguageStats for the given Books and, optionally, ForeignLanguages,
+# creating any which are missing.
+def refresh_language_stats(book_ids, foreign_language_ids=None):
+    book_ids = set(Book.objects.filter(id__in=set(book_ids)).values_list('id', flat=True))
+    if not book_ids:
+        return
+    if foreign_language_ids is None:
+        foreign_language_ids = ForeignLanguage.objects.values_list('id', flat=True)
+    foreign_language_ids = set(foreign_language_ids)
+
+    words_to_learn = calculate_words_to_learn(book_ids, foreign_language_ids)
+    missing = {
+        (book_id, foreign_language_id)
+        for book_id in book_ids
+        for foreign_language_id in foreign_language_ids
+    }
+    rows = list(BookLanguageStats.objects
+        .filter(book_id__in=book_ids)
+        .filter(foreign_language__in=foreign_language_ids))
+    now = timezone.now()
+    for row in rows:
+        row.words_to_learn = words_to_learn.get((row.book_id, row.foreign_language_id), 0)
+        row.last_updated = now
+        missing.discard((row.book_id, row.foreign_language_id))
+    BookLanguageStats.objects.bulk_update(rows, ['words_to_learn', 'last_updated'])
+
+    # A concurrent request may have created some of these already
+    BookLanguageStats.objects.bulk_create([
+        BookLanguageStats(
+            book_id = book_id,
+            foreign_language_id = foreign_language_id,
+            words_to_learn = words_to_learn.get((book_id, foreign_language_id), 0))
+        for book_id, foreign_language_id in missing
+    ], ignore_conflicts=True)
+
+
+# Returns a BookStats
+#   for a Book.
+#   If it has not been calculated yet, e.g. before rebuild_book_stats has run,
+#   an unsaved BookStats is calculated instead, so requests never write to the table.
+def book_stats(book):
+    try:
+        return book.stats
+    except BookStats.DoesNotExist:
+        return BookStats(book=book, **calculate_book_stats([book.id])[book.id])
+
+
+# Returns a BookLanguageStats
+#   for a Book in a given ForeignLanguage.
+#   If it has not been calculated yet, an unsaved BookLanguageStats is calculated instead.
+def book_language_stats(book, foreign_language):
+    stats = BookLanguageStats.objects.filter(book=book, foreign_language=foreign_language).first()
+    if stats is None:
+        words_to_learn = calculate_words_to_learn([book.id], [foreign_language.id])
+        stats = BookLanguageStats(
+            book = book,
+            foreign_language = foreign_language,
+            words_to_learn = words_to_learn.get((book.id, foreign_language.id), 0))
+    return stats
+
+
+# Recalculate all BookStats and BookLanguageStats in bulk.
+# Returns a tuple
+#   of the number of BookStats and BookLanguageStats created.
+def rebuild_stats(batch_size=500):
+    book_ids = list(Book.objects.values_list('id', flat=True))
+    foreign_language_ids = list(ForeignLanguage.objects.values_list('id', flat=True))
+
+    stats = calculate_book_stats(book_ids)
+    words_to_learn = calculate_words_to_learn(book_ids)
+
+    book_rows = [
+        BookStats(book_id=book_id, **values)
+        for book_id, values in stats.items()
+    ]
+    language_rows = [
+        BookLanguageStats(
+            book_id = book_id,
+            foreign_language_id = foreign_language_id,
+            words_to_learn = words_to_learn.get((book_id, foreign_language_id), 0))
+        for book_id in book_ids
+        for foreign_language_id in foreign_language_ids
+    ]
+
+    with transaction.atomic():
+        BookStats.objects.all().delete()
+        BookLanguageStats.objects.all().delete()
+        BookStats.objects.bulk_create(book_rows, batch_size=batch_size)
+        BookLanguageStats.objects.bulk_create(language_rows, batch_size=batch_size)
+
+    return len(book_rows), len(language_rows)
@@ -0,0 +1,62 @@
+from django.test import TestCase
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from read.markup import TranslationMarkup, get_markup
+from read.models import Author, Book
+import tempfile
+
+
+class TranslationMarkupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        fl_swedish = ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = True,
+            duolingo_learners = 1260000)
+        english_words = ['dog', 'top', 'cat']
+        foreign_words = ['hund', 'topp', 'katt']
+        for i in range(len(english_words)):
+            Translation.objects.create(
+                translatable_word = TranslatableWord.objects.create(english_word=english_words[i]),
+                foreign_language = fl_swedish,
+                foreign_word = foreign_words[i])
+
+    def setUp(self):
+        self.foreign_language = ForeignLanguage.objects.get(key='sv')
+        self.translations = list(Translation.objects.all())
+        self.markup = TranslationMarkup(self.translations, self.foreign_language)
+
+    def test_markup_whole_words(self):
+        text = self.markup.apply('A dog and a doghouse.')
+        self.assertEqual(text.count('data-translation-id'), 1)
+        self.assertIn('>hund</a>', text)
+        self.assertIn('doghouse', text)
+
+    def test_markup_ignores_case(self):
+        text = self.markup.apply('Dog, DOG, dog.')
+        self.assertEqual(text.count('>hund</a>'), 3)
+
+    def test_markup_does_not_rematch_html(self):
+        # 'top' appears in the inserted HTML as data-placement="top"
+        text = self.markup.apply('A cat on top.')
+        self.assertEqual(text.count('data-translation-id'), 2)
+        self.assertEqual(text.count('>topp</a>'), 1)
+
+    def test_markup_no_translations(self):
+        markup = TranslationMarkup([], self.foreign_language)
+        self.assertEqual(markup.apply('A dog.'), 'A dog.')
+
+    def test_get_markup_reused(self):
+        book = Book.objects.create(
+            title = 'A Nice Book',
+            author = Author.objects.create(forename='First', surname='Last'),
+            source_url = 'url.com',)
+        markup = get_markup(book, self.foreign_language, self.translations)
+        self.assertIs(get_markup(book, self.foreign_language, self.translations), markup)
+
+        # Editing a Translation compiles a new TranslationMarkup
+        translation = self.translations[0]
+        translation.foreign_word = 'vovve'
+        self.assertIsNot(get_markup(book, self.foreign_language, self.translations), markup)
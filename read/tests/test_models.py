@@ -1,4 +1,5 @@
 from django.test import TestCase
+from language.models import ForeignLanguage, TranslatableWord, Translation
 from read.models import Author, Book, Page
 from users.models import CustomUser
 import tempfile
@@ -58,6 +59,43 @@ class BookModelTest(TestCase):
         self.assertTrue(book.has_pages)
         self.assertEqual(book.page_count, 5)
 
+    def test_book_available_translations(self):
+        author = Author.objects.get(forename='First')
+        book = Book.objects.create(
+            title = 'Book with Translations',
+            author = author,
+            source_url = 'url.com')
+        fl_swedish = ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = True,
+            duolingo_learners = 1260000)
+        for i in range(20):
+            tw = TranslatableWord.objects.create(english_word=f'word{i:02}')
+            tw.books.add(book)
+            if i % 2 == 0:
+                Translation.objects.create(
+                    translatable_word = tw,
+                    foreign_language = fl_swedish,
+                    foreign_word = f'ord{i:02}')
+
+        # One query, reused by words_to_learn and difficulty
+        with self.assertNumQueries(1):
+            translations = book.available_translations(fl_swedish)
+            self.assertEqual(book.words_to_learn(fl_swedish), 10)
+            self.assertEqual(book.difficulty(fl_swedish), 'Easy')
+            self.assertEqual(translations[0].translatable_word.english_word, 'word00')
+            self.assertEqual(translations[0].foreign_language.key, 'sv')
+
+        # Changes to the Book's Translations are seen by the same instance
+        Translation.objects.create(
+            translatable_word = TranslatableWord.objects.get(english_word='word01'),
+            foreign_language = fl_swedish,
+            foreign_word = 'ord01')
+        self.assertEqual(book.words_to_learn(fl_swedish), 11)
+
 
 class PageModelTest(TestCase):
     @classmethod
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from read.checks import check_shared_cache
+from read.models import Author, Book, Page
+from read.rendering import book_version, rendered_pages
+import tempfile
+
+
+class RenderedPagesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        fl_swedish = ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = True,
+            duolingo_learners = 1260000)
+        book = Book.objects.create(
+            title = 'A Nice Book',
+            author = Author.objects.create(forename='First', surname='Last'),
+            source_url = 'url.com',)
+        Page.objects.create(book=book, number=1, text='A dog. A cat.')
+        Page.objects.create(book=book, number=2, text='A bird.')
+        tw = TranslatableWord.objects.create(english_word='dog')
+        tw.books.add(book)
+        Translation.objects.create(
+            translatable_word = tw,
+            foreign_language = fl_swedish,
+            foreign_word = 'hund')
+
+    def setUp(self):
+        cache.clear()
+        self.book = Book.objects.get(title='A Nice Book')
+        self.foreign_language = ForeignLanguage.objects.get(key='sv')
+
+    def test_rendered_pages(self):
+        pages = rendered_pages(self.book, self.foreign_language)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(len(pages[0]), 2)
+        self.assertIn('>hund</a>', pages[0][0])
+        self.assertEqual(pages[1], ['A bird.'])
+
+    def test_rendered_pages_cached(self):
+        pages = rendered_pages(self.book, self.foreign_language)
+        with self.assertNumQueries(0):
+            self.assertEqual(rendered_pages(self.book, self.foreign_language), pages)
+
+    def test_page_change_bumps_version(self):
+        version = book_version(self.book.id)
+        Page.objects.create(book=self.book, number=3, text='A dog again.')
+        self.assertNotEqual(book_version(self.book.id), version)
+        self.assertEqual(len(rendered_pages(self.book, self.foreign_language)), 3)
+
+    def test_translation_change_bumps_version(self):
+        rendered_pages(self.book, self.foreign_language)
+        translation = Translation.objects.get(foreign_word='hund')
+        translation.foreign_word = 'vovve'
+        translation.save()
+        pages = rendered_pages(self.book, self.foreign_language)
+        self.assertIn('>vovve</a>', pages[0][0])
+
+    def test_translatable_word_books_change_bumps_version(self):
+        rendered_pages(self.book, self.foreign_language)
+        tw = TranslatableWord.objects.create(english_word='cat')
+        Translation.objects.create(
+            translatable_word = tw,
+            foreign_language = self.foreign_language,
+            foreign_word = 'katt')
+        self.book.translatable_words.add(tw)
+        pages = rendered_pages(self.book, self.foreign_language)
+        self.assertIn('>katt</a>', pages[0][1])
+
+        tw.books.remove(self.book)
+        pages = rendered_pages(self.book, self.foreign_language)
+        self.assertNotIn('>katt</a>', pages[0][1])
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_locmem_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['read.E001'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django_redis.cache.RedisCache'}})
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,105 @@
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TransactionTestCase
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from read.models import Author, Book, BookLanguageStats, BookStats, Page
+from read.stats import book_language_stats, book_stats, calculate_book_stats
+from unittest import mock
+import io, tempfile
+
+
+class BookStatsTest(TransactionTestCase):
+    # BookStats are refreshed when changes commit, which TestCase never does
+
+    def setUp(self):
+        fl_swedish = ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            uses_latin_script = True,
+            duolingo_learners = 1260000)
+        book = Book.objects.create(
+            title = 'A Nice Book',
+            author = Author.objects.create(forename='First', surname='Last'),
+            source_url = 'url.com',)
+        Page.objects.create(book=book, number=1, text='A dog. A cat.')
+        for english_word, foreign_word in [('dog', 'hund'), ('cat', 'katt')]:
+            tw = TranslatableWord.objects.create(english_word=english_word)
+            tw.books.add(book)
+            Translation.objects.create(
+                translatable_word = tw,
+                foreign_language = fl_swedish,
+                foreign_word = foreign_word)
+
+        self.book = Book.objects.get(title='A Nice Book')
+        self.foreign_language = ForeignLanguage.objects.get(key='sv')
+
+    def test_book_stats(self):
+        stats = book_stats(self.book)
+        self.assertEqual(stats.page_count, 1)
+        self.assertEqual(stats.translatable_word_count, 2)
+        self.assertEqual(stats.english_word_count, self.book.english_word_count)
+        self.assertEqual(stats.length, self.book.length)
+
+    def test_book_stats_not_saved(self):
+        # Stats not calculated yet are calculated for the request, but not saved
+        BookStats.objects.all().delete()
+        BookLanguageStats.objects.all().delete()
+        self.book.refresh_from_db()
+        self.assertEqual(book_stats(self.book).page_count, 1)
+        self.assertEqual(BookStats.objects.count(), 0)
+        self.assertEqual(book_language_stats(self.book, self.foreign_language).words_to_learn, 2)
+        self.assertEqual(BookLanguageStats.objects.count(), 0)
+
+    def test_new_book_has_stats(self):
+        book = Book.objects.create(title='Another Book', author=self.book.author, source_url='url.com')
+        self.assertEqual(BookStats.objects.get(book=book).page_count, 0)
+
+    def test_book_language_stats(self):
+        stats = book_language_stats(self.book, self.foreign_language)
+        self.assertEqual(stats.words_to_learn, 2)
+        self.assertEqual(stats.difficulty, self.book.difficulty(self.foreign_language))
+
+    def test_page_change_refreshes_stats(self):
+        book_stats(self.book)
+        Page.objects.create(book=self.book, number=2, text='Another dog here.')
+        stats = BookStats.objects.get(book=self.book)
+        self.assertEqual(stats.page_count, 2)
+        self.assertEqual(stats.english_word_count, 7)
+
+    def test_page_changes_refresh_stats_once_per_transaction(self):
+        # e.g. the Book admin saving its Page inline formset
+        with mock.patch('read.stats.calculate_book_stats', wraps=calculate_book_stats) as calculate:
+            with transaction.atomic():
+                for number in range(2, 6):
+                    Page.objects.create(book=self.book, number=number, text='Another dog here.')
+                self.assertEqual(BookStats.objects.get(book=self.book).page_count, 1)
+        calculate.assert_called_once()
+        self.assertEqual(BookStats.objects.get(book=self.book).page_count, 5)
+
+    def test_translation_change_refreshes_stats(self):
+        Translation.objects.get(foreign_word='katt').delete()
+        stats = BookLanguageStats.objects.get(book=self.book, foreign_language=self.foreign_language)
+        self.assertEqual(stats.words_to_learn, 1)
+
+    def test_translatable_word_books_change_refreshes_stats(self):
+        book_stats(self.book)
+        book_language_stats(self.book, self.foreign_language)
+        TranslatableWord.objects.get(english_word='dog').books.remove(self.book)
+        self.assertEqual(BookStats.objects.get(book=self.book).translatable_word_count, 1)
+        stats = BookLanguageStats.objects.get(book=self.book, foreign_language=self.foreign_language)
+        self.assertEqual(stats.words_to_learn, 1)
+
+    def test_book_delete(self):
+        book_stats(self.book)
+        book_language_stats(self.book, self.foreign_language)
+        self.book.delete()
+        self.assertEqual(BookStats.objects.count(), 0)
+        self.assertEqual(BookLanguageStats.objects.count(), 0)
+
+    def test_rebuild_book_stats_command(self):
+        call_command('rebuild_book_stats', stdout=io.StringIO())
+        self.assertEqual(BookStats.objects.get(book=self.book).english_word_count, 4)
+        stats = BookLanguageStats.objects.get(book=self.book, foreign_language=self.foreign_language)
+        self.assertEqual(stats.words_to_learn, 2)
@@ -1,9 +1,14 @@
-from django.test import RequestFactory, TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from language.models import ForeignLanguage, TranslatableWord, Translation
-from read.models import Author, Book, Page
-from read.views import pages_save, words_save
+from read.models import Author, Book, BookStats, Page
+from read.stats import calculate_book_stats
+from read.views import BOOKS_PER_PAGE, pages_save, words_save
 from tracking.models import LangySession
+from unittest import mock
 from users.models import CustomUser
 import tempfile
 
@@ -67,15 +72,15 @@ def set_up_test_data():
             pronunciation = pronunciations[i])
 
 
-class BooksViewTest(TestCase):
-    @classmethod
-    def setUpTestData(cls):
+class BooksViewTest(TransactionTestCase):
+    # The catalogue reads page counts from BookStats, which are refreshed when changes commit
+
+    def setUp(self):
         superuser = CustomUser.objects.create_superuser(
             email='superuser@email.com',
             display_name='Superuser',
             password='pass')
-    
-    def setUp(self):
+        cache.clear()
         login = self.client.login(email='superuser@email.com', password='pass')
 
     def test_books_url_path(self):
@@ -94,6 +99,29 @@ class BooksViewTest(TestCase):
         response = self.client.get(reverse('read:books'))
         self.assertIn('books_readable', response.context)
         self.assertIn('books_unreadable', response.context)
+
+    def test_books_paginated(self):
+        author = Author.objects.create(forename='First', surname='Last')
+        for i in range(BOOKS_PER_PAGE + 1):
+            book = Book.objects.create(title=f'Book {i:02}', author=author, source_url='url.com')
+            Page.objects.create(book=book, number=1, text='Just a single sentence')
+        response = self.client.get(reverse('read:books'), {'page': 2})
+        self.assertEqual(response.context['books_readable'].number, 2)
+        self.assertEqual(len(response.context['books_readable']), 1)
+
+    def test_books_query_count(self):
+        author = Author.objects.create(forename='First', surname='Last')
+        query_counts = []
+        for i in range(2):
+            # Add more readable and unreadable Books each time
+            for j in range(10):
+                book = Book.objects.create(title=f'Book {i}-{j}', author=author, source_url='url.com')
+                Page.objects.create(book=book, number=1, text='Just a single sentence')
+                Book.objects.create(title=f'Empty Book {i}-{j}', author=author, source_url='url.com')
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('read:books'))
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
     
 
 class DetailsViewTest(TestCase):
@@ -270,7 +298,25 @@ class PagesSaveViewTest(TestCase):
         response = pages_save(request, book.id)
 
         self.assertEqual(book.pages.count(), 2)
-    
+
+
+class PagesSaveStatsTest(TransactionTestCase):
+    # BookStats are refreshed when the new Pages commit, which TestCase never does
+
+    def setUp(self):
+        set_up_test_data()
+
+    def test_pages_save_refreshes_stats_once(self):
+        book = Book.objects.get(title='A Nice Book')
+        request = RequestFactory().post(reverse('read:pages_save', args=(book.id,)))
+        request.user = CustomUser.objects.get(email='superuser@email.com')
+        request._body = b'{"text_content": ["first page", "second page", "third page"]}'
+        with mock.patch('read.stats.calculate_book_stats', wraps=calculate_book_stats) as calculate:
+            pages_save(request, book.id)
+        calculate.assert_called_once()
+        self.assertEqual(BookStats.objects.get(book=book).page_count, 3)
+        self.assertEqual(BookStats.objects.get(book=book).english_word_count, 6)
+
 
 class WordsManageViewTest(TestCase):
     @classmethod
@@ -458,7 +504,66 @@ class StartReadViewTest(TestCase):
         self.assertTrue(new_session_count > initial_session_count)
 
 
+class ReadViewTest(TestCase):
+    # Maximum SQL statements the reader may issue, regardless of Page count
+    MAX_QUERIES = 12
 
-    
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+
+        # A long Book with the same TranslatableWords
+        book = Book.objects.create(
+            title = 'A Long Book',
+            author = Author.objects.get(forename = 'First'),
+            source_url = 'url.com',)
+        for i in range(60):
+            Page.objects.create(
+                book = book,
+                number = i+1,
+                text = 'My nice dog is yellow. My cat is green and blue!')
+        for tw in TranslatableWord.objects.all():
+            tw.books.add(book)
+
+    def setUp(self):
+        cache.clear()
+        login = self.client.login(email='superuser@email.com', password='pass')
+        set_active_language = self.client.get(reverse('language:set_active_language', args=('Chinese',)))
+
+    def read_url(self, title):
+        book = Book.objects.get(title=title)
+        langy_session = LangySession.objects.create(
+            user = CustomUser.objects.get(email='superuser@email.com'),
+            foreign_language = ForeignLanguage.objects.get(key='zh-cn'),
+            session_type = 'READ',
+            book = book)
+        return reverse('read:read', args=(book.id, langy_session.id))
+
+    def test_read_url_name(self):
+        response = self.client.get(self.read_url('A Nice Book'))
+        self.assertEqual(response.status_code, 200)
 
+    def test_read_uses_template(self):
+        response = self.client.get(self.read_url('A Nice Book'))
+        self.assertTemplateUsed(response, 'read/read.html')
 
+    def test_read_context(self):
+        response = self.client.get(self.read_url('A Long Book'))
+        self.assertIn('book', response.context)
+        self.assertIn('langy_session', response.context)
+        pages = response.context['pages']
+        self.assertEqual([page['number'] for page in pages], list(range(1, 61)))
+        self.assertIn('data-translation-id', pages[0]['sentences'][0])
+
+    def test_read_query_count(self):
+        query_counts = []
+        for title in ['A Nice Book', 'A Long Book']:
+            url = self.read_url(title)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            query_counts.append(len(queries))
+
+        # Query count does not grow with the amount of Pages
+        self.assertEqual(query_counts[0], query_counts[1])
+        self.assertLessEqual(query_counts[1], self.MAX_QUERIES)
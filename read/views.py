@@ -1,48 +1,64 @@
 from .models import Book, Page
+from .rendering import catalogue_version, rendered_pages
+from .stats import book_language_stats, book_stats
 from language.models import ForeignLanguage, TranslatableWord, Translation
 from tracking.models import LangySession, LearningTrace
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import transaction
 from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
 from googletrans import Translator
-import json, nltk, pdfplumber, re
+import json, nltk, pdfplumber
+
+
+BOOKS_PER_PAGE = 24
 
 
 @login_required
 def books(request):
-    books = Book.objects.all()
-    books_readable = []
-    books_unreadable = []
+    # One query for the catalogue, with Author data for each Book
+    # Page counts are read from the precomputed BookStats
+    books = Book.objects.select_related('author')
 
-    for book in books:
-        if book.has_pages:
-            books_readable.append(book)
-        else:
-            books_unreadable.append(book)
+    # Readable Books are shown a page at a time
+    paginator = Paginator(books.filter(stats__page_count__gt=0), BOOKS_PER_PAGE)
+    books_readable = paginator.get_page(request.GET.get('page'))
+
+    # Unreadable Books are only shown to superusers
+    books_unreadable = []
+    if request.user.is_superuser:
+        books_unreadable = books.exclude(stats__page_count__gt=0)
 
     context = {
         'books_readable': books_readable,
-        'books_unreadable': books_unreadable
+        'books_unreadable': books_unreadable,
+        'catalogue_version': catalogue_version(),
     }
     return render(request, 'read/books.html', context)
 
 
 @login_required
 def details(request, book_id):
-    book = get_object_or_404(Book, pk=book_id)
+    book = get_object_or_404(Book.objects.select_related('author', 'stats'), pk=book_id)
 
     # User must have an active LearningLanguage
-    if request.user.active_language is None:
+    active_language = request.user.active_language
+    if active_language is None:
         return redirect('language:select')
-    foreign_language = request.user.active_language.foreign_language
+    foreign_language = active_language.foreign_language
+
+    # Precomputed statistics
+    language_stats = book_language_stats(book, foreign_language)
 
     context = {
         'book': book,
-        'words_to_learn': book.words_to_learn(foreign_language),
-        'difficulty': book.difficulty(foreign_language),
+        'stats': book_stats(book),
+        'words_to_learn': language_stats.words_to_learn,
+        'difficulty': language_stats.difficulty,
     }
     return render(request, 'read/details.html', context)
 
@@ -86,16 +102,18 @@ def pages_save(request, book_id):
             json_data = json.loads(request.body)
             text_content = json_data['text_content']
 
-            # Delete existing pages
-            Page.objects.filter(book__id=book_id).delete()
-
-            # Create new pages
-            for i, text in enumerate(text_content, 1):
-                Page.objects.create(
-                    book = book,
-                    number = i,
-                    text = text
-                )
+            # Replace all pages in one transaction, so the BookStats are refreshed once, on commit
+            with transaction.atomic():
+                # Delete existing pages
+                Page.objects.filter(book__id=book_id).delete()
+
+                # Create new pages
+                for i, text in enumerate(text_content, 1):
+                    Page.objects.create(
+                        book = book,
+                        number = i,
+                        text = text
+                    )
                 
             return JsonResponse({'success': True})
 
@@ -221,47 +239,23 @@ def read(request, book_id, langy_session_id):
     book = get_object_or_404(Book, pk=book_id)
     langy_session = get_object_or_404(LangySession, pk=langy_session_id)
 
-    # Get the user's active LearningLanguage and appropriate Translations
+    # Get the user's active LearningLanguage
     foreign_language = request.user.active_language.foreign_language
-    translations = book.available_translations(foreign_language)
 
-    # Build a list of Page text to be manipulated
-    page_text_html = [page.text for page in book.pages.all()]
+    # All Pages in one query, carrying text, number and image
+    book_pages = list(book.pages.order_by('number'))
 
-    # Find and replace whole English words with interactable HTML
-    for t in translations:
-        pattern = rf'\b{t.translatable_word.english_word}\b'
-        
-        if foreign_language.uses_latin_script:
-            button_content = t.foreign_word
-            popover_content = t.foreign_word
-        else:
-            # Display pronunciation instead of native representation
-            # Ensures users can read the word
-            button_content = t.pronunciation
-            popover_content = f'{t.pronunciation} <br> {t.foreign_word}'
-        
-        replacement = (
-            '<span data-toggle="popover" data-placement="top" data-trigger="focus" data-html="true"'
-                f'data-translation-id="{t.id}"'
-                f'title="{t.translatable_word.english_word}"'
-                f'data-content="{popover_content}">'
-                f'<a tabindex="0" class="btn btn-success btn-word" role="button">{button_content}</a>'
-            '</span>')
-        
-        # Perform replacement for each Page
-        for i, pt in enumerate(page_text_html): 
-            page_text_html[i] = re.sub(pattern, replacement, pt, flags=re.IGNORECASE)
+    # Sentences of Page HTML, with whole English words replaced by interactable HTML
+    page_sentences = rendered_pages(book, foreign_language, book_pages)
 
     # Build Page-like dicts for use in the template
     pages = []
-    for i, pt in enumerate(page_text_html):
-        page = {
+    for i, page in enumerate(book_pages):
+        pages.append({
             'number': i+1,
-            'sentences': nltk.tokenize.sent_tokenize(page_text_html[i]),
-            'image': book.pages.get(number=i+1).image
-        }
-        pages.append(page)
+            'sentences': page_sentences[i],
+            'image': page.image
+        })
 
     context = {
         'book': book,
@@ -1,4 +1,4 @@
-from .models import LangySession, LearningTrace
+from .models import CurrentTrace, LangySession, LearningTrace
 from django.contrib import admin
 
 
@@ -60,7 +60,28 @@ class LearningTraceAdmin(admin.ModelAdmin):
         return obj.translation.dam
 
     def jar(self, obj):
+        if obj.translation.jar is None:
+            return None
         return '{:.3f}'.format(obj.translation.jar)
     
     def p_trans(self, obj):
         return '{:.3f}'.format(obj.p_trans)
+
+
+@admin.register(CurrentTrace)
+class CurrentTraceAdmin(admin.ModelAdmin):
+    # Main list
+    list_display = ('uid', 'lang', 'eng', 'last_seen', 'seen', 'interacted', 'tested', 'correct',)
+    list_filter = ('user', 'translation__foreign_language',)
+    list_select_related = ('user', 'translation__translatable_word', 'translation__foreign_language', 'trace',)
+    readonly_fields = ['trace',]
+
+    # Additional attributes
+    def uid(self, obj):
+        return obj.user.id
+
+    def lang(self, obj):
+        return obj.translation.foreign_language.key
+
+    def eng(self, obj):
+        return obj.translation.translatable_word.english_word
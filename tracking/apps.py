@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class TrackingConfig(AppConfig):
     name = 'tracking'
+
+    def ready(self):
+        # Connect signal receivers
+        from . import signals
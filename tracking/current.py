@@ -0,0 +1,89 @@
+from .models import CurrentTrace, LearningTrace
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+
+# CurrentTrace rows mirror each user's latest LearningTrace per Translation,
+# so reads never have to walk LearningTrace history.
+# LearningTraces saved one at a time update them through signals,
+# track_translations updates them in bulk alongside its own bulk writes.
+
+
+# Returns a dict
+#   of CurrentTrace field values copied from a LearningTrace.
+def current_trace_values(trace, start_time):
+    return {
+        'trace_id': trace.id,
+        'last_seen': start_time,
+        'seen': trace.seen,
+        'interacted': trace.interacted,
+        'tested': trace.tested,
+        'correct': trace.correct,
+    }
+
+
+# Returns a QuerySet of LearningTraces
+#   which are the latest LearningTrace per user and Translation, from the given LearningTraces.
+def latest_traces_queryset(traces):
+    latest = (LearningTrace.objects
+        .filter(user = OuterRef('user'))
+        .filter(translation = OuterRef('translation'))
+        .order_by('-session__start_time', '-id')
+        .values('id')[:1])
+    return traces.filter(id = Subquery(latest)).select_related('session')
+
+
+# Point the user's CurrentTrace at a LearningTrace, unless a later LearningTrace is already current.
+def update_current_trace(trace):
+    start_time = trace.session.start_time
+    current, created = CurrentTrace.objects.get_or_create(
+        user_id = trace.user_id,
+        translation_id = trace.translation_id,
+        defaults = current_trace_values(trace, start_time))
+    if created:
+        return
+
+    if current.trace_id == trace.id or (start_time, trace.id) > (current.last_seen, current.trace_id):
+        (CurrentTrace.objects
+            .filter(id = current.id)
+            .update(last_updated = timezone.now(), **current_trace_values(trace, start_time)))
+
+
+# Recalculate CurrentTraces from LearningTrace history.
+# Takes a list of (user ID, Translation ID) tuples.
+# Pairs with no LearningTraces left lose their CurrentTrace.
+def refresh_current_traces(pairs):
+    if not pairs:
+        return
+    pairs_filter = Q()
+    for user_id, translation_id in pairs:
+        pairs_filter |= Q(user_id = user_id, translation_id = translation_id)
+
+    with transaction.atomic():
+        CurrentTrace.objects.filter(pairs_filter).delete()
+        CurrentTrace.objects.bulk_create([
+            CurrentTrace(
+                user_id = trace.user_id,
+                translation_id = trace.translation_id,
+                **current_trace_values(trace, trace.session.start_time))
+            for trace in latest_traces_queryset(LearningTrace.objects.filter(pairs_filter))
+        ])
+
+
+# Rebuild every CurrentTrace from LearningTrace history.
+# Returns the amount of CurrentTraces created.
+def rebuild_current_traces(batch_size=500):
+    rows = [
+        CurrentTrace(
+            user_id = trace.user_id,
+            translation_id = trace.translation_id,
+            **current_trace_values(trace, trace.session.start_time))
+        for trace in latest_traces_queryset(LearningTrace.objects.all()).iterator()
+    ]
+
+    with transaction.atomic():
+        CurrentTrace.objects.all().delete()
+        CurrentTrace.objects.bulk_create(rows, batch_size=batch_size)
+
+    return len(rows)
@@ -0,0 +1,59 @@
+import hashlib, torch
+import torch.nn as nn
+
+
+EMBEDDING_DIM = 5   # 5 dimensional word embeddings
+EMBEDDING_SEED = 1  # reproducible results
+
+
+# Returns a string
+#   identifying a vocabulary, from its words in index order.
+def vocabulary_hash(words):
+    return hashlib.sha1('\n'.join(words).encode()).hexdigest()
+
+
+# Returns an Embedding
+#   with a row per word in word_to_ix.
+#   The same vocabulary size always gives the same initial weights.
+def create_embeddings(word_to_ix):
+    with torch.random.fork_rng():
+        torch.manual_seed(EMBEDDING_SEED)
+        return nn.Embedding(len(word_to_ix), EMBEDDING_DIM)
+
+
+# Returns a tuple
+#   of a word_to_ix dictionary and frozen Embedding, extended with a row for each new word.
+#   A new word's row is random, seeded by the word itself, so it does not depend on which
+#   other words were added or in which order.
+def extend_embeddings(word_to_ix, embeddings, new_words):
+    word_to_ix = dict(word_to_ix)
+    rows = [embeddings.weight.detach()]
+    for word in new_words:
+        if word in word_to_ix:
+            continue
+        word_to_ix[word] = len(word_to_ix)
+        generator = torch.Generator().manual_seed(int(vocabulary_hash([word])[:15], 16))
+        rows.append(torch.randn(1, EMBEDDING_DIM, generator=generator))
+    return word_to_ix, nn.Embedding.from_pretrained(torch.cat(rows), freeze=True)
+
+
+# Save an Embedding with the vocabulary it was created for.
+def save_embeddings(path, word_to_ix, embeddings):
+    words = sorted(word_to_ix, key=word_to_ix.get)
+    torch.save({
+        'version': vocabulary_hash(words),
+        'words': words,
+        'weight': embeddings.weight.detach().clone(),
+    }, path)
+
+
+# Returns a tuple
+#   of the version, word_to_ix dictionary and frozen Embedding saved in a file.
+def load_embeddings(path):
+    data = torch.load(path, map_location=torch.device('cpu'))
+    words = data['words']
+    if vocabulary_hash(words) != data['version'] or len(words) != data['weight'].shape[0]:
+        raise ValueError(f'embeddings in {path} do not match their vocabulary')
+
+    word_to_ix = {word: index for index, word in enumerate(words)}
+    return data['version'], word_to_ix, nn.Embedding.from_pretrained(data['weight'], freeze=True)
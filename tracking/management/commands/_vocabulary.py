@@ -1,40 +1,100 @@
+from django.core.cache import cache
 from language.models import Translation
 from tracking.management.commands._slutil import tprint
 import numpy as np
+import os, uuid
 import pandas as pd
 
 
 csv_directory = 'model_data/'
 duolingo_csv = f'{csv_directory}learning_traces_duolingo_subset.csv'
+duolingo_vocabulary = f'{csv_directory}duolingo_vocabulary.npy'
+
+# Version stamp for the vocabulary, changed whenever Translations are added, changed or deleted
+VOCABULARY_VERSION_KEY = 'tracking:vocabulary:version'
+
+# Per process memo of the word_to_ix dict, with the vocabulary version it was built for
+_word_to_ix = {'version': None, 'word_to_ix': None}
+
+
+# Returns an array
+#   of unique foreign words from Duolingo learning traces, sorted alphabetically.
+#   Read from the full csv, which is large.
+def read_duolingo_words():
+    duolingo_df = pd.read_csv(duolingo_csv, usecols=['frn'])
+    return np.unique(duolingo_df['frn'].to_numpy().astype(str))
+
+
+# Save the unique foreign words from Duolingo learning traces as a compact artifact.
+# Returns the amount of words saved.
+def save_duolingo_words():
+    words = read_duolingo_words()
+    with open(duolingo_vocabulary, 'wb') as f:
+        np.save(f, words, allow_pickle=False)
+    return len(words)
+
+
+class VocabularyMissing(Exception):
+    """Raised when the Duolingo vocabulary artifact has not been built with the build_vocabulary command."""
 
 
 # Returns a list
-#   of unique foreign words from Duolingo learning traces and all Langy Translations. 
-#   Sorted alphabetically.
-def get_vocabulary():
-    duolingo_df = None
+#   of unique foreign words from Duolingo learning traces, sorted alphabetically.
+#   Loaded from the saved artifact, which is only built by the build_vocabulary command,
+#   as reading the full csv is far too slow for a request.
+#   Raises VocabularyMissing if it has not been built.
+def get_duolingo_words():
+    if not os.path.exists(duolingo_vocabulary):
+        raise VocabularyMissing(f'{duolingo_vocabulary} does not exist, run: python manage.py build_vocabulary')
+    return np.load(duolingo_vocabulary, allow_pickle=False).tolist()
 
-    try:
-        duolingo_df = pd.read_csv(duolingo_csv)
-    except Exception:
-        tprint(f'could not read {duolingo_csv}')
-        return None
-    duolingo_words = duolingo_df['frn'].unique().tolist()
 
-    langy_words = [t.readable_word for t in Translation.objects.all()]
-    langy_words = sorted(list(set(langy_words)))  # unique and ordered
+# Returns a list
+#   of unique foreign words from all Langy Translations, sorted alphabetically.
+def get_langy_words():
+    langy_words = [t.readable_word for t in Translation.objects.select_related('foreign_language')]
+    return sorted(list(set(langy_words)))  # unique and ordered
+
+
+# Returns a list
+#   of unique foreign words from Duolingo learning traces and all Langy Translations.
+#   Sorted alphabetically.
+#   Raises VocabularyMissing if the Duolingo vocabulary artifact has not been built.
+def get_vocabulary():
+    duolingo_words = get_duolingo_words()
+    langy_words = get_langy_words()
 
     vocabulary = sorted(np.unique(duolingo_words + langy_words))
     tprint(f'vocabulary contains {len(vocabulary)} unique foreign words')
 
     return vocabulary
 
+
+# Returns a string
+#   which is the current vocabulary version stamp.
+def vocabulary_version():
+    return cache.get_or_set(VOCABULARY_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+# Change the vocabulary version stamp, so every process rebuilds its word_to_ix dict.
+def bump_vocabulary_version():
+    cache.set(VOCABULARY_VERSION_KEY, uuid.uuid4().hex, None)
+
+
 # Returns a dictionary
 #   mapping unique foreign words to indices.
+#   Built once per process and rebuilt when the vocabulary version changes.
+#   Raises VocabularyMissing if the Duolingo vocabulary artifact has not been built.
 def get_word_to_ix():
+    version = vocabulary_version()
+    if _word_to_ix['version'] == version:
+        return _word_to_ix['word_to_ix']
+
     vocabulary = get_vocabulary()
     if vocabulary:
-        return {word: index for index, word in enumerate(vocabulary)}
+        word_to_ix = {word: index for index, word in enumerate(vocabulary)}
+        _word_to_ix.update(version=version, word_to_ix=word_to_ix)
+        return word_to_ix
     else:
-        tprint(f'vocabulary is empty')
+        tprint('vocabulary is empty')
         return None
@@ -0,0 +1,106 @@
+"""
+Benchmark transforming foreign words into embed features: the original row-wise pandas apply
+against the vectorised words_to_embeds. Reports wall time and peak memory for each.
+Uses the Duolingo learning traces subset if it exists, otherwise generated words.
+"""
+
+from django.core.management.base import BaseCommand
+from tracking.management.commands._embeddings import EMBEDDING_DIM, create_embeddings
+from tracking.management.commands._slutil import tprint
+from tracking.management.commands.input_csv import csv_directory, words_to_embeds
+import numpy as np
+import os, time, tracemalloc
+import pandas as pd
+import torch
+
+
+# Returns a Tensor
+#   for a foreign word embedding.
+#   e.g. 'lernen' : tensor([[ 0.5695, -0.0698, -0.8072,  0.7015, -0.1184]])
+#   Each Tensor has EMBEDDING_DIM dimensions, where each item is a float.
+def get_embed(word, word_to_ix, embeddings):
+    if word not in word_to_ix:
+        return torch.zeros(1, EMBEDDING_DIM, dtype=torch.long)
+
+    lookup_tensor = torch.tensor([word_to_ix[word]], dtype=torch.long)
+    return embeddings(lookup_tensor)
+
+
+# Get ith item from Tensor in embed column
+def get_embed_item(row, i):
+    return row['embed'][0][i].item()
+
+
+# Transform foreign words into embed features, one row at a time
+# The original implementation of words_to_embeds, kept for comparison
+def words_to_embeds_rowwise(df, word_to_ix, embeddings):
+    df['embed'] = df['frn'].apply(
+        get_embed,
+        word_to_ix=word_to_ix,
+        embeddings=embeddings)
+    for i in range(EMBEDDING_DIM):
+        df[f'frn_{i}'] = df.apply(get_embed_item, i=i, axis=1)
+    df.drop(['frn', 'embed'], axis=1, inplace=True)
+    return df
+
+
+class Command(BaseCommand):
+    help = ('Benchmark transforming foreign words into embed features: '
+            'the original row-wise pandas apply against the vectorised words_to_embeds. '
+            'Reports wall time and peak memory for each.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Number of learning traces')
+        parser.add_argument('--words', type=int, default=3000, help='Number of unique generated words')
+        parser.add_argument(
+            '--csv',
+            default=f'{csv_directory}learning_traces_duolingo_subset.csv',
+            help='Learning traces csv with a frn column, used if it exists')
+
+
+    def handle(self, *args, **kwargs):
+        df = self.learning_traces(kwargs['csv'], kwargs['rows'], kwargs['words'])
+        words = np.unique(df['frn'].to_numpy().astype(str))
+        # Leave one word in ten without an index, as for words missing from the vocabulary
+        known_words = [word for i, word in enumerate(words.tolist()) if i % 10]
+        word_to_ix = {word: index for index, word in enumerate(known_words)}
+        embeddings = create_embeddings(word_to_ix)
+        tprint(f'{len(df)} learning traces, {len(words)} unique words')
+
+        results = {}
+        tprint(f'{"":>12} {"seconds":>10} {"peak MB":>10}')
+        for name, function in [('rowwise', words_to_embeds_rowwise), ('vectorised', words_to_embeds)]:
+            frame = df.copy()
+            tracemalloc.start()
+            start = time.perf_counter()
+            with torch.no_grad():
+                results[name] = function(frame, word_to_ix, embeddings)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+            tprint(f'{name:>12} {seconds:>10.3f} {peak:>10.1f}')
+
+        same = np.allclose(
+            results['rowwise'].to_numpy(dtype=np.float64),
+            results['vectorised'].to_numpy(dtype=np.float64))
+        tprint(f'same features: {same}')
+        tprint('done.')
+
+
+    def learning_traces(self, csv, rows, words):
+        if os.path.exists(csv):
+            tprint(f'reading {csv}')
+            return pd.read_csv(csv, nrows=rows)
+
+        tprint(f'{csv} not found, generating learning traces')
+        rng = np.random.default_rng(1)
+        vocabulary = np.array([f'word{i}' for i in range(words)])
+        return pd.DataFrame({
+            'frn': vocabulary[rng.integers(0, words, rows)],
+            'delta': rng.integers(0, 1000000, rows),
+            'seen': rng.integers(0, 20, rows),
+            'interacted': rng.integers(0, 20, rows),
+            'tested': rng.integers(0, 20, rows),
+            'correct': rng.integers(0, 20, rows),
+        })
@@ -0,0 +1,95 @@
+"""
+Benchmark add_learning_traces request latency against the number of Translation IDs per call.
+Runs inside a transaction which is rolled back, so no data is kept.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from language.models import ForeignLanguage, LearningLanguage, TranslatableWord, Translation
+from tracking.management.commands._slutil import tprint
+from tracking.models import LangySession
+from tracking.views import add_learning_traces
+from users.models import CustomUser
+import json, time
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Benchmark add_learning_traces request latency against the number of Translation IDs per call. '
+            'Runs inside a transaction which is rolled back, so no data is kept.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1, 5, 10, 25, 50, 100, 200],
+            help='Numbers of Translation IDs per call')
+        parser.add_argument('--repeats', type=int, default=5, help='Number of timed calls per size')
+
+
+    def handle(self, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                self.benchmark(kwargs['sizes'], kwargs['repeats'])
+                raise Rollback()
+        except Rollback:
+            tprint('rolled back benchmark data')
+        tprint('done.')
+
+
+    def benchmark(self, sizes, repeats):
+        # Benchmark data
+        user = CustomUser.objects.create_user(
+            email = 'benchmark@langy.invalid',
+            display_name = 'Benchmark',
+            password = None)
+        foreign_language = ForeignLanguage.objects.create(
+            key = 'zz',
+            english_name = 'Benchmark',
+            foreign_name = 'Benchmark',
+            duolingo_learners = 0)
+        LearningLanguage.objects.create(user=user, foreign_language=foreign_language)
+        translation_ids = []
+        for i in range(max(sizes)):
+            translation_ids.append(Translation.objects.create(
+                translatable_word = TranslatableWord.objects.create(english_word=f'benchmark{i}'),
+                foreign_language = foreign_language,
+                foreign_word = f'frn{i}').id)
+
+        factory = RequestFactory()
+        url = reverse('tracking:add_learning_traces')
+
+        tprint(f'{"ids":>6} {"ms/call":>10} {"queries":>8}')
+        for size in sizes:
+            timings = []
+            queries = 0
+            for repeat in range(repeats):
+                # Every other call is a new LangySession: alternates creating and updating traces
+                if repeat % 2 == 0:
+                    langy_session = LangySession.objects.create(
+                        user = user,
+                        foreign_language = foreign_language,
+                        session_type = 'READ')
+
+                request = factory.post(url, content_type='application/json', data=json.dumps({
+                    'langy_session_id': langy_session.id,
+                    'translation_ids': translation_ids[:size],
+                    'mode': 'seen',
+                }))
+                request.user = user
+
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    add_learning_traces(request)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries = max(queries, len(captured))
+
+            tprint(f'{size:>6} {sum(timings) / len(timings):>10.3f} {queries:>8}')
@@ -0,0 +1,29 @@
+"""
+Save foreign word embeddings with the vocabulary they were created for, alongside the LangyNet model.
+Word tests use these instead of creating embeddings per request.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tracking.management.commands._embeddings import create_embeddings, save_embeddings
+from tracking.management.commands._slutil import tprint
+from tracking.management.commands._vocabulary import VocabularyMissing, get_word_to_ix
+
+
+class Command(BaseCommand):
+    help = ('Save foreign word embeddings with the vocabulary they were created for, alongside the LangyNet model. '
+            'Word tests use these instead of creating embeddings per request.')
+
+
+    def handle(self, *args, **kwargs):
+        try:
+            word_to_ix = get_word_to_ix()
+        except VocabularyMissing as e:
+            raise CommandError(str(e))
+        if not word_to_ix:
+            raise CommandError('could not build the vocabulary')
+
+        path = settings.LANGYNET_EMBEDDINGS
+        save_embeddings(path, word_to_ix, create_embeddings(word_to_ix))
+        tprint(f'saved embeddings for {len(word_to_ix)} words to {path}')
+        tprint('done.')
@@ -0,0 +1,26 @@
+"""
+Save the unique foreign words from Duolingo learning traces as a compact artifact.
+The vocabulary is then built from this artifact instead of the full csv.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from tracking.management.commands._slutil import tprint
+from tracking.management.commands._vocabulary import (
+    bump_vocabulary_version, duolingo_csv, duolingo_vocabulary, save_duolingo_words)
+
+
+class Command(BaseCommand):
+    help = ('Save the unique foreign words from Duolingo learning traces as a compact artifact. '
+            'The vocabulary is then built from this artifact instead of the full csv.')
+
+
+    def handle(self, *args, **kwargs):
+        tprint(f'reading {duolingo_csv}')
+        try:
+            count = save_duolingo_words()
+        except Exception:
+            raise CommandError(f'could not read {duolingo_csv}')
+        tprint(f'saved {count} unique foreign words to {duolingo_vocabulary}')
+
+        bump_vocabulary_version()
+        tprint('done.')
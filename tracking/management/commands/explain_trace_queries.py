@@ -0,0 +1,217 @@
+"""
+Show database query plans for the LearningTrace and LangySession hot paths on a seeded dataset.
+With --compare, plans are also shown without the hot path indexes.
+Data is seeded into a throwaway test database, which is destroyed afterwards.
+With --current-database, the current database is used instead, which must be a test database,
+inside a transaction which is rolled back.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+from django.utils import timezone
+from language.models import ForeignLanguage, LearningLanguage, TranslatableWord, Translation
+from tracking.current import latest_traces_queryset
+from tracking.management.commands._slutil import tprint
+from tracking.models import CurrentTrace, LangySession, LearningTrace
+from users.models import CustomUser
+import random
+
+
+# Indexes added for the hot paths, as (model, index name)
+HOT_PATH_INDEXES = [
+    (LangySession, 'session_user_type_end_idx'),
+    (LearningTrace, 'trace_user_translation_idx'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+# Returns a bool
+#   which is True if the current database is a test database, safe to seed.
+def is_test_database():
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        return True
+    name = str(connection.settings_dict['NAME'])
+    return name == connection.settings_dict['TEST']['NAME'] or name.startswith(TEST_DATABASE_PREFIX)
+
+
+# Returns a list of (description, QuerySet) tuples
+#   for the hot path queries of a user.
+def hot_path_queries(user, foreign_language, langy_session, translation_ids):
+    return [
+        ('traces_unique_tid', user.traces
+            .filter(translation__foreign_language = foreign_language)
+            .order_by('translation')
+            .values('translation__id')
+            .distinct()),
+        ('track_translations: session traces', LearningTrace.objects
+            .filter(session = langy_session)
+            .filter(translation__id__in = translation_ids)),
+        ('track_translations: current traces', CurrentTrace.objects
+            .filter(user = user)
+            .filter(translation__id__in = translation_ids)),
+        ('latest trace per translation', latest_traces_queryset(user.traces
+            .filter(translation__id__in = translation_ids))),
+        ('start_read / start_test: active sessions', LangySession.objects
+            .filter(user = user)
+            .filter(end_time = None)
+            .filter(session_type = 'READ')),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Show database query plans for the LearningTrace and LangySession hot paths on a seeded dataset. '
+            'Data is seeded into a throwaway test database, which is destroyed afterwards.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of users to seed')
+        parser.add_argument('--translations', type=int, default=2000, help='Number of Translations to seed')
+        parser.add_argument('--traces', type=int, default=100000, help='Number of LearningTraces to seed')
+        parser.add_argument(
+            '--traces-per-session',
+            type=int,
+            default=50,
+            help='Number of LearningTraces per seeded LangySession')
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Also show plans without the hot path indexes')
+        parser.add_argument(
+            '--current-database',
+            action='store_true',
+            help='Seed the current test database inside a transaction which is rolled back')
+
+
+    def handle(self, *args, **kwargs):
+        if kwargs['current_database']:
+            if not is_test_database():
+                raise CommandError(f'{connection.settings_dict["NAME"]} is not a test database, refusing to seed it')
+            if not connection.features.can_rollback_ddl and kwargs['compare']:
+                raise CommandError(f'--compare needs a database which can roll back schema changes, not {connection.vendor}')
+
+            # ANALYZE TABLE commits the transaction on MySQL, so it is skipped there
+            try:
+                with transaction.atomic():
+                    self.seed_and_explain(analyze=connection.vendor != 'mysql', **kwargs)
+                    raise Rollback()
+            except Rollback:
+                tprint('rolled back seeded data')
+
+        else:
+            old_name = connection.settings_dict['NAME']
+            tprint('creating a throwaway test database')
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.seed_and_explain(analyze=True, **kwargs)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                tprint('destroyed the throwaway test database')
+        tprint('done.')
+
+
+    def seed_and_explain(self, analyze, **kwargs):
+        user, foreign_language, langy_session, translation_ids = self.seed(analyze=analyze, **kwargs)
+        queries = hot_path_queries(user, foreign_language, langy_session, translation_ids)
+
+        if kwargs['compare']:
+            self.execute_index_sql('remove_sql')
+            self.explain('without hot path indexes', queries)
+            self.execute_index_sql('create_sql')
+
+        self.explain('with hot path indexes', queries)
+
+
+    # Drop or recreate the hot path indexes
+    def execute_index_sql(self, method):
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, name in HOT_PATH_INDEXES:
+                index = next(index for index in model._meta.indexes if index.name == name)
+                cursor.execute(str(getattr(index, method)(model, schema_editor)))
+
+
+    def explain(self, title, queries):
+        tprint(title)
+        for description, queryset in queries:
+            self.stdout.write(f'-- {description}')
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
+
+
+    def seed(self, users, translations, traces, traces_per_session, analyze, **kwargs):
+        tprint(f'seeding {traces} LearningTraces')
+        random.seed(1)
+        foreign_language = ForeignLanguage.objects.create(
+            key = 'zz',
+            english_name = 'Explain',
+            foreign_name = 'Explain',
+            duolingo_learners = 0)
+        TranslatableWord.objects.bulk_create([
+            TranslatableWord(english_word=f'explain{i}')
+            for i in range(translations)
+        ])
+        translatable_words = TranslatableWord.objects.filter(english_word__startswith='explain')
+        Translation.objects.bulk_create([
+            Translation(
+                translatable_word = translatable_word,
+                foreign_language = foreign_language,
+                foreign_word = f'frn{translatable_word.id}')
+            for translatable_word in translatable_words
+        ])
+        translation_ids = list(Translation.objects
+            .filter(foreign_language = foreign_language)
+            .values_list('id', flat=True))
+        traces_per_session = min(traces_per_session, len(translation_ids))
+
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f'explain{i}@langy.invalid', display_name=f'Explain{i}')
+            for i in range(users)
+        ])
+        seeded_users = list(CustomUser.objects.filter(email__endswith='@langy.invalid'))
+        LearningLanguage.objects.bulk_create([
+            LearningLanguage(user=user, foreign_language=foreign_language)
+            for user in seeded_users
+        ])
+
+        # Sessions are spread over users, with most already ended
+        session_count = max(1, traces // traces_per_session)
+        LangySession.objects.bulk_create([
+            LangySession(
+                user = seeded_users[i % len(seeded_users)],
+                foreign_language = foreign_language,
+                session_type = random.choice(['READ', 'TEST']))
+            for i in range(session_count)
+        ])
+        sessions = list(LangySession.objects.filter(foreign_language = foreign_language).order_by('id'))
+        (LangySession.objects
+            .filter(id__in = [s.id for s in sessions[:-len(seeded_users)]])
+            .update(end_time = timezone.now()))
+
+        batch = []
+        for langy_session in sessions:
+            for translation_id in random.sample(translation_ids, traces_per_session):
+                batch.append(LearningTrace(
+                    user_id = langy_session.user_id,
+                    session = langy_session,
+                    translation_id = translation_id,
+                    seen = 1))
+            if len(batch) >= 10000:
+                LearningTrace.objects.bulk_create(batch)
+                batch = []
+        LearningTrace.objects.bulk_create(batch)
+
+        # Let the query planner see the seeded data
+        if analyze:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'mysql':
+                    cursor.execute('ANALYZE TABLE tracking_learningtrace, tracking_langysession')
+                else:
+                    cursor.execute('ANALYZE')
+
+        langy_session = sessions[-1]
+        user = CustomUser.objects.get(pk = langy_session.user_id)
+        return user, foreign_language, langy_session, translation_ids[:traces_per_session]
@@ -4,37 +4,21 @@ Foreign words are transformed into embed features.
 Outliers are removed and data is standardised.
 """
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from tracking.management.commands._embeddings import EMBEDDING_DIM, create_embeddings, save_embeddings
 from tracking.management.commands._slutil import tprint
 from tracking.management.commands._vocabulary import get_word_to_ix
 import numpy as np
 import pandas as pd
 import torch
-import torch.nn as nn
 
 
 csv_directory = 'model_data/'
 
-EMBEDDING_DIM = 5     # 5 dimensional word embeddings
 torch.manual_seed(1)  # reproducible results
 
 
-# Returns a Tensor
-#   for a foreign word embedding.
-#   e.g. 'lernen' : tensor([[ 0.5695, -0.0698, -0.8072,  0.7015, -0.1184]])
-#   An embedding is a numerical encoding of a string.
-#   Each Tensor has EMBEDDING_DIM dimensions, where each item is a float.
-def get_embed(word, word_to_ix, embeddings):
-    try:
-        ix = word_to_ix[word]
-    except KeyError:
-        # tprint(f'No index for word \'{word}\'')
-        return torch.zeros(1, EMBEDDING_DIM, dtype=torch.long)
-
-    lookup_tensor = torch.tensor([word_to_ix[word]], dtype=torch.long)
-    return embeddings(lookup_tensor)
-
-
 # Normalise a pandas series based on its mean and standard deviation.
 # A mean and std can be optionally provided for reproducible results.
 def standardise(series, verbose=False, series_mean=None, series_std=None):
@@ -53,29 +37,40 @@ def standardise(series, verbose=False, series_mean=None, series_std=None):
     return series_standardised
 
 
-# Get ith item from Tensor in embed column
-def get_embed_item(row, i):
-    return row['embed'][0][i].item()
+# Normalise several columns of a dataframe at once, broadcasting over rows.
+# Takes a dict mapping column names to (mean, std) tuples.
+def standardise_columns(df, means_stds):
+    columns = list(means_stds.keys())
+    means = np.array([mean for mean, std in means_stds.values()])
+    stds = np.array([std for mean, std in means_stds.values()])
+    df[columns] = (df[columns].to_numpy(dtype=np.float64) - means) / stds
+    return df
 
 
 # Transform foreign words into embed features
+#   e.g. 'lernen' : frn_0 ... frn_4 = 0.5695, -0.0698, -0.8072, 0.7015, -0.1184
+#   Words without an index in word_to_ix get zeros.
+#   Vectorised: words are mapped to indices in one pass, and embeds gathered in one lookup.
 def words_to_embeds(df, word_to_ix, embeddings, verbose=False):
+    # Get indices for all foreign words
+    if verbose: tprint('getting indices for foreign words')
+    ix = df['frn'].map(word_to_ix)
+    known = ix.notna().to_numpy()
+
     # Get embeds for all foreign words
     if verbose: tprint('getting embeds for foreign words')
-    df['embed'] = df['frn'].apply(
-        get_embed,
-        word_to_ix=word_to_ix,
-        embeddings=embeddings)
+    lookup_tensor = torch.as_tensor(ix.fillna(0).to_numpy(dtype=np.int64))
+    embeds = embeddings.weight.detach()[lookup_tensor].numpy().astype(np.float64)
+    embeds[~known] = 0
 
     # Create new feature per embed dimension
     if verbose: tprint('creating features for word embeds')
     for i in range(EMBEDDING_DIM):
-        if verbose: tprint(f'embed feature {i+1}/{EMBEDDING_DIM}')
-        df[f'frn_{i}'] = df.apply(get_embed_item, i=i, axis=1)
-    
-    # Drop columns now that foreign words are represented numerically
+        df[f'frn_{i}'] = embeds[:, i]
+
+    # Drop column now that foreign words are represented numerically
     if verbose: tprint('dropping columns')
-    df.drop(['frn', 'embed'], axis=1, inplace=True)
+    df.drop(['frn'], axis=1, inplace=True)
 
     return df
 
@@ -112,7 +107,10 @@ class Command(BaseCommand):
 
         # Stores embeddings for all words
         # Indices from word_to_ix are used to find the embedding for a particular word
-        embeddings = nn.Embedding(len(word_to_ix), EMBEDDING_DIM)
+        # Saved alongside the model, so word tests use the same embeddings
+        embeddings = create_embeddings(word_to_ix)
+        save_embeddings(settings.LANGYNET_EMBEDDINGS, word_to_ix, embeddings)
+        tprint(f'saved embeddings to {settings.LANGYNET_EMBEDDINGS}')
         
         # Replace foreign words with embeddings
         df = words_to_embeds(df, word_to_ix, embeddings, verbose=True)
@@ -0,0 +1,24 @@
+"""Rebuild every CurrentTrace from the latest LearningTrace per user and Translation."""
+
+from django.core.management.base import BaseCommand
+from tracking.current import rebuild_current_traces
+from tracking.management.commands._slutil import tprint
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every CurrentTrace from the latest LearningTrace per user and Translation.'
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of rows to create per INSERT')
+
+
+    def handle(self, *args, **kwargs):
+        tprint('rebuilding current traces')
+        count = rebuild_current_traces(batch_size=kwargs['batch_size'])
+        tprint(f'created {count} CurrentTraces')
+        tprint('done.')
@@ -0,0 +1,52 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:31
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+# Merge duplicate LearningTraces for the same Translation in the same LangySession
+# Keeps the newest, which has the latest statistics, and repoints references to the others
+def merge_duplicate_traces(apps, schema_editor):
+    LearningTrace = apps.get_model('tracking', 'LearningTrace')
+    duplicates = (LearningTrace.objects
+        .order_by()
+        .values('session', 'translation')
+        .annotate(trace_count=Count('id'), keep_id=Max('id'))
+        .filter(trace_count__gt=1))
+
+    for duplicate in duplicates:
+        keep_id = duplicate['keep_id']
+        other_ids = list(LearningTrace.objects
+            .filter(session=duplicate['session'], translation=duplicate['translation'])
+            .exclude(id=keep_id)
+            .values_list('id', flat=True))
+
+        # The kept trace links back to whatever preceded the duplicates
+        outside_prev_id = (LearningTrace.objects
+            .filter(id__in=other_ids, prev__isnull=False)
+            .exclude(prev__in=other_ids + [keep_id])
+            .values_list('prev', flat=True)
+            .first())
+        LearningTrace.objects.filter(id=keep_id, prev__in=other_ids).update(prev=outside_prev_id)
+
+        # Later traces link to the kept trace instead of a duplicate
+        (LearningTrace.objects
+            .filter(prev__in=other_ids)
+            .exclude(id__in=other_ids)
+            .update(prev=keep_id))
+        LearningTrace.objects.filter(id__in=other_ids).delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('language', '0041_auto_20210502_0807'),
+        ('tracking', '0009_auto_20210321_1807'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_traces, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='learningtrace',
+            unique_together={('session', 'translation')},
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+# Backfill a CurrentTrace from the latest LearningTrace per user and Translation
+def backfill_current_traces(apps, schema_editor):
+    CurrentTrace = apps.get_model('tracking', 'CurrentTrace')
+    LearningTrace = apps.get_model('tracking', 'LearningTrace')
+    latest = (LearningTrace.objects
+        .filter(user=OuterRef('user'), translation=OuterRef('translation'))
+        .order_by('-session__start_time', '-id')
+        .values('id')[:1])
+    CurrentTrace.objects.bulk_create([
+        CurrentTrace(
+            user_id = trace.user_id,
+            translation_id = trace.translation_id,
+            trace_id = trace.id,
+            last_seen = trace.session.start_time,
+            seen = trace.seen,
+            interacted = trace.interacted,
+            tested = trace.tested,
+            correct = trace.correct)
+        for trace in LearningTrace.objects.filter(id=Subquery(latest)).select_related('session').iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('language', '0041_auto_20210502_0807'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracking', '0010_learningtrace_unique_session_translation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentTrace',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_seen', models.DateTimeField(help_text='When the LangySession of the latest <b>LearningTrace</b> started')),
+                ('seen', models.PositiveIntegerField(default=0)),
+                ('interacted', models.PositiveIntegerField(default=0)),
+                ('tested', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('trace', models.ForeignKey(help_text="User's latest <b>LearningTrace</b> for this translation", on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracking.learningtrace')),
+                ('translation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='current_traces', to='language.translation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='current_traces', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'translation'],
+                'unique_together': {('user', 'translation')},
+            },
+        ),
+        migrations.RunPython(backfill_current_traces, migrations.RunPython.noop),
+    ]
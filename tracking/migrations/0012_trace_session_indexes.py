@@ -0,0 +1,21 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0011_currenttrace'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='langysession',
+            index=models.Index(fields=['user', 'session_type', 'end_time'], name='session_user_type_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningtrace',
+            index=models.Index(fields=['user', 'translation'], name='trace_user_translation_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0012_trace_session_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currenttrace',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, help_text='When the latest <b>LearningTrace</b> or its statistics last changed'),
+        ),
+    ]
@@ -51,6 +51,10 @@ class LangySession(models.Model):
     class Meta:
         # Oldest first
         ordering = ['start_time']
+        indexes = [
+            # A user's active LangySessions of a type, e.g. when starting to read or test
+            models.Index(fields=['user', 'session_type', 'end_time'], name='session_user_type_end_idx'),
+        ]
 
 
 class LearningTrace(models.Model):
@@ -120,3 +124,38 @@ class LearningTrace(models.Model):
     class Meta:
         # Oldest first, then alphabetically by English word, A to Z
         ordering = ['session__start_time', 'translation__translatable_word__english_word']
+        # One LearningTrace per Translation per LangySession
+        unique_together = ['session', 'translation']
+        indexes = [
+            # A user's LearningTraces for a Translation, e.g. when finding the latest
+            models.Index(fields=['user', 'translation'], name='trace_user_translation_idx'),
+        ]
+
+
+class CurrentTrace(models.Model):
+    user = models.ForeignKey(to=CustomUser, on_delete=models.CASCADE, related_name='current_traces')
+    translation = models.ForeignKey(to=Translation, on_delete=models.CASCADE, related_name='current_traces')
+    trace = models.ForeignKey(
+        help_text='User\'s latest <b>LearningTrace</b> for this translation',
+        to=LearningTrace,
+        on_delete=models.CASCADE,
+        related_name='+')
+    last_seen = models.DateTimeField(
+        help_text='When the LangySession of the latest <b>LearningTrace</b> started')
+    last_updated = models.DateTimeField(
+        help_text='When the latest <b>LearningTrace</b> or its statistics last changed',
+        auto_now=True)
+
+    # Statistics, as in the latest LearningTrace
+    seen = models.PositiveIntegerField(default=0)
+    interacted = models.PositiveIntegerField(default=0)
+    tested = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user} : {self.translation} @ {format_datetime(self.last_seen)}'
+
+    class Meta:
+        ordering = ['user', 'translation']
+        # One CurrentTrace per Translation per user
+        unique_together = ['user', 'translation']
@@ -0,0 +1,63 @@
+from .current import refresh_current_traces, update_current_trace
+from .management.commands._vocabulary import bump_vocabulary_version
+from .models import CurrentTrace, LearningTrace
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from language.models import Translation
+import threading
+
+
+# Per thread set of (user ID, Translation ID) pairs of LearningTraces deleted in the current transaction
+_deleted = threading.local()
+
+
+# Keep CurrentTraces in step with LearningTraces saved or deleted one at a time.
+# Bulk writes bypass these, see track_translations.
+
+
+@receiver(post_save, sender=LearningTrace)
+def learning_trace_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_current_trace(instance)
+
+
+@receiver(post_delete, sender=LearningTrace)
+def learning_trace_deleted(sender, instance, **kwargs):
+    # Remembered until the transaction commits, so deleting many LearningTraces at once,
+    # e.g. along with a user, Translation or LangySession, refreshes CurrentTraces only once
+    pairs = getattr(_deleted, 'pairs', None)
+    if pairs is None:
+        pairs = _deleted.pairs = set()
+    pairs.add((instance.user_id, instance.translation_id))
+    # Registered every time, as a rolled back transaction discards its callbacks
+    transaction.on_commit(refresh_deleted_pairs)
+
+
+# Refresh CurrentTraces for the (user ID, Translation ID) pairs of deleted LearningTraces.
+def refresh_deleted_pairs():
+    pairs = getattr(_deleted, 'pairs', None)
+    if not pairs:
+        return
+    _deleted.pairs = set()
+
+    # Deleting the latest LearningTrace also deletes its CurrentTrace
+    # The previous LearningTrace, if any, is now the latest
+    # Pairs with no LearningTraces left, e.g. after deleting a user, need nothing
+    user_ids = {user_id for user_id, translation_id in pairs}
+    translation_ids = {translation_id for user_id, translation_id in pairs}
+    remaining = set(LearningTrace.objects
+        .filter(user_id__in = user_ids, translation_id__in = translation_ids)
+        .values_list('user_id', 'translation_id')
+        .distinct())
+    current = set(CurrentTrace.objects
+        .filter(user_id__in = user_ids, translation_id__in = translation_ids)
+        .values_list('user_id', 'translation_id'))
+    refresh_current_traces(list((pairs & remaining) - current))
+
+
+# The vocabulary includes every Translation's readable word
+@receiver(post_save, sender=Translation)
+@receiver(post_delete, sender=Translation)
+def translation_changed(sender, instance, **kwargs):
+    bump_vocabulary_version()
@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+from tracking.management.commands._embeddings import create_embeddings
+from tracking.management.commands.benchmark_embeds import words_to_embeds_rowwise
+from tracking.management.commands.input_csv import standardise, standardise_columns, words_to_embeds
+import numpy as np
+import pandas as pd
+
+
+class WordsToEmbedsTest(SimpleTestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'frn': ['hund', 'katt', 'okänd', 'hund'],
+            'delta': [10, 20, 30, 40],
+            'seen': [1, 2, 3, 4],
+        })
+        self.word_to_ix = {'hund': 0, 'katt': 1}
+        self.embeddings = create_embeddings(self.word_to_ix)
+
+    def test_words_to_embeds_matches_rowwise(self):
+        expected = words_to_embeds_rowwise(self.df.copy(), self.word_to_ix, self.embeddings)
+        df = words_to_embeds(self.df.copy(), self.word_to_ix, self.embeddings)
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertTrue(np.allclose(df.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64)))
+        # Words without an index get zeros
+        self.assertEqual(df.loc[2, ['frn_0', 'frn_1', 'frn_2', 'frn_3', 'frn_4']].tolist(), [0, 0, 0, 0, 0])
+
+    def test_standardise_columns(self):
+        df = standardise_columns(self.df.copy(), {'delta': (25, 10), 'seen': (2, 0.5)})
+        self.assertTrue(np.allclose(df['delta'], standardise(self.df['delta'], series_mean=25, series_std=10)))
+        self.assertTrue(np.allclose(df['seen'], standardise(self.df['seen'], series_mean=2, series_std=0.5)))
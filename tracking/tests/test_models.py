@@ -1,9 +1,14 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
 from language.models import ForeignLanguage, LearningLanguage, TranslatableWord, Translation
 from read.models import Author, Book, Page
-from tracking.models import LangySession, LearningTrace
+from tracking.current import latest_traces_queryset, refresh_current_traces
+from tracking.models import CurrentTrace, LangySession, LearningTrace
+from unittest import mock
 from users.models import CustomUser
-import tempfile
+import io, tempfile
 
 
 def set_up_test_data():
@@ -118,3 +123,126 @@ class LearningTraceModelTest(TestCase):
         self.assertEqual(learning_trace.delta, 0)
         self.assertEqual(learning_trace.p_trans, 0)
         
+
+
+class CurrentTraceModelTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(email = 'superuser@email.com')
+        self.translation = Translation.objects.get(translatable_word__english_word = 'nice')
+        self.traces = []
+        for day in range(2):
+            langy_session = LangySession.objects.create(
+                user = self.user,
+                foreign_language = self.user.active_language.foreign_language,
+                session_type = 'READ')
+            langy_session.start_time = timezone.now() - timedelta(days=2-day)
+            langy_session.save()
+            self.traces.append(LearningTrace.objects.create(
+                user = self.user,
+                session = langy_session,
+                translation = self.translation,
+                seen = day + 1))
+
+    def test_current_trace_follows_latest_trace(self):
+        current = CurrentTrace.objects.get(user = self.user, translation = self.translation)
+        self.assertEqual(current.trace, self.traces[1])
+        self.assertEqual(current.last_seen, self.traces[1].session.start_time)
+        self.assertEqual(current.seen, 2)
+
+        # Saving an older LearningTrace leaves the CurrentTrace alone
+        self.traces[0].seen = 5
+        self.traces[0].save()
+        self.assertEqual(CurrentTrace.objects.get(user = self.user).trace, self.traces[1])
+
+    def test_rebuild_current_traces_command(self):
+        CurrentTrace.objects.all().delete()
+        call_command('rebuild_current_traces', stdout=io.StringIO())
+        current = CurrentTrace.objects.get(user = self.user, translation = self.translation)
+        self.assertEqual(current.trace, self.traces[1])
+        self.assertEqual(current.seen, 2)
+
+
+class CurrentTraceDeleteTest(TransactionTestCase):
+    # CurrentTraces are refreshed when the delete commits, which TestCase never does
+
+    def setUp(self):
+        set_up_test_data()
+        self.user = CustomUser.objects.get(email = 'superuser@email.com')
+        self.translations = list(Translation.objects.all())
+        self.sessions = []
+        for day in range(2):
+            langy_session = LangySession.objects.create(
+                user = self.user,
+                foreign_language = self.user.active_language.foreign_language,
+                session_type = 'READ')
+            langy_session.start_time = timezone.now() - timedelta(days=2-day)
+            langy_session.save()
+            self.sessions.append(langy_session)
+            for translation in self.translations:
+                LearningTrace.objects.create(
+                    user = self.user,
+                    session = langy_session,
+                    translation = translation,
+                    seen = day + 1)
+        self.traces = list(LearningTrace.objects
+            .filter(translation = self.translations[0])
+            .order_by('session__start_time'))
+
+    def test_current_trace_after_delete(self):
+        self.traces[1].delete()
+        current = CurrentTrace.objects.get(user = self.user, translation = self.translations[0])
+        self.assertEqual(current.trace, self.traces[0])
+        self.assertEqual(current.seen, 1)
+
+        self.traces[0].delete()
+        self.assertFalse(CurrentTrace.objects.filter(translation = self.translations[0]).exists())
+
+    def test_session_delete_refreshes_once(self):
+        with mock.patch('tracking.signals.refresh_current_traces', wraps=refresh_current_traces) as refresh:
+            self.sessions[1].delete()
+        refresh.assert_called_once()
+        self.assertEqual(len(refresh.call_args[0][0]), len(self.translations))
+        self.assertEqual(
+            set(CurrentTrace.objects.values_list('trace__session', flat=True)),
+            {self.sessions[0].id})
+
+    def test_user_delete_refreshes_nothing(self):
+        with mock.patch('tracking.signals.refresh_current_traces', wraps=refresh_current_traces) as refresh:
+            self.user.delete()
+        refresh.assert_called_once_with([])
+        self.assertEqual(CurrentTrace.objects.count(), 0)
+
+
+class HotPathIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+
+    def test_hot_path_queries_use_indexes(self):
+        user = CustomUser.objects.get(email = 'superuser@email.com')
+        translation = Translation.objects.get(translatable_word__english_word = 'nice')
+        active = (LangySession.objects
+            .filter(user = user)
+            .filter(end_time = None)
+            .filter(session_type = 'READ'))
+        self.assertIn('session_user_type_end_idx', active.explain())
+        latest = latest_traces_queryset(user.traces.filter(translation = translation))
+        self.assertIn('trace_user_translation_idx', latest.explain())
+
+    def test_explain_trace_queries_command(self):
+        stdout = io.StringIO()
+        call_command(
+            'explain_trace_queries',
+            users=2, translations=10, traces=100, traces_per_session=5, current_database=True, stdout=stdout)
+        self.assertIn('session_user_type_end_idx', stdout.getvalue())
+        self.assertEqual(LearningTrace.objects.count(), 0)
+
+    def test_explain_trace_queries_command_refuses_non_test_database(self):
+        with mock.patch('tracking.management.commands.explain_trace_queries.is_test_database', return_value=False):
+            with self.assertRaises(CommandError):
+                call_command('explain_trace_queries', current_database=True, stdout=io.StringIO())
+        self.assertFalse(ForeignLanguage.objects.filter(key='zz').exists())
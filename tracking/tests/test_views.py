@@ -1,11 +1,14 @@
-from django.test import RequestFactory, TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from language.models import ForeignLanguage, LearningLanguage, TranslatableWord, Translation
 from read.models import Author, Book, Page
-from tracking.models import LangySession, LearningTrace
-from tracking.views import add_learning_traces
+from tracking.models import CurrentTrace, LangySession, LearningTrace
+from tracking.views import add_learning_trace_events, add_learning_traces, track_translations
+from unittest import mock, skipIf
 from users.models import CustomUser
-import tempfile
+import json, tempfile, threading, tracking.views
 
 
 def set_up_test_data():
@@ -115,4 +118,210 @@ class AddLearningTracesViewTest(TestCase):
             session_type = 'READ',
             book = Book.objects.get(title = 'A Nice Book'))
         response = self.do_request(langy_session.id, 9999, 8888)
-        self.assertEquals(len(LearningTrace.objects.all()), 0)
\ No newline at end of file
+        self.assertEquals(len(LearningTrace.objects.all()), 0)
+
+    def test_add_learning_traces_existing_and_previous(self):
+        user = CustomUser.objects.get(email = 'superuser@email.com')
+        book = Book.objects.get(title = 'A Nice Book')
+        t1 = Translation.objects.get(translatable_word__english_word = 'dog')
+        t2 = Translation.objects.get(translatable_word__english_word = 'cat')
+        first_session = LangySession.objects.create(
+            user = user,
+            foreign_language = user.active_language.foreign_language,
+            session_type = 'READ',
+            book = book)
+        self.do_request(first_session.id, t1.id, t1.id)
+        self.do_request(first_session.id, t1.id, t2.id)
+        trace = LearningTrace.objects.get(session = first_session, translation = t1)
+        self.assertEquals(trace.seen, 3)
+
+        # New LangySession carries statistics over from the previous LearningTrace
+        second_session = LangySession.objects.create(
+            user = user,
+            foreign_language = user.active_language.foreign_language,
+            session_type = 'READ',
+            book = book)
+        self.do_request(second_session.id, t1.id, t2.id)
+        trace = LearningTrace.objects.get(session = second_session, translation = t1)
+        self.assertEquals(trace.seen, 4)
+        self.assertEquals(trace.prev.session, first_session)
+        current = CurrentTrace.objects.get(user = user, translation = t1)
+        self.assertEquals(current.trace, trace)
+        self.assertEquals(current.last_seen, second_session.start_time)
+        self.assertEquals(current.seen, 4)
+        self.assertEquals(CurrentTrace.objects.get(user = user, translation = t2).seen, 2)
+
+    def test_add_learning_traces_query_count(self):
+        user = CustomUser.objects.get(email = 'superuser@email.com')
+        langy_session = LangySession.objects.create(
+            user = user,
+            foreign_language = user.active_language.foreign_language,
+            session_type = 'READ',
+            book = Book.objects.get(title = 'A Nice Book'))
+        translation_ids = list(Translation.objects.values_list('id', flat=True))
+        query_counts = []
+        for ids in [translation_ids[:2], translation_ids[2:]]:
+            request = RequestFactory().post(reverse('tracking:add_learning_traces'))
+            request.user = user
+            request._body = str.encode(json.dumps({
+                'langy_session_id': langy_session.id,
+                'translation_ids': ids,
+                'mode': 'seen'}))
+            with CaptureQueriesContext(connection) as queries:
+                response = add_learning_traces(request)
+            query_counts.append(len(queries))
+        self.assertEquals(query_counts[0], query_counts[1])
+        self.assertEquals(LearningTrace.objects.count(), len(translation_ids))
+
+
+class AddLearningTraceEventsViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+
+    def setUp(self):
+        login = self.client.login(email='superuser@email.com', password='pass')
+        user = CustomUser.objects.get(email = 'superuser@email.com')
+        self.langy_session = LangySession.objects.create(
+            user = user,
+            foreign_language = user.active_language.foreign_language,
+            session_type = 'READ',
+            book = Book.objects.get(title = 'A Nice Book'))
+        self.t1 = Translation.objects.get(translatable_word__english_word = 'dog')
+        self.t2 = Translation.objects.get(translatable_word__english_word = 'cat')
+
+    def events_data(self):
+        return json.dumps({
+            'langy_session_id': self.langy_session.id,
+            'events': [
+                {'translation_id': self.t1.id, 'mode': 'seen', 'count': 2},
+                {'translation_id': str(self.t1.id), 'mode': 'interacted', 'count': 1},
+                {'translation_id': self.t2.id, 'mode': 'seen', 'count': 1},
+                {'translation_id': self.t2.id, 'mode': 'unknown', 'count': 1},
+                {'translation_id': 9999, 'mode': 'seen', 'count': 1},
+            ]})
+
+    def test_add_learning_trace_events_json(self):
+        response = self.client.post(
+            reverse('tracking:add_learning_trace_events'),
+            data = self.events_data(),
+            content_type = 'application/json')
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(LearningTrace.objects.count(), 2)
+        trace = LearningTrace.objects.get(translation = self.t1)
+        self.assertEquals(trace.seen, 2)
+        self.assertEquals(trace.interacted, 1)
+
+    def test_add_learning_trace_events_beacon(self):
+        # navigator.sendBeacon sends a form, with the CSRF token as a field
+        response = self.client.post(
+            reverse('tracking:add_learning_trace_events'),
+            data = {'data': self.events_data()})
+        self.assertEquals(response.status_code, 200)
+        response = self.client.post(
+            reverse('tracking:add_learning_trace_events'),
+            data = {'data': self.events_data()})
+        trace = LearningTrace.objects.get(translation = self.t1)
+        self.assertEquals(trace.seen, 4)
+        self.assertEquals(trace.interacted, 2)
+
+    def test_add_learning_trace_events_bad_request(self):
+        response = self.client.post(
+            reverse('tracking:add_learning_trace_events'),
+            data = {'data': 'not json'})
+        self.assertEquals(response.status_code, 400)
+
+    def test_add_learning_trace_events_other_user_session(self):
+        other_user = CustomUser.objects.create_user(
+            email='user@email.com',
+            display_name='User',
+            password='pass')
+        self.langy_session.user = other_user
+        self.langy_session.save()
+        response = self.client.post(
+            reverse('tracking:add_learning_trace_events'),
+            data = self.events_data(),
+            content_type = 'application/json')
+        self.assertEquals(response.status_code, 404)
+
+
+class TrackTranslationsConcurrencyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+
+    def test_interleaved_requests_keep_increments(self):
+        user = CustomUser.objects.get(email = 'superuser@email.com')
+        foreign_language = user.active_language.foreign_language
+        translation = Translation.objects.get(translatable_word__english_word = 'dog')
+        first_session = LangySession.objects.create(
+            user = user,
+            foreign_language = foreign_language,
+            session_type = 'READ')
+        track_translations(user, first_session, foreign_language, {translation.id: {'seen': 1}})
+        langy_session = LangySession.objects.create(
+            user = user,
+            foreign_language = foreign_language,
+            session_type = 'READ')
+
+        # Another request commits between this request's reads and writes
+        real_current_traces = tracking.views.current_traces
+        def interleave(*args):
+            current = real_current_traces(*args)
+            if not interleave.done:
+                interleave.done = True
+                track_translations(user, langy_session, foreign_language, {translation.id: {'interacted': 1}})
+            return current
+        interleave.done = False
+
+        with mock.patch('tracking.views.current_traces', side_effect=interleave):
+            track_translations(user, langy_session, foreign_language, {translation.id: {'seen': 1}})
+
+        trace = LearningTrace.objects.get(session = langy_session, translation = translation)
+        self.assertEquals(trace.seen, 2)
+        self.assertEquals(trace.interacted, 1)
+        current = CurrentTrace.objects.get(user = user, translation = translation)
+        self.assertEquals(current.trace, trace)
+        self.assertEquals((current.seen, current.interacted), (2, 1))
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite test databases lock whole tables for concurrent writers')
+class AddLearningTraceEventsParallelTest(TransactionTestCase):
+    THREADS = 8
+    REQUESTS_PER_THREAD = 5
+
+    def setUp(self):
+        set_up_test_data()
+
+    def test_parallel_requests_keep_increments(self):
+        user = CustomUser.objects.get(email = 'superuser@email.com')
+        langy_session = LangySession.objects.create(
+            user = user,
+            foreign_language = user.active_language.foreign_language,
+            session_type = 'READ')
+        translation_ids = list(Translation.objects.values_list('id', flat=True)[:3])
+
+        def do_requests(mode):
+            try:
+                for i in range(self.REQUESTS_PER_THREAD):
+                    request = RequestFactory().post(
+                        reverse('tracking:add_learning_trace_events'),
+                        data = json.dumps({
+                            'langy_session_id': langy_session.id,
+                            'events': [{'translation_id': id, 'mode': mode, 'count': 1} for id in translation_ids]}),
+                        content_type = 'application/json')
+                    request.user = CustomUser.objects.get(pk = user.pk)
+                    add_learning_trace_events(request)
+            finally:
+                connection.close()
+
+        modes = ['seen', 'interacted'] * (self.THREADS // 2)
+        threads = [threading.Thread(target=do_requests, args=(mode,)) for mode in modes]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        expected = self.REQUESTS_PER_THREAD * self.THREADS // 2
+        for id in translation_ids:
+            trace = LearningTrace.objects.get(session = langy_session, translation__id = id)
+            self.assertEquals(trace.seen, expected)
+            self.assertEquals(trace.interacted, expected)
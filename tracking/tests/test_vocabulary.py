@@ -0,0 +1,67 @@
+from django.core.management import call_command
+from django.test import TestCase
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from tracking.management.commands import _vocabulary
+from unittest import mock
+import io, os, shutil, tempfile
+
+
+class VocabularyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.foreign_language = ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            duolingo_learners = 1260000)
+        Translation.objects.create(
+            translatable_word = TranslatableWord.objects.create(english_word='dog'),
+            foreign_language = cls.foreign_language,
+            foreign_word = 'hund')
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        csv_path = os.path.join(directory, 'traces.csv')
+        with open(csv_path, 'w') as f:
+            f.write('frn,delta\nlernen,1\nhaus,2\nlernen,3\n')
+        vocabulary_path = os.path.join(directory, 'vocabulary.npy')
+
+        for name, value in [('duolingo_csv', csv_path), ('duolingo_vocabulary', vocabulary_path)]:
+            patcher = mock.patch.object(_vocabulary, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        call_command('build_vocabulary', stdout=io.StringIO())
+
+    def test_get_word_to_ix(self):
+        word_to_ix = _vocabulary.get_word_to_ix()
+        self.assertEqual(word_to_ix, {'haus': 0, 'hund': 1, 'lernen': 2})
+
+    def test_csv_read_once(self):
+        _vocabulary.get_word_to_ix()
+        with mock.patch.object(_vocabulary.pd, 'read_csv') as read_csv:
+            # Memoised per process
+            with self.assertNumQueries(0):
+                _vocabulary.get_word_to_ix()
+            # Rebuilt from the saved artifact
+            _vocabulary.bump_vocabulary_version()
+            _vocabulary.get_word_to_ix()
+            read_csv.assert_not_called()
+
+    def test_translation_added(self):
+        _vocabulary.get_word_to_ix()
+        Translation.objects.create(
+            translatable_word = TranslatableWord.objects.create(english_word='cat'),
+            foreign_language = self.foreign_language,
+            foreign_word = 'katt')
+        self.assertIn('katt', _vocabulary.get_word_to_ix())
+
+    def test_vocabulary_missing(self):
+        # The csv is never read during a request
+        os.remove(_vocabulary.duolingo_vocabulary)
+        _vocabulary.bump_vocabulary_version()
+        with mock.patch.object(_vocabulary.pd, 'read_csv') as read_csv:
+            with self.assertRaises(_vocabulary.VocabularyMissing):
+                _vocabulary.get_word_to_ix()
+            read_csv.assert_not_called()
@@ -5,4 +5,5 @@ from django.urls import path
 app_name = 'tracking'
 urlpatterns = [
     path('add-learning-traces', views.add_learning_traces, name='add_learning_traces'),
+    path('add-learning-trace-events', views.add_learning_trace_events, name='add_learning_trace_events'),
 ]
@@ -1,11 +1,150 @@
 from language.models import ForeignLanguage, Translation
-from tracking.models import LangySession, LearningTrace
-from django.db.models import Q
+from tracking.models import CurrentTrace, LangySession, LearningTrace
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
 from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 import json
 
 
+# LearningTrace statistics which can be tracked
+TRACKING_MODES = ['seen', 'interacted', 'tested', 'correct']
+
+
+# Returns a dict
+#   of unique Translation IDs and counts, from a list of Translation IDs.
+#   IDs which are not integers are ignored.
+def count_translation_ids(translation_ids):
+    translation_ids_counts = {}
+    for id in translation_ids:
+        try:
+            id = int(id)
+        except (TypeError, ValueError):
+            continue
+        translation_ids_counts[id] = translation_ids_counts.get(id, 0) + 1
+    return translation_ids_counts
+
+
+# Returns a dict
+#   mapping Translation IDs to the user's CurrentTrace for that Translation,
+#   with the latest LearningTrace selected.
+def current_traces(user, foreign_language, translation_ids):
+    return {
+        current_trace.translation_id: current_trace
+        for current_trace in (CurrentTrace.objects
+            .filter(user = user)
+            .filter(translation__foreign_language = foreign_language)
+            .filter(translation__id__in = translation_ids)
+            .select_related('trace'))
+    }
+
+
+# Create or update LearningTraces for a user in a LangySession.
+# Takes a dict mapping Translation IDs to dicts of tracking modes and counts,
+#   e.g. {12: {'seen': 1, 'interacted': 2}}
+# Uses a constant number of queries regardless of the number of Translations.
+# Counts are added with atomic UPDATE statements, so concurrent requests never lose increments.
+# The user's CurrentTraces are kept in step in the same transaction.
+# With require_previous, only Translations the user has seen before are tracked.
+def track_translations(user, langy_session, foreign_language, translation_ids_counts, require_previous=False):
+    # Find Translation objects
+    translations = Translation.objects.in_bulk(list(translation_ids_counts.keys()))
+    if not translations:
+        return
+
+    current = current_traces(user, foreign_language, list(translations.keys()))
+    if require_previous:
+        translations = {id: translation for id, translation in translations.items() if id in current}
+
+    # Translations with an existing LearningTrace belonging to this LangySession
+    existing_ids = set(
+        id for id, current_trace in current.items()
+        if current_trace.trace.session_id == langy_session.id)
+
+    # No LearningTrace for these Translations exists for the current LangySession
+    # Take existing statistics into account, if any
+    new_ids = [id for id in translations.keys() if id not in existing_ids]
+    traces_create = []
+    for id in new_ids:
+        prev = current[id].trace if id in current else None
+        traces_create.append(LearningTrace(
+            user = user,
+            session = langy_session,
+            # Tracing
+            translation = translations[id],
+            prev = prev,
+            # Statistics
+            seen = prev.seen if prev else 0,
+            interacted = prev.interacted if prev else 0,
+            tested = prev.tested if prev else 0,
+            correct = prev.correct if prev else 0,
+        ))
+
+    # Group Translations with identical counts, so each group is one UPDATE
+    count_groups = {}
+    for id in translations.keys():
+        mode_counts = tuple(sorted(
+            (mode, count)
+            for mode, count in translation_ids_counts[id].items()
+            if mode in TRACKING_MODES
+        ))
+        if mode_counts:
+            count_groups.setdefault(mode_counts, []).append(id)
+
+    with transaction.atomic():
+        # A concurrent request may have created some of these already
+        LearningTrace.objects.bulk_create(traces_create, ignore_conflicts=True)
+
+        # Move CurrentTraces on to the new LearningTraces
+        # Their statistics are unchanged, as the new LearningTraces start from the previous ones
+        moved_ids = [id for id in new_ids if id in current]
+        if moved_ids:
+            session_trace = (LearningTrace.objects
+                .filter(session = langy_session)
+                .filter(translation = OuterRef('translation'))
+                .values('id')[:1])
+            (CurrentTrace.objects
+                .filter(user = user)
+                .filter(translation__id__in = moved_ids)
+                .filter(last_seen__lte = langy_session.start_time)
+                .exclude(trace__session = langy_session)
+                .update(
+                    trace = Subquery(session_trace),
+                    last_seen = langy_session.start_time,
+                    last_updated = timezone.now()))
+
+        # First LearningTraces for these Translations
+        first_ids = [id for id in new_ids if id not in current]
+        if first_ids:
+            CurrentTrace.objects.bulk_create([
+                CurrentTrace(
+                    user = user,
+                    translation_id = translation_id,
+                    trace_id = trace_id,
+                    last_seen = langy_session.start_time)
+                for translation_id, trace_id in LearningTrace.objects
+                    .filter(session = langy_session)
+                    .filter(translation__id__in = first_ids)
+                    .values_list('translation_id', 'id')
+            ], ignore_conflicts=True)
+
+        # Update appropriate statistics based on tracking mode
+        # e.g. UPDATE ... SET seen = seen + 1
+        for mode_counts, ids in count_groups.items():
+            increments = {mode: F(mode) + count for mode, count in mode_counts}
+            (LearningTrace.objects
+                .filter(session = langy_session)
+                .filter(translation__id__in = ids)
+                .update(**increments))
+            (CurrentTrace.objects
+                .filter(user = user)
+                .filter(translation__id__in = ids)
+                .filter(trace__session = langy_session)
+                .update(last_updated = timezone.now(), **increments))
+
+
 def add_learning_traces(request):
     if request.method == 'POST':
         # Get data
@@ -18,82 +157,62 @@ def add_learning_traces(request):
         foreign_language = request.user.active_language.foreign_language
 
         # Convert translation list into a dict of unique IDs and counts
-        # This will be used to create new LearningTraces
-        translation_ids_counts = {}
-        for id in translation_ids:
-            if id not in translation_ids_counts.keys():
-                # Add new id
-                translation_ids_counts[id] = 1
-            else:
-                # Add to count for this id
-                translation_ids_counts[id] += 1
+        # This will be used to create or update LearningTraces
+        translation_ids_counts = {
+            id: {mode: count}
+            for id, count in count_translation_ids(translation_ids).items()
+        }
 
-        for id, count in translation_ids_counts.items():
-            # Find Translation object
-            translation = Translation.objects.filter(id=id).first()
-            if translation is None:
-                continue  # next Translation
+        track_translations(request.user, langy_session, foreign_language, translation_ids_counts)
 
-            # Attempt to find existing LearningTrace belonging to this LangySession
-            existing = (request.user.traces
-                .filter(session = langy_session)
-                .filter(translation__foreign_language = foreign_language)
-                .filter(translation__id = id)
-                .last())
-            
-            if existing is not None:
-                # No need to create a new LearningTrace for this Translation
-                # Update appropriate statistic based on tracking mode
-                if mode == "seen":         existing.seen += count
-                elif mode == "interacted": existing.interacted += count
-                elif mode == "tested":     existing.tested += count
-                elif mode == "correct":    existing.correct += count
-                existing.save()
-                continue  # next Translation
-
-            # No LearningTrace for this Translation exists for the current LangySession
-            # Prepare to create a new LearningTrace object
-
-            # Attempt to find previous LearningTrace, created outside of this LangySession
-            prev = (request.user.traces
-                .filter(~Q(session = langy_session))
-                .filter(translation__foreign_language = foreign_language)
-                .filter(translation__id = id)
-                .last())
-            
-            # Prepare statistics for new LearningTrace
-            if prev is None:
-                # New statistics
-                seen = 0
-                interacted = 0
-                tested = 0
-                correct = 0
+        return JsonResponse({"success": True})
+
+    else:
+        return HttpResponseBadRequest('Invalid request method')
+
+
+# Returns a dict
+#   mapping Translation IDs to dicts of tracking modes and counts, from a list of events.
+#   Each event is a dict of the form {'translation_id': 12, 'mode': 'seen', 'count': 1}.
+#   Invalid events are ignored.
+def count_trace_events(events):
+    translation_ids_counts = {}
+    for event in events:
+        try:
+            id = int(event['translation_id'])
+            mode = event['mode']
+            count = int(event.get('count', 1))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if mode not in TRACKING_MODES or count < 1:
+            continue
+        mode_counts = translation_ids_counts.setdefault(id, {})
+        mode_counts[mode] = mode_counts.get(mode, 0) + count
+    return translation_ids_counts
+
+
+# Takes a buffered batch of tracking events for one LangySession.
+# Accepts a JSON body, or a form with the JSON in a "data" field
+#   as sent by navigator.sendBeacon, which cannot set a CSRF header.
+@login_required
+def add_learning_trace_events(request):
+    if request.method == 'POST':
+        # Get data
+        try:
+            if 'data' in request.POST:
+                json_data = json.loads(request.POST['data'])
             else:
-                # Take existing statistics into account
-                seen = prev.seen
-                interacted = prev.interacted
-                tested = prev.tested
-                correct = prev.correct
-            
-            # Update appropriate statistic based on tracking mode
-            if mode == "seen":         seen += count
-            elif mode == "interacted": interacted += count
-            elif mode == "tested":     tested += count
-            elif mode == "correct":    correct += count
-            
-            # Create new LearningTrace object
-            LearningTrace.objects.create(
-                user = request.user,
-                session = langy_session,
-                # Tracing
-                translation = translation,
-                prev = prev,
-                # Statistics
-                seen = seen,
-                interacted = interacted,
-                tested = tested,
-                correct = correct,
-            )
+                json_data = json.loads(request.body)
+            langy_session_id = int(json_data['langy_session_id'])
+            events = list(json_data['events'])
+        except (KeyError, TypeError, ValueError):
+            return HttpResponseBadRequest('Bad request')
+        langy_session = get_object_or_404(LangySession, pk=langy_session_id, user=request.user)
+
+        # Get user's active ForeignLanguage
+        foreign_language = request.user.active_language.foreign_language
+
+        track_translations(request.user, langy_session, foreign_language, count_trace_events(events))
 
         return JsonResponse({"success": True})
 
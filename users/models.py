@@ -61,28 +61,36 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
                 .distinct()
         ]
 
+    # Returns a QuerySet of LearningTraces
+    #   for the user in a given ForeignLanguage.
+    #   LearningTraces are unique by Translation, ordered by Translation ID.
+    #   Each LearningTrace corresponds to the last time the user saw the Translation.
+    #   A single query: the latest LearningTrace per Translation is kept in the user's CurrentTraces.
+    def traces_unique_queryset(self, foreign_language):
+        latest = (self.current_traces
+            .filter(translation__foreign_language = foreign_language)
+            .values('trace'))
+        return (self.traces
+            .filter(id__in = latest)
+            .select_related(
+                'session',
+                'prev__session',
+                'translation__translatable_word',
+                'translation__foreign_language')
+            .order_by('translation'))
+
     # Returns a list of LearningTraces
     #   for the user in a given ForeignLanguage.
     #   LearningTraces in the list are unique by Translation.
     #   Each LearningTrace corresponds to the last time the user saw the Translation.
     def traces_unique(self, foreign_language):
-        traces_unique = []
-        for id in self.traces_unique_tid(foreign_language):
-            traces_unique.append(
-                self.traces
-                .filter(translation__foreign_language = foreign_language)
-                .filter(translation__id = id)
-                .last())
-        return traces_unique
+        return list(self.traces_unique_queryset(foreign_language))
     
     # Returns a list of Translations
     #   for the user in a given ForeignLanguage.
     #   Translations in the list are unique and the user has seen at least once.
     def words_seen(self, foreign_language):
-        words_seen = []
-        for trace in self.traces_unique(foreign_language):
-            words_seen.append(trace.translation)
-        return words_seen
+        return [trace.translation for trace in self.traces_unique_queryset(foreign_language)]
 
     def __str__(self):
         return f'{self.email}'
@@ -1,5 +1,10 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from tracking.models import LangySession, LearningTrace
 from users.models import CustomUser
+import tempfile
 
 
 class CustomUserModelTest(TestCase):
@@ -32,3 +37,42 @@ class CustomUserModelTest(TestCase):
             password='pass')
         max_length = user._meta.get_field('display_name').max_length
         self.assertEqual(max_length, 20)
+
+    def test_traces_unique(self):
+        user = CustomUser.objects.create_user(
+            email='reader@email.com',
+            display_name='Reader',
+            password='pass')
+        foreign_language = ForeignLanguage.objects.create(
+            key = 'sv',
+            english_name = 'Swedish',
+            foreign_name = 'Svenska',
+            flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+            duolingo_learners = 1260000)
+        translations = [
+            Translation.objects.create(
+                translatable_word = TranslatableWord.objects.create(english_word=f'word{i}'),
+                foreign_language = foreign_language,
+                foreign_word = f'ord{i}')
+            for i in range(5)
+        ]
+
+        # Three LangySessions, each a day apart, seeing more of the Translations
+        for day in range(3):
+            session = LangySession.objects.create(user=user, foreign_language=foreign_language)
+            session.start_time = timezone.now() - timedelta(days=3-day)
+            session.save()
+            for translation in translations[:day+3]:
+                LearningTrace.objects.create(
+                    user = user,
+                    session = session,
+                    translation = translation,
+                    seen = day + 1)
+
+        with self.assertNumQueries(1):
+            traces = user.traces_unique(foreign_language)
+            self.assertEqual([t.translation.id for t in traces], [t.id for t in translations])
+            self.assertEqual([t.seen for t in traces], [3, 3, 3, 3, 3])
+            self.assertEqual(traces[0].frn, 'ord0')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(user.words_seen(foreign_language)), 5)
@@ -1,3 +1,21 @@
+from .models import Prediction
 from django.contrib import admin
 
-# Register your models here.
+
+@admin.register(Prediction)
+class PredictionAdmin(admin.ModelAdmin):
+    # Main list
+    list_display = ('uid', 'lang', 'eng', 'p_trans', 'delta', 'predicted_at',)
+    list_filter = ('user', 'translation__foreign_language',)
+    list_select_related = ('user', 'translation__translatable_word', 'translation__foreign_language',)
+    readonly_fields = ['current_trace', 'predicted_at', 'model_version',]
+
+    # Additional attributes
+    def uid(self, obj):
+        return obj.user_id
+
+    def lang(self, obj):
+        return obj.translation.foreign_language.key
+
+    def eng(self, obj):
+        return obj.translation.translatable_word.english_word
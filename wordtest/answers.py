@@ -0,0 +1,145 @@
+from django.core.cache import cache
+from language.models import Translation
+import jellyfish, uuid
+
+
+# Version stamp for answer indexes, changed whenever English words, Synonyms or Translations change
+ANSWER_INDEX_VERSION_KEY = 'wordtest:answers:version'
+
+# Per process memo of AnswerIndexes by ForeignLanguage id, with the version they were built for
+_answer_indexes = {'version': None, 'indexes': {}}
+
+
+# Returns a string
+#   in the form answers are compared in: lowercase, without surrounding whitespace.
+def normalise(english):
+    return english.strip().lower()
+
+
+# Returns a set
+#   of strings made by deleting a single character from word, and word itself.
+def deletes(word):
+    return {word} | {word[:i] + word[i+1:] for i in range(len(word))}
+
+
+class AnswerIndex:
+    """
+    Finds the closest acceptable answer to a user's answer in a word test.
+
+    The acceptable answers for a Translation are its English word and the Synonyms of that word.
+    A normalised form map finds exact and plural answers, and a SymSpell style deletion index
+    finds answers within one insertion, deletion, substitution or transposition. Lookups only
+    compare the user's answer with the few acceptable answers sharing a deletion, rather than
+    every acceptable answer.
+
+    Initialisation Parameters
+    -------------------------
+    answers : dict
+        Maps Translation ids to lists of acceptable English answers, the English word first.
+    """
+
+    def __init__(self, answers):
+        self.answers = {}
+        self.forms = {}
+        self.deletions = {}
+        for translation_id, english_words in answers.items():
+            english_words = list(dict.fromkeys(normalise(english) for english in english_words))
+            self.answers[translation_id] = english_words
+            for english in english_words:
+                self.forms.setdefault(english, set()).add(translation_id)
+                for deletion in deletes(english):
+                    self.deletions.setdefault(deletion, set()).add(english)
+
+    def __len__(self):
+        return len(self.answers)
+
+    # Returns a set
+    #   of acceptable answers within one typing error of a normalised user answer.
+    def typo_candidates(self, user_english):
+        candidates = set()
+        for deletion in deletes(user_english):
+            candidates |= self.deletions.get(deletion, set())
+        # Sharing a deletion allows up to two edits, so confirm the distance
+        return {english for english in candidates
+            if jellyfish.damerau_levenshtein_distance(user_english, english) == 1}
+
+    # Returns a tuple (true_english, correct, typo)
+    #   for a user's answer to a Translation.
+    #   true_english is the acceptable answer closest to the user's answer.
+    #   Plurals with a missing or additional 's' and single typing errors are correct, but typos.
+    #   Raises KeyError if the Translation is not in the index.
+    def match(self, translation_id, user_english):
+        english_words = self.answers[translation_id]
+        user_english = normalise(user_english)
+
+        # Exact answers
+        if translation_id in self.forms.get(user_english, ()):
+            return user_english, True, False
+
+        # Typos: plurals
+        # Some foreign words e.g. Swedish "djur" (animal/animals) are the same for singular/plural
+        for english in (user_english+'s', user_english[:-1] if user_english.endswith('s') else None):
+            if english and translation_id in self.forms.get(english, ()):
+                return english, True, True
+
+        # Typos: typing error tolerance
+        # Allow one accidental character insertion, deletion, substitution or transposition
+        candidates = self.typo_candidates(user_english)
+        typos = [english for english in english_words if english in candidates]
+        if typos:
+            return typos[0], True, True
+
+        # Incorrect, show the acceptable answer most similar to the user's answer
+        true_english = max(english_words, key=lambda english: jellyfish.jaro_winkler_similarity(user_english, english))
+        return true_english, False, False
+
+
+# Returns an AnswerIndex
+#   for every Translation in a ForeignLanguage.
+def build_answer_index(foreign_language):
+    answers = {}
+    rows = (Translation.objects
+        .filter(foreign_language = foreign_language)
+        .order_by('id', 'translatable_word__synonyms__english_word')
+        .values_list('id', 'translatable_word__english_word', 'translatable_word__synonyms__english_word'))
+    for translation_id, english_word, synonym in rows:
+        english_words = answers.setdefault(translation_id, [english_word])
+        if synonym is not None:
+            english_words.append(synonym)
+    return AnswerIndex(answers)
+
+
+# Returns a string
+#   which is the current answer index version stamp.
+def answer_index_version():
+    return cache.get_or_set(ANSWER_INDEX_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+# Change the answer index version stamp, so every process rebuilds its AnswerIndexes.
+def bump_answer_index_version():
+    cache.set(ANSWER_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+# Returns an AnswerIndex
+#   for a ForeignLanguage.
+#   Built once per process and rebuilt when the answer index version changes.
+#   Also rebuilt if any of translation_ids is missing but is a Translation in the ForeignLanguage,
+#   as the version stamp may not have reached this process yet, e.g. for a Translation added by
+#   another process. Invalid or other language IDs never cause a rebuild.
+def get_answer_index(foreign_language, translation_ids=()):
+    version = answer_index_version()
+    if _answer_indexes['version'] != version:
+        _answer_indexes.update(version=version, indexes={})
+
+    index = _answer_indexes['indexes'].get(foreign_language.id)
+    if index is not None:
+        missing = [translation_id for translation_id in translation_ids if translation_id not in index.answers]
+        if missing and (Translation.objects
+                .filter(foreign_language = foreign_language)
+                .filter(id__in = missing)
+                .exists()):
+            index = None
+    if index is None:
+        index = build_answer_index(foreign_language)
+        _answer_indexes['indexes'][foreign_language.id] = index
+    return index
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class WordtestConfig(AppConfig):
     name = 'wordtest'
+
+    def ready(self):
+        # Connect signal receivers
+        from . import signals
+
+        # Load the LangyNet model once per process, ahead of the first word test
+        from .langynet import warm_up
+        warm_up()
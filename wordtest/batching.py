@@ -0,0 +1,172 @@
+from concurrent.futures import Future, TimeoutError
+import queue, threading, time, torch
+
+
+class Overloaded(Exception):
+    """Raised when a BatchPredictor's queue is full, so a request cannot be accepted in time."""
+
+
+class BatchPredictor:
+    """
+    Collects concurrent prediction requests and runs them as one batched forward pass.
+
+    Requests wait in a bounded queue. A background thread takes the oldest request and
+    keeps collecting more until the batch reaches max_batch_size rows or the oldest request
+    has waited max_latency seconds, then runs predict once on all their rows.
+
+    Initialisation Parameters
+    -------------------------
+    predict : callable
+        Takes a Tensor, Size([batch_size, features]), and returns a Tensor, Size([batch_size, ...]).
+    max_batch_size : int, default=512
+        Maximum number of rows per forward pass. Larger requests run on their own.
+    max_latency : float, default=0.005
+        Maximum time in seconds a request waits for others to join its batch.
+    max_queue : int, default=64
+        Maximum number of requests waiting. Further requests raise Overloaded.
+    """
+
+    def __init__(self, predict, max_batch_size=512, max_latency=0.005, max_queue=64):
+        self.predict_batch = predict
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._metrics = {
+            'requests': 0,
+            'rejected': 0,
+            'errors': 0,
+            'batches': 0,
+            'batched_requests': 0,
+            'rows': 0,
+            'max_batch_rows': 0,
+            'wait_seconds': 0.0,
+            'inference_seconds': 0.0,
+        }
+
+    # Start the background thread, if it is not running.
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='langynet-batcher', daemon=True)
+                self._thread.start()
+
+    # Stop the background thread once the requests already waiting have run.
+    def stop(self):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._stopping.set()
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                # The thread is busy with a full queue, and stops once it has emptied it
+                pass
+            thread.join()
+
+    # Returns a Future
+    #   for the predictions of a feature Tensor.
+    #   Raises Overloaded if the queue stays full for timeout seconds.
+    def submit(self, x, timeout=None):
+        self.start()
+        future = Future()
+        try:
+            self._queue.put((x, future, time.perf_counter()), timeout=timeout)
+        except queue.Full:
+            self._count(rejected=1)
+            raise Overloaded(f'{self._queue.maxsize} prediction requests are already waiting')
+        self._count(requests=1)
+        return future
+
+    # Returns a Tensor
+    #   of predictions for a feature Tensor, waiting for its batch to run.
+    #   Raises Overloaded if the request cannot be queued, or its batch does not run, within timeout seconds.
+    def predict(self, x, timeout=1.0):
+        future = self.submit(x, timeout=timeout)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            self._count(rejected=1)
+            raise Overloaded(f'prediction request did not run within {timeout} seconds')
+
+    # Returns a dict
+    #   of counters since the BatchPredictor was created, with averages per batch.
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        batches = metrics['batches'] or 1
+        metrics['queued'] = self._queue.qsize()
+        metrics['mean_batch_rows'] = metrics['rows'] / batches
+        metrics['mean_batch_requests'] = metrics['batched_requests'] / batches
+        metrics['mean_wait_ms'] = metrics['wait_seconds'] * 1000 / (metrics['batched_requests'] or 1)
+        metrics['mean_inference_ms'] = metrics['inference_seconds'] * 1000 / batches
+        return metrics
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, increment in increments.items():
+                self._metrics[name] += increment
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            # Collect more requests until the batch is full or the oldest request's budget is spent
+            batch = [item]
+            rows = len(item[0])
+            deadline = item[2] + self.max_latency
+            while rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._run_batch(batch, rows)
+            if self._stopping.is_set() and self._queue.empty():
+                break
+
+    def _run_batch(self, batch, rows):
+        start = time.perf_counter()
+        # Requests which timed out waiting have been cancelled
+        batch = [(x, future, enqueued) for x, future, enqueued in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        rows = sum(len(x) for x, future, enqueued in batch)
+        wait_seconds = sum(start - enqueued for x, future, enqueued in batch)
+        try:
+            y_hat = self.predict_batch(torch.cat([x for x, future, enqueued in batch]))
+        except Exception as e:
+            for x, future, enqueued in batch:
+                future.set_exception(e)
+            self._count(errors=1)
+            return
+
+        # Hand each request its own rows
+        offset = 0
+        for x, future, enqueued in batch:
+            future.set_result(y_hat[offset:offset+len(x)])
+            offset += len(x)
+
+        with self._lock:
+            self._metrics['batches'] += 1
+            self._metrics['batched_requests'] += len(batch)
+            self._metrics['rows'] += rows
+            self._metrics['max_batch_rows'] = max(self._metrics['max_batch_rows'], rows)
+            self._metrics['wait_seconds'] += wait_seconds
+            self._metrics['inference_seconds'] += time.perf_counter() - start
@@ -0,0 +1,165 @@
+from .batching import BatchPredictor
+from django.conf import settings
+from model_data.LangyNet import LangyNet
+from tracking.management.commands._embeddings import create_embeddings, extend_embeddings, load_embeddings
+from tracking.management.commands._vocabulary import get_langy_words, get_word_to_ix, vocabulary_version
+import hashlib, logging, os, threading, torch
+
+
+# Architecture of the trained model in model_data/model_state_dict.pt
+HIDDEN_LAYERS = 3
+HIDDEN_NODES = 16
+INPUT_FEATURES = 10  # delta, seen, interacted, tested, correct, frn_0 ... frn_4
+
+
+# Process-wide registry of loaded artifacts, mapping names to (version, artifact) tuples.
+# Each artifact is loaded once per process, and again only when its version changes.
+_lock = threading.Lock()
+_registry = {}
+
+logger = logging.getLogger(__name__)
+
+
+# Returns a tuple
+#   identifying the current version of a file, from its modification time and size.
+def file_version(path):
+    stat = os.stat(path)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+# Returns an artifact
+#   from the registry, calling load() if it has not been loaded or its version has changed.
+def get_artifact(name, version, load):
+    entry = _registry.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _lock:
+        # Another thread may have loaded it while waiting
+        entry = _registry.get(name)
+        if entry is None or entry[0] != version:
+            entry = (version, load())
+            _registry[name] = entry
+        return entry[1]
+
+
+# Returns a LangyNet model
+#   loaded from a state dict file, ready for inference.
+#   If torchscript is True, the model is traced and frozen with TorchScript.
+def load_model(path, torchscript=False):
+    model = LangyNet(HIDDEN_LAYERS, HIDDEN_NODES)
+    model.load_state_dict(torch.load(path, map_location=torch.device('cpu')))
+    model.eval()
+
+    if torchscript:
+        example = torch.zeros(1, INPUT_FEATURES)
+        with torch.no_grad():
+            model = torch.jit.freeze(torch.jit.trace(model, example))
+
+    return model
+
+
+# Returns a LangyNet model
+#   from the registry, loading it if it has not been loaded or its state dict file has changed.
+def get_model():
+    path = settings.LANGYNET_STATE_DICT
+    return get_artifact(
+        'model',
+        file_version(path),
+        lambda: load_model(path, torchscript=settings.LANGYNET_TORCHSCRIPT))
+
+
+# Returns a tuple or string
+#   identifying the current version of the embeddings get_embeddings returns.
+#   The file version of the saved embeddings with the vocabulary version, as words of
+#   Translations added since they were saved are added to them, or only the vocabulary
+#   version if none have been saved.
+def embeddings_version():
+    path = settings.LANGYNET_EMBEDDINGS
+    if os.path.exists(path):
+        return (file_version(path), vocabulary_version())
+    return vocabulary_version()
+
+
+# Returns a string
+#   identifying the model and embeddings predictions are currently made with.
+#   Saved Predictions made with a different version are stale.
+def model_version():
+    version = (file_version(settings.LANGYNET_STATE_DICT), embeddings_version())
+    return hashlib.sha1(repr(version).encode()).hexdigest()
+
+
+# Returns a tuple
+#   of a word_to_ix dictionary and the frozen Embedding for its words, from a saved embeddings file.
+#   Words of Translations added since the file was saved are missing from its vocabulary, and
+#   would otherwise all share a zero embedding, so they are added to it with a warning.
+def load_saved_embeddings(path):
+    version, word_to_ix, embeddings = load_embeddings(path)
+    new_words = [word for word in get_langy_words() if word not in word_to_ix]
+    if new_words:
+        logger.warning(
+            f'{len(new_words)} words are missing from the vocabulary of {path}, '
+            'adding them until it is rebuilt with: python manage.py build_embeddings')
+        word_to_ix, embeddings = extend_embeddings(word_to_ix, embeddings, new_words)
+    return word_to_ix, embeddings
+
+
+# Returns a tuple
+#   of a word_to_ix dictionary and the frozen Embedding for its words.
+#   Loaded from the saved embeddings, so predictions do not depend on random state.
+#   If none have been saved, they are created from the current vocabulary instead.
+def get_embeddings():
+    path = settings.LANGYNET_EMBEDDINGS
+    if os.path.exists(path):
+        return get_artifact('embeddings', embeddings_version(), lambda: load_saved_embeddings(path))
+
+    def create():
+        word_to_ix = get_word_to_ix()
+        embeddings = create_embeddings(word_to_ix)
+        embeddings.weight.requires_grad_(False)
+        return word_to_ix, embeddings
+    return get_artifact('embeddings', vocabulary_version(), create)
+
+
+# Returns a Tensor
+#   of predicted p_trans for a feature Tensor, Size([batch_size, 10]).
+def predict(x):
+    with torch.no_grad():
+        return get_model()(x)
+
+
+# Returns a BatchPredictor
+#   shared by every thread in the process, running predict on batches of requests.
+def get_batch_predictor():
+    return get_artifact('batch_predictor', None, lambda: BatchPredictor(
+        predict,
+        max_batch_size = settings.LANGYNET_BATCH_SIZE,
+        max_latency = settings.LANGYNET_BATCH_LATENCY,
+        max_queue = settings.LANGYNET_BATCH_QUEUE))
+
+
+# Returns a Tensor
+#   of predicted p_trans for a feature Tensor, Size([batch_size, 10]).
+#   With LANGYNET_BATCHING, concurrent requests share one forward pass.
+#   Raises Overloaded if too many requests are already waiting.
+def score(x):
+    if settings.LANGYNET_BATCHING:
+        return get_batch_predictor().predict(x)
+    return predict(x)
+
+
+# Load the model ahead of the first request, if its state dict file exists.
+def warm_up():
+    if os.path.exists(settings.LANGYNET_STATE_DICT):
+        predict(torch.zeros(1, INPUT_FEATURES))
+    if os.path.exists(settings.LANGYNET_EMBEDDINGS):
+        get_embeddings()
+
+
+# Forget loaded artifacts, so the next request loads them again.
+def clear():
+    with _lock:
+        entry = _registry.pop('batch_predictor', None)
+        _registry.clear()
+    if entry is not None:
+        entry[1].stop()
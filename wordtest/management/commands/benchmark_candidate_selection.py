@@ -0,0 +1,70 @@
+"""
+Benchmark choosing word test candidates: the original sort and pop(0) selection
+against partial selection with select_candidates, for a range of candidate counts.
+"""
+
+from django.core.management.base import BaseCommand
+from tracking.management.commands._slutil import tprint
+from wordtest.predictions import select_candidates
+from wordtest.views import NUM_WORDS
+import numpy as np
+import time
+
+
+# Returns a list of indices
+#   chosen as word tests originally did: sorting every candidate by y_hat,
+#   popping from the front, then sorting the rest by delta.
+def select_candidates_sorted(y_hat, delta, num_low_p_trans, num_low_delta):
+    candidates = [{'index': i, 'y_hat': y_hat[i], 'delta': delta[i]} for i in range(len(y_hat))]
+    selected = []
+    candidates = sorted(candidates, key=lambda c: c['y_hat'])
+    for i in range(num_low_p_trans):
+        selected.append(candidates.pop(0)['index'])
+    candidates = sorted(candidates, key=lambda c: c['delta'])
+    for i in range(num_low_delta):
+        selected.append(candidates.pop(0)['index'])
+    return selected
+
+
+class Command(BaseCommand):
+    help = ('Benchmark choosing word test candidates: the original sort and pop(0) selection '
+            'against partial selection with select_candidates, for a range of candidate counts.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100, 1000, 10000, 100000],
+            help='Numbers of candidates')
+        parser.add_argument('--repeats', type=int, default=5, help='Number of timed selections per size')
+
+
+    def handle(self, *args, **kwargs):
+        rng = np.random.default_rng(1)
+        num_low_p_trans = NUM_WORDS // 2
+        num_low_delta = NUM_WORDS - num_low_p_trans
+
+        tprint(f'{"candidates":>10} {"sorted ms":>10} {"partial ms":>11} {"speedup":>8}')
+        for size in kwargs['sizes']:
+            y_hat = rng.random(size)
+            delta = rng.permutation(size) * 60
+            y_hat_list, delta_list = y_hat.tolist(), delta.tolist()
+
+            timings = {'sorted': [], 'partial': []}
+            for repeat in range(kwargs['repeats']):
+                start = time.perf_counter()
+                expected = select_candidates_sorted(y_hat_list, delta_list, num_low_p_trans, num_low_delta)
+                timings['sorted'].append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                selected = select_candidates(y_hat, delta, num_low_p_trans, num_low_delta)
+                timings['partial'].append((time.perf_counter() - start) * 1000)
+                assert selected.tolist() == expected
+
+            sorted_ms = min(timings['sorted'])
+            partial_ms = min(timings['partial'])
+            tprint(f'{size:>10} {sorted_ms:>10.3f} {partial_ms:>11.3f} {sorted_ms / partial_ms:>7.1f}x')
+
+        tprint('done.')
@@ -0,0 +1,50 @@
+"""
+Predict p_trans for every user's current LearningTraces in batches and save the Predictions.
+Meant to run nightly, e.g. from cron:
+    0 3 * * * cd /path/to/langy && python manage.py predict_p_trans
+Only CurrentTraces which changed since their last Prediction are scored, unless --all is given.
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tracking.management.commands._slutil import tprint
+from tracking.models import CurrentTrace
+from wordtest.predictions import stale_current_traces, update_predictions, with_prediction_features
+
+
+class Command(BaseCommand):
+    help = ('Predict p_trans for every user\'s current LearningTraces in batches and save the Predictions. '
+            'Only CurrentTraces which changed since their last Prediction are scored, unless --all is given.')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Score every CurrentTrace')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of CurrentTraces per forward pass')
+
+
+    def handle(self, *args, **kwargs):
+        predicted_at = timezone.now()
+        if kwargs['all']:
+            current_traces = with_prediction_features(CurrentTrace.objects.all())
+        else:
+            current_traces = stale_current_traces()
+        current_traces = current_traces.order_by('id')
+
+        # Walk through CurrentTraces by ID, so each batch is a fresh query
+        count = 0
+        last_id = 0
+        while True:
+            batch = list(current_traces.filter(id__gt = last_id)[:kwargs['batch_size']])
+            if not batch:
+                break
+            update_predictions(batch, predicted_at)
+            count += len(batch)
+            last_id = batch[-1].id
+            tprint(f'scored {count} CurrentTraces')
+
+        tprint(f'saved {count} Predictions')
+        tprint('done.')
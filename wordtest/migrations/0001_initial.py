@@ -0,0 +1,42 @@
+# Generated by Django 3.1.14 on 2026-10-18 12:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('language', '0041_auto_20210502_0807'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracking', '0013_currenttrace_last_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Prediction',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('p_trans', models.FloatField(help_text='Predicted probability the user can correctly translate this word')),
+                ('delta', models.PositiveIntegerField(default=0, help_text="Time in seconds between the user's last two sightings of this word")),
+                ('predicted_at', models.DateTimeField(help_text='When the prediction was made. Predictions older than their <b>CurrentTrace</b> are stale')),
+                ('current_trace', models.OneToOneField(help_text='<b>CurrentTrace</b> the prediction was made from', on_delete=django.db.models.deletion.CASCADE, related_name='prediction', to='tracking.currenttrace')),
+                ('translation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='language.translation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'p_trans'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['user', 'p_trans'], name='prediction_user_p_trans_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['user', 'delta'], name='prediction_user_delta_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordtest', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prediction',
+            name='model_version',
+            field=models.CharField(blank=True, default='', help_text='Version of the model and embeddings the prediction was made with. Predictions made with another version are stale', max_length=40),
+        ),
+    ]
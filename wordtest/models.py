@@ -1,3 +1,40 @@
 from django.db import models
+from language.models import Translation
+from tracking.models import CurrentTrace
+from users.models import CustomUser
 
-# Create your models here.
+
+class Prediction(models.Model):
+    user = models.ForeignKey(to=CustomUser, on_delete=models.CASCADE, related_name='predictions')
+    translation = models.ForeignKey(to=Translation, on_delete=models.CASCADE, related_name='predictions')
+    current_trace = models.OneToOneField(
+        help_text='<b>CurrentTrace</b> the prediction was made from',
+        to=CurrentTrace,
+        on_delete=models.CASCADE,
+        related_name='prediction')
+
+    p_trans = models.FloatField(
+        help_text='Predicted probability the user can correctly translate this word')
+    delta = models.PositiveIntegerField(
+        help_text='Time in seconds between the user\'s last two sightings of this word',
+        default=0)
+    predicted_at = models.DateTimeField(
+        help_text='When the prediction was made. Predictions older than their <b>CurrentTrace</b> are stale')
+    model_version = models.CharField(
+        help_text='Version of the model and embeddings the prediction was made with. '
+                  'Predictions made with another version are stale',
+        max_length=40,
+        blank=True,
+        default='')
+
+    def __str__(self):
+        return f'{self.user} : {self.translation} = {self.p_trans:.3f}'
+
+    class Meta:
+        ordering = ['user', 'p_trans']
+        indexes = [
+            # A user's weakest words, for word tests
+            models.Index(fields=['user', 'p_trans'], name='prediction_user_p_trans_idx'),
+            # A user's most recently seen words, for word tests
+            models.Index(fields=['user', 'delta'], name='prediction_user_delta_idx'),
+        ]
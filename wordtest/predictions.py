@@ -0,0 +1,167 @@
+from .langynet import get_embeddings, model_version, score
+from .models import Prediction
+from django.db import transaction
+from django.db.models import F, Q
+from tracking.management.commands.input_csv import standardise_columns, words_to_embeds
+from tracking.models import CurrentTrace
+import numpy as np
+import pandas as pd
+import torch
+
+
+
+# Mean and std of delta and interaction statistics in the model training data
+STANDARDISATION = {
+    'delta': (125209.89669589297, 190899.3729304174),
+    'seen': (8.58341078256888, 7.16319377895976),
+    'interacted': (8.58341078256888, 7.16319377895976),
+    'tested': (8.58341078256888, 7.16319377895976),
+    'correct': (7.769209908777974, 6.4754325307512834),
+}
+
+
+# Use the LangyNet model to predict the probability the user can correctly
+# translate each foreign word in the given list of LearningTraces.
+# Take a list of LearningTraces and return a list of dicts, each including a
+# Translation, delta, and predicted p_trans.
+def traces_to_candidates(learning_traces):
+    # Pick out relevant features and create dataframe
+    input_list = []
+    for t in learning_traces:
+        input_list.append({
+            'frn': t.frn,
+            'delta': t.delta,
+            'seen': t.seen,
+            'interacted': t.interacted,
+            'tested': t.tested,
+            'correct': t.correct
+        })
+    df = pd.DataFrame(input_list)
+
+    # Dictionary mapping unique foreign words to indices,
+    # and stored embeddings for all words
+    # Indices from word_to_ix are used to find the embedding for a particular word
+    # Both are loaded once per process
+    word_to_ix, embeddings = get_embeddings()
+        
+    # Replace foreign words with embeddings
+    df = words_to_embeds(df, word_to_ix, embeddings)
+
+    # Standardisation for delta and interaction statistics only
+    # Not performed on word embeddings
+    # Using same mean and std as model training data
+    df = standardise_columns(df, STANDARDISATION)
+
+    # Create feature tensor
+    x = torch.tensor(df.values, dtype=torch.float32)
+
+    # Make prediction for p_trans
+    # The model is loaded once per process, and may batch predictions for concurrent requests
+    y_hat = score(x)
+
+    # Prepare return
+    candidates = []
+    for t, p_trans in zip(learning_traces, y_hat.squeeze(1).tolist()):
+        candidates.append({
+            'translation': t.translation,
+            'y_hat': p_trans,
+            'delta': t.delta
+        })
+
+    return candidates
+
+
+# Returns a QuerySet of CurrentTraces
+#   with everything needed to make predictions from their LearningTraces selected.
+def with_prediction_features(current_traces):
+    return current_traces.select_related(
+        'trace__session',
+        'trace__prev__session',
+        'translation__foreign_language',
+        'translation__translatable_word')
+
+
+# Returns a QuerySet of CurrentTraces
+#   which have no Prediction, have changed since their Prediction was made,
+#   or whose Prediction was made with another version of the model or embeddings.
+def stale_current_traces(current_traces=None):
+    if current_traces is None:
+        current_traces = CurrentTrace.objects.all()
+    return with_prediction_features(current_traces
+        .filter(Q(prediction__isnull = True)
+            | Q(last_updated__gt = F('prediction__predicted_at'))
+            | ~Q(prediction__model_version = model_version())))
+
+
+# Predict p_trans for a list of CurrentTraces and save the Predictions.
+# predicted_at should be taken before the CurrentTraces were read,
+#   so changes made meanwhile leave the Predictions stale.
+# Returns a list of candidate dicts, as traces_to_candidates.
+def update_predictions(current_traces, predicted_at):
+    if not current_traces:
+        return []
+    # Taken before predicting, so a model or embeddings change meanwhile leaves the Predictions stale
+    version = model_version()
+    candidates = traces_to_candidates([current_trace.trace for current_trace in current_traces])
+
+    existing = {
+        prediction.current_trace_id: prediction
+        for prediction in Prediction.objects.filter(current_trace__in = [c.id for c in current_traces])
+    }
+    predictions_create = []
+    predictions_update = []
+    for current_trace, candidate in zip(current_traces, candidates):
+        prediction = existing.get(current_trace.id)
+        if prediction is None:
+            predictions_create.append(Prediction(
+                user_id = current_trace.user_id,
+                translation_id = current_trace.translation_id,
+                current_trace = current_trace,
+                p_trans = candidate['y_hat'],
+                delta = candidate['delta'],
+                predicted_at = predicted_at,
+                model_version = version))
+        else:
+            prediction.p_trans = candidate['y_hat']
+            prediction.delta = candidate['delta']
+            prediction.predicted_at = predicted_at
+            prediction.model_version = version
+            predictions_update.append(prediction)
+
+    with transaction.atomic():
+        # A concurrent request may have created some of these already
+        Prediction.objects.bulk_create(predictions_create, ignore_conflicts=True)
+        Prediction.objects.bulk_update(predictions_update, ['p_trans', 'delta', 'predicted_at', 'model_version'])
+
+    return candidates
+
+
+# Returns an array of indices
+#   of num_low_p_trans candidates with the lowest y_hat, lowest first,
+#   then num_low_delta of the other candidates with the lowest delta, lowest first.
+#   Partial selection: only the selected candidates are ever sorted.
+#   The num_low_p_trans + num_low_delta lowest deltas always include enough
+#   candidates which were not already selected for a low y_hat.
+def select_candidates(y_hat, delta, num_low_p_trans, num_low_delta):
+    y_hat = np.asarray(y_hat)
+    delta = np.asarray(delta)
+    num_low_p_trans = min(num_low_p_trans, len(y_hat))
+    num_low_delta = min(num_low_delta, len(y_hat) - num_low_p_trans)
+
+    low_p_trans = lowest(y_hat, num_low_p_trans)
+    low_delta = lowest(delta, num_low_p_trans + num_low_delta)
+    low_delta = low_delta[~np.isin(low_delta, low_p_trans)][:num_low_delta]
+
+    return np.concatenate([low_p_trans, low_delta])
+
+
+# Returns an array of indices
+#   of the k lowest values, lowest first.
+def lowest(values, k):
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    if k < len(values):
+        indices = np.argpartition(values, k - 1)[:k]
+    else:
+        indices = np.arange(len(values))
+    return indices[np.argsort(values[indices], kind='stable')]
@@ -0,0 +1,24 @@
+from .answers import bump_answer_index_version
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from language.models import Synonym, TranslatableWord, Translation
+
+
+# Answer indexes include every Translation's English word and its Synonyms.
+# Bulk writes bypass these, so call bump_answer_index_version after them.
+
+
+@receiver(post_save, sender=Translation)
+@receiver(post_delete, sender=Translation)
+@receiver(post_save, sender=TranslatableWord)
+@receiver(post_delete, sender=TranslatableWord)
+@receiver(post_save, sender=Synonym)
+@receiver(post_delete, sender=Synonym)
+def answers_changed(sender, **kwargs):
+    bump_answer_index_version()
+
+
+@receiver(m2m_changed, sender=TranslatableWord.synonyms.through)
+def synonyms_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_answer_index_version()
@@ -0,0 +1,105 @@
+from django.test import SimpleTestCase, TestCase
+from language.models import ForeignLanguage, Synonym, TranslatableWord, Translation
+from unittest import mock
+from wordtest import answers
+from wordtest.answers import AnswerIndex
+from wordtest.tests.test_views import set_up_test_data
+
+
+class AnswerIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = AnswerIndex({
+            1: ['Dog', 'hound', 'puppy'],
+            2: ['animal'],
+            3: ['cat', 'kitten'],
+        })
+
+    def test_match_exact(self):
+        self.assertEqual(self.index.match(1, 'dog'), ('dog', True, False))
+        self.assertEqual(self.index.match(1, ' Hound '), ('hound', True, False))
+
+    def test_match_plural(self):
+        self.assertEqual(self.index.match(2, 'animals'), ('animal', True, True))
+        self.assertEqual(self.index.match(1, 'puppys'), ('puppy', True, True))
+
+    def test_match_typo(self):
+        self.assertEqual(self.index.match(1, 'hund'), ('hound', True, True))    # deletion
+        self.assertEqual(self.index.match(1, 'doog'), ('dog', True, True))     # insertion
+        self.assertEqual(self.index.match(3, 'kitetn'), ('kitten', True, True))  # transposition
+        self.assertEqual(self.index.match(3, 'bat'), ('cat', True, True))      # substitution
+
+    def test_match_other_translation(self):
+        # Acceptable answers for one Translation are not accepted for another
+        self.assertFalse(self.index.match(2, 'dog')[1])
+        self.assertFalse(self.index.match(2, 'cats')[1])
+
+    def test_match_incorrect(self):
+        # Shows the most similar acceptable answer
+        self.assertEqual(self.index.match(1, 'pupil'), ('puppy', False, False))
+        self.assertEqual(self.index.match(3, 'kat'), ('cat', True, True))
+        self.assertEqual(self.index.match(3, 'dog'), ('cat', False, False))
+
+    def test_match_distance_two(self):
+        # Words sharing a deletion can be two edits apart
+        self.assertEqual(self.index.match(3, 'cta'), ('cat', True, True))
+        self.assertFalse(self.index.match(3, 'atc')[1])
+        self.assertFalse(self.index.match(2, 'nimaly')[1])
+
+    def test_match_unknown_translation(self):
+        with self.assertRaises(KeyError):
+            self.index.match(4, 'dog')
+
+
+class GetAnswerIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+
+    def setUp(self):
+        answers.bump_answer_index_version()
+        self.foreign_language = ForeignLanguage.objects.get(key='zh-cn')
+        self.dog = Translation.objects.get(foreign_language=self.foreign_language, translatable_word__english_word='dog')
+
+    def test_get_answer_index(self):
+        index = answers.get_answer_index(self.foreign_language)
+        self.assertEqual(len(index), Translation.objects.filter(foreign_language=self.foreign_language).count())
+        self.assertEqual(index.answers[self.dog.id], ['dog'])
+
+    def test_get_answer_index_cached(self):
+        answers.get_answer_index(self.foreign_language)
+        with self.assertNumQueries(0):
+            answers.get_answer_index(self.foreign_language)
+
+    def test_get_answer_index_rebuilt_when_synonyms_change(self):
+        self.assertFalse(answers.get_answer_index(self.foreign_language).match(self.dog.id, 'hound')[1])
+
+        synonym = Synonym.objects.create(english_word='hound')
+        self.dog.translatable_word.synonyms.add(synonym)
+        self.assertEqual(answers.get_answer_index(self.foreign_language).answers[self.dog.id], ['dog', 'hound'])
+        self.assertTrue(answers.get_answer_index(self.foreign_language).match(self.dog.id, 'hound')[1])
+
+        self.dog.translatable_word.synonyms.remove(synonym)
+        self.assertFalse(answers.get_answer_index(self.foreign_language).match(self.dog.id, 'hound')[1])
+
+    def test_get_answer_index_rebuilt_when_translations_change(self):
+        self.dog.delete()
+        self.assertNotIn(self.dog.id, answers.get_answer_index(self.foreign_language).answers)
+
+    def test_get_answer_index_rebuilt_for_missing_translations(self):
+        # A Translation added where the version stamp did not reach this process
+        answers.get_answer_index(self.foreign_language)
+        with mock.patch('wordtest.signals.bump_answer_index_version'):
+            translation = Translation.objects.create(
+                translatable_word = TranslatableWord.objects.create(english_word='horse'),
+                foreign_language = self.foreign_language,
+                foreign_word = 'ma')
+        self.assertNotIn(translation.id, answers.get_answer_index(self.foreign_language).answers)
+        index = answers.get_answer_index(self.foreign_language, [translation.id])
+        self.assertEqual(index.match(translation.id, 'horses'), ('horse', True, True))
+
+    def test_get_answer_index_not_rebuilt_for_invalid_translations(self):
+        index = answers.get_answer_index(self.foreign_language)
+        with mock.patch.object(answers, 'build_answer_index') as build_answer_index:
+            with self.assertNumQueries(1):
+                self.assertIs(answers.get_answer_index(self.foreign_language, [9999]), index)
+            build_answer_index.assert_not_called()
@@ -0,0 +1,202 @@
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from language.models import ForeignLanguage, TranslatableWord, Translation
+from tracking.management.commands._embeddings import create_embeddings, save_embeddings
+from wordtest import langynet
+from wordtest.batching import BatchPredictor, Overloaded
+import os, shutil, tempfile, threading, time, torch
+
+
+class LangyNetRegistryTest(TestCase):
+    def setUp(self):
+        langynet.clear()
+        self.addCleanup(langynet.clear)
+
+    def test_model_loaded_once(self):
+        model = langynet.get_model()
+        self.assertFalse(model.training)
+        self.assertIs(langynet.get_model(), model)
+
+    def test_model_reloaded_when_file_changes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'model_state_dict.pt')
+        shutil.copy(settings.LANGYNET_STATE_DICT, path)
+
+        with override_settings(LANGYNET_STATE_DICT=path):
+            model = langynet.get_model()
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+            self.assertIsNot(langynet.get_model(), model)
+
+    def test_torchscript_predictions_match(self):
+        x = torch.rand(4, langynet.INPUT_FEATURES)
+        y_hat = langynet.predict(x)
+        langynet.clear()
+        with override_settings(LANGYNET_TORCHSCRIPT=True):
+            self.assertTrue(torch.allclose(langynet.predict(x), y_hat))
+            self.assertIsInstance(langynet.get_model(), torch.jit.ScriptModule)
+
+
+class EmbeddingsTest(TestCase):
+    def setUp(self):
+        langynet.clear()
+        self.addCleanup(langynet.clear)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'embeddings.pt')
+        self.word_to_ix = {'hund': 0, 'katt': 1, 'lernen': 2}
+
+    def test_create_embeddings_deterministic(self):
+        first = create_embeddings(self.word_to_ix)
+        torch.rand(10)
+        second = create_embeddings(self.word_to_ix)
+        self.assertTrue(torch.equal(first.weight, second.weight))
+
+    def test_saved_embeddings_loaded_once(self):
+        embeddings = create_embeddings(self.word_to_ix)
+        save_embeddings(self.path, self.word_to_ix, embeddings)
+
+        with override_settings(LANGYNET_EMBEDDINGS=self.path):
+            word_to_ix, loaded = langynet.get_embeddings()
+            self.assertEqual(word_to_ix, self.word_to_ix)
+            self.assertTrue(torch.equal(loaded.weight, embeddings.weight))
+            self.assertFalse(loaded.weight.requires_grad)
+            self.assertIs(langynet.get_embeddings()[1], loaded)
+
+    def test_saved_embeddings_must_match_vocabulary(self):
+        save_embeddings(self.path, self.word_to_ix, create_embeddings({'hund': 0}))
+        with override_settings(LANGYNET_EMBEDDINGS=self.path):
+            with self.assertRaises(ValueError):
+                langynet.get_embeddings()
+
+
+    def test_translation_added_after_saving(self):
+        embeddings = create_embeddings(self.word_to_ix)
+        save_embeddings(self.path, self.word_to_ix, embeddings)
+
+        with override_settings(LANGYNET_EMBEDDINGS=self.path):
+            version = langynet.model_version()
+            self.assertNotIn('vovve', langynet.get_embeddings()[0])
+
+            Translation.objects.create(
+                translatable_word = TranslatableWord.objects.create(english_word='doggy'),
+                foreign_language = ForeignLanguage.objects.create(
+                    key = 'sv',
+                    english_name = 'Swedish',
+                    foreign_name = 'Svenska',
+                    flag = tempfile.NamedTemporaryFile(suffix='.png').name,
+                    duolingo_learners = 1260000),
+                foreign_word = 'vovve')
+
+            # The new word gets its own embedding, and earlier predictions are stale
+            with self.assertLogs('wordtest.langynet', 'WARNING'):
+                word_to_ix, loaded = langynet.get_embeddings()
+            self.assertEqual(word_to_ix['vovve'], 3)
+            self.assertTrue(torch.equal(loaded.weight[:3], embeddings.weight))
+            self.assertTrue(loaded.weight[3].abs().sum() > 0)
+            self.assertNotEqual(langynet.model_version(), version)
+
+
+class BatchPredictorTest(SimpleTestCase):
+    def test_concurrent_requests_batched(self):
+        batch_sizes = []
+        def predict(x):
+            batch_sizes.append(len(x))
+            return x.sum(dim=1, keepdim=True)
+        predictor = BatchPredictor(predict, max_batch_size=100, max_latency=0.2)
+        self.addCleanup(predictor.stop)
+
+        inputs = [torch.full((i + 1, 3), float(i)) for i in range(8)]
+        results = [None] * len(inputs)
+        def request(i):
+            results[i] = predictor.predict(inputs[i], timeout=5)
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(len(inputs))]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        # Each request gets its own predictions back
+        for x, y_hat in zip(inputs, results):
+            self.assertTrue(torch.equal(y_hat, x.sum(dim=1, keepdim=True)))
+        self.assertLess(len(batch_sizes), len(inputs))
+        metrics = predictor.metrics()
+        self.assertEqual(metrics['requests'], len(inputs))
+        self.assertEqual(metrics['rows'], sum(len(x) for x in inputs))
+        self.assertEqual(metrics['batches'], len(batch_sizes))
+
+    def test_max_batch_size(self):
+        batch_sizes = []
+        def predict(x):
+            batch_sizes.append(len(x))
+            return x
+        predictor = BatchPredictor(predict, max_batch_size=4, max_latency=1)
+        self.addCleanup(predictor.stop)
+        futures = [predictor.submit(torch.zeros(2, 3)) for i in range(4)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertTrue(all(size <= 4 for size in batch_sizes))
+
+    def test_overloaded(self):
+        blocked = threading.Event()
+        def predict(x):
+            blocked.wait(5)
+            return x
+        predictor = BatchPredictor(predict, max_latency=0, max_queue=1)
+        self.addCleanup(predictor.stop)
+        self.addCleanup(blocked.set)
+
+        # The first request runs and blocks, the second waits in the queue
+        first = predictor.submit(torch.zeros(1, 3))
+        while predictor.metrics()['queued']:
+            time.sleep(0.001)
+        predictor.submit(torch.zeros(1, 3))
+        with self.assertRaises(Overloaded):
+            predictor.submit(torch.zeros(1, 3), timeout=0.01)
+        self.assertEqual(predictor.metrics()['rejected'], 1)
+
+    def test_predict_timeout(self):
+        blocked = threading.Event()
+        def predict(x):
+            blocked.wait(5)
+            return x
+        predictor = BatchPredictor(predict, max_latency=0)
+        self.addCleanup(predictor.stop)
+        self.addCleanup(blocked.set)
+        with self.assertRaises(Overloaded):
+            predictor.predict(torch.zeros(1, 3), timeout=0.05)
+
+    def test_stop_with_full_queue(self):
+        blocked = threading.Event()
+        def predict(x):
+            blocked.wait(5)
+            return x
+        predictor = BatchPredictor(predict, max_latency=0, max_queue=1)
+        first = predictor.submit(torch.zeros(1, 3))
+        while predictor.metrics()['queued']:
+            time.sleep(0.001)
+        second = predictor.submit(torch.zeros(1, 3))
+
+        # Stopping does not wait for room in the queue, and the waiting request still runs
+        stopper = threading.Thread(target=predictor.stop)
+        stopper.start()
+        blocked.set()
+        stopper.join(timeout=5)
+        self.assertFalse(stopper.is_alive())
+        self.assertEqual(len(second.result(timeout=0)), 1)
+
+    def test_errors_raised_in_requests(self):
+        def predict(x):
+            raise RuntimeError('broken model')
+        predictor = BatchPredictor(predict)
+        self.addCleanup(predictor.stop)
+        with self.assertRaises(RuntimeError):
+            predictor.predict(torch.zeros(1, 3), timeout=5)
+        self.assertEqual(predictor.metrics()['errors'], 1)
+
+    def test_score_with_batching(self):
+        langynet.clear()
+        self.addCleanup(langynet.clear)
+        x = torch.rand(4, langynet.INPUT_FEATURES)
+        with override_settings(LANGYNET_BATCHING=True):
+            self.assertTrue(torch.allclose(langynet.score(x), langynet.predict(x)))
+            self.assertEqual(langynet.get_batch_predictor().metrics()['batches'], 1)
@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from language.models import Translation
+from tracking.management.commands import _vocabulary
+from tracking.management.commands._embeddings import create_embeddings, save_embeddings
+from tracking.models import CurrentTrace, LangySession
+from tracking.views import track_translations
+from unittest import mock
+from users.models import CustomUser
+from wordtest import langynet, predictions
+from wordtest.management.commands.benchmark_candidate_selection import select_candidates_sorted
+from wordtest.models import Prediction
+from wordtest.tests.test_views import create_learning_traces, set_up_test_data
+from wordtest.views import NUM_WORDS
+import io, os, shutil, tempfile
+import numpy as np
+
+
+# Save embeddings for the test Translations, so predictions do not need the Duolingo vocabulary
+def use_test_embeddings(test_case):
+    directory = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, directory)
+    path = os.path.join(directory, 'embeddings.pt')
+    words = sorted(set(t.readable_word for t in Translation.objects.select_related('foreign_language')))
+    word_to_ix = {word: index for index, word in enumerate(words)}
+    save_embeddings(path, word_to_ix, create_embeddings(word_to_ix))
+
+    settings_override = override_settings(LANGYNET_EMBEDDINGS=path)
+    settings_override.enable()
+    test_case.addCleanup(settings_override.disable)
+    langynet.clear()
+    test_case.addCleanup(langynet.clear)
+
+
+class PredictionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+        create_learning_traces()
+
+    def setUp(self):
+        use_test_embeddings(self)
+        self.user = CustomUser.objects.get(email='superuser@email.com')
+        self.foreign_language = self.user.active_language.foreign_language
+
+    def test_predict_p_trans_command(self):
+        call_command('predict_p_trans', stdout=io.StringIO())
+        self.assertEqual(Prediction.objects.count(), CurrentTrace.objects.count())
+        self.assertEqual(predictions.stale_current_traces().count(), 0)
+        self.assertIsInstance(Prediction.objects.first().p_trans, float)
+
+        # Nothing changed, so nothing is scored again
+        with mock.patch.object(predictions, 'traces_to_candidates') as traces_to_candidates:
+            call_command('predict_p_trans', stdout=io.StringIO())
+            traces_to_candidates.assert_not_called()
+
+    def test_changed_traces_are_stale(self):
+        call_command('predict_p_trans', stdout=io.StringIO())
+        translation = Translation.objects.first()
+        langy_session = LangySession.objects.create(user=self.user, foreign_language=self.foreign_language)
+        track_translations(self.user, langy_session, self.foreign_language, {translation.id: {'seen': 1}})
+
+        stale = list(predictions.stale_current_traces())
+        self.assertEqual([c.translation_id for c in stale], [translation.id])
+        predictions.update_predictions(stale, timezone.now())
+        self.assertEqual(Prediction.objects.get(translation=translation).current_trace.trace.session, langy_session)
+        self.assertEqual(predictions.stale_current_traces().count(), 0)
+
+    def test_model_changes_make_predictions_stale(self):
+        call_command('predict_p_trans', stdout=io.StringIO())
+        self.assertEqual(set(Prediction.objects.values_list('model_version', flat=True)), {langynet.model_version()})
+
+        # New embeddings are saved
+        stat = os.stat(settings.LANGYNET_EMBEDDINGS)
+        os.utime(settings.LANGYNET_EMBEDDINGS, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(predictions.stale_current_traces().count(), CurrentTrace.objects.count())
+        call_command('predict_p_trans', stdout=io.StringIO())
+        self.assertEqual(predictions.stale_current_traces().count(), 0)
+
+    @override_settings(LANGYNET_EMBEDDINGS='missing.pt')
+    def test_vocabulary_changes_make_predictions_stale(self):
+        # Without saved embeddings, word indices depend on the vocabulary
+        with mock.patch.object(langynet, 'vocabulary_version', return_value='a'):
+            version = langynet.model_version()
+        with mock.patch.object(langynet, 'vocabulary_version', return_value='b'):
+            self.assertNotEqual(langynet.model_version(), version)
+
+    @override_settings(LANGYNET_EMBEDDINGS='missing.pt')
+    def test_view_vocabulary_missing(self):
+        self.client.login(email='superuser@email.com', password='pass')
+        test_session = LangySession.objects.create(
+            user = self.user,
+            foreign_language = self.foreign_language,
+            session_type = 'TEST')
+        langynet.clear()
+        with mock.patch.object(_vocabulary, 'duolingo_vocabulary', 'missing.npy'):
+            _vocabulary.bump_vocabulary_version()
+            response = self.client.get(reverse('wordtest:test', args=[test_session.id]))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('vocabulary has not been built', response.context['error_message'])
+
+    def test_view_scores_only_stale_traces(self):
+        call_command('predict_p_trans', stdout=io.StringIO())
+        translation = Translation.objects.first()
+        langy_session = LangySession.objects.create(user=self.user, foreign_language=self.foreign_language)
+        track_translations(self.user, langy_session, self.foreign_language, {translation.id: {'seen': 1}})
+
+        self.client.login(email='superuser@email.com', password='pass')
+        test_session = LangySession.objects.create(
+            user = self.user,
+            foreign_language = self.foreign_language,
+            session_type = 'TEST')
+        with mock.patch.object(
+                predictions, 'traces_to_candidates', wraps=predictions.traces_to_candidates) as traces_to_candidates:
+            response = self.client.get(reverse('wordtest:test', args=[test_session.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(traces_to_candidates.call_args[0][0]), 1)
+        translations = response.context['translations']
+        self.assertEqual(len(translations), NUM_WORDS)
+        self.assertEqual(len(set(t.id for t in translations)), NUM_WORDS)
+
+
+class SelectCandidatesTest(SimpleTestCase):
+    def test_matches_sorted_selection(self):
+        rng = np.random.default_rng(1)
+        for size in [7, 8, 50, 1000]:
+            y_hat = rng.random(size)
+            delta = rng.permutation(size)
+            expected = select_candidates_sorted(y_hat.tolist(), delta.tolist(), 3, 4)
+            self.assertEqual(predictions.select_candidates(y_hat, delta, 3, 4).tolist(), expected)
+
+    def test_low_delta_excludes_low_p_trans(self):
+        # The lowest y_hat are also the lowest delta
+        selected = predictions.select_candidates([0.1, 0.2, 0.9, 0.8], [1, 2, 4, 3], 2, 2)
+        self.assertEqual(selected.tolist(), [0, 1, 3, 2])
+
+    def test_fewer_candidates(self):
+        self.assertEqual(predictions.select_candidates([0.5, 0.1], [1, 2], 3, 4).tolist(), [1, 0])
+        self.assertEqual(predictions.select_candidates([], [], 3, 4).tolist(), [])
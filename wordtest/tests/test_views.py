@@ -1,12 +1,15 @@
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
-from language.models import ForeignLanguage, LearningLanguage, TranslatableWord, Translation
+from language.models import ForeignLanguage, LearningLanguage, Synonym, TranslatableWord, Translation
 from read.models import Author, Book, Page
-from tracking.models import LangySession, LearningTrace
+from tracking.models import CurrentTrace, LangySession, LearningTrace
 from tracking.views import add_learning_traces
 from users.models import CustomUser
-import tempfile
+from wordtest import answers
+import json, tempfile
 
 
 def set_up_test_data():
@@ -155,3 +158,84 @@ class StartTestViewTest(TestCase):
         response = self.client.get(reverse('wordtest:start_test'))
         new_session_count = len(LangySession.objects.all())
         self.assertTrue(new_session_count > initial_session_count)
+
+
+class SubmitAnswersViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        set_up_test_data()
+        create_learning_traces()
+
+    def setUp(self):
+        answers.bump_answer_index_version()
+        login = self.client.login(email='superuser@email.com', password='pass')
+        self.user = CustomUser.objects.get(email='superuser@email.com')
+        self.langy_session = LangySession.objects.create(
+            user = self.user,
+            foreign_language = self.user.active_language.foreign_language,
+            session_type = 'TEST')
+
+    def submit(self, answers):
+        return self.client.post(
+            reverse('wordtest:submit_answers', args=[self.langy_session.id]),
+            data = json.dumps({'answers': answers}),
+            content_type = 'application/json')
+
+    def answer(self, english_word, user_english):
+        translation = Translation.objects.get(translatable_word__english_word=english_word)
+        return {'translation_id': translation.id, 'user_english': user_english}
+
+    def test_submit_answers(self):
+        dog = Translation.objects.get(translatable_word__english_word='dog')
+        synonym = Synonym.objects.create(english_word='hound')
+        dog.translatable_word.synonyms.add(synonym)
+        prev = LearningTrace.objects.get(translation=dog)
+
+        response = self.submit([
+            self.answer('dog', 'Hound'),
+            self.answer('cat', 'cats'),
+            self.answer('rabbit', 'bunny'),
+        ])
+        results = response.json()['results']
+        self.assertEqual([r['correct'] for r in results], [True, True, False])
+        self.assertEqual([r['typo'] for r in results], [False, True, False])
+        self.assertEqual(results[0]['true_english'], 'hound')
+
+        trace = LearningTrace.objects.get(session=self.langy_session, translation=dog)
+        self.assertEqual(trace.prev, prev)
+        self.assertEqual((trace.seen, trace.tested, trace.correct), (prev.seen + 1, prev.tested + 1, prev.correct + 1))
+        rabbit = LearningTrace.objects.get(session=self.langy_session, translation__translatable_word__english_word='rabbit')
+        self.assertEqual(rabbit.correct, rabbit.prev.correct)
+        self.assertEqual(CurrentTrace.objects.get(user=self.user, translation=dog).trace, trace)
+
+    def test_submit_answers_duplicates(self):
+        self.submit([self.answer('dog', 'dog'), self.answer('dog', 'cat')])
+        trace = LearningTrace.objects.get(session=self.langy_session)
+        self.assertEqual((trace.tested - trace.prev.tested, trace.correct - trace.prev.correct), (2, 1))
+
+    def test_submit_answers_unseen_translation(self):
+        LearningTrace.objects.filter(translation__translatable_word__english_word='dog').delete()
+        response = self.submit([self.answer('dog', 'dog')])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(LearningTrace.objects.filter(session=self.langy_session).count(), 0)
+
+    def test_submit_answers_invalid_translation(self):
+        response = self.submit([{'translation_id': 9999, 'user_english': 'dog'}])
+        self.assertEqual(response.status_code, 404)
+
+        # The LangySession is not ended, so the test can still be submitted
+        self.langy_session.refresh_from_db()
+        self.assertIsNone(self.langy_session.end_time)
+
+    def test_submit_answers_query_count(self):
+        words = ['nice', 'sentence', 'dog', 'cat', 'rabbit', 'yellow', 'green', 'blue']
+        query_counts = []
+        answers.get_answer_index(self.langy_session.foreign_language)  # built once per process
+        for num_words in [3, 7]:
+            user_answers = [self.answer(word, 'wrong') for word in words[:num_words-1]]
+            user_answers.append(self.answer(words[num_words-1], words[num_words-1]))
+            with CaptureQueriesContext(connection) as queries:
+                self.submit(user_answers)
+            query_counts.append(len(queries))
+            LearningTrace.objects.filter(session=self.langy_session).delete()
+        self.assertEqual(query_counts[0], query_counts[1])
@@ -1,20 +1,19 @@
+from .answers import get_answer_index
+from .batching import Overloaded
+from .models import Prediction
+from .predictions import select_candidates, stale_current_traces, update_predictions
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
-from language.models import Translation
-from model_data.LangyNet import LangyNet
-from tracking.management.commands.input_csv import get_word_to_ix, words_to_embeds, standardise
-from tracking.models import LangySession, LearningTrace
-import jellyfish, json, torch
-import pandas as pd
-import torch.nn as nn
+from tracking.management.commands._vocabulary import VocabularyMissing
+from tracking.models import LangySession
+from tracking.views import track_translations
+import json
 
 
 NUM_WORDS = 7
-EMBEDDING_DIM = 5
-torch.manual_seed(1)
 
 
 @login_required
@@ -77,83 +76,6 @@ def start_test(request):
     return redirect(reverse('wordtest:test', args=[langy_session_id]))
 
 
-# Use the LangyNet model to predict the probability the user can correctly
-# translate each foreign word in the given list of LearningTraces.
-# Take a list of LearningTraces and return a list of dicts, each including a
-# Translation, delta, and predicted p_trans.
-def traces_to_candidates(learning_traces):
-    # Pick out relevant features and create dataframe
-    input_list = []
-    for t in learning_traces:
-        input_list.append({
-            'frn': t.frn,
-            'delta': t.delta,
-            'seen': t.seen,
-            'interacted': t.interacted,
-            'tested': t.tested,
-            'correct': t.correct
-        })
-    df = pd.DataFrame(input_list)
-
-    # Dictionary mapping unique foreign words to indices
-    word_to_ix = get_word_to_ix()
-
-    # Stores embeddings for all words
-    # Indices from word_to_ix are used to find the embedding for a particular word
-    embeddings = nn.Embedding(len(word_to_ix), EMBEDDING_DIM)
-        
-    # Replace foreign words with embeddings
-    df = words_to_embeds(df, word_to_ix, embeddings)
-
-    # Standardisation for delta and interaction statistics only
-    # Not performed on word embeddings
-    # Using same mean and std as model training data
-    df['delta'] = standardise(
-        df['delta'],
-        series_mean=125209.89669589297,
-        series_std=190899.3729304174)
-    df['seen'] = standardise(
-        df['seen'],
-        series_mean=8.58341078256888,
-        series_std=7.16319377895976)
-    df['interacted'] = standardise(
-        df['interacted'],
-        series_mean=8.58341078256888,
-        series_std=7.16319377895976)
-    df['tested'] = standardise(
-        df['tested'],
-        series_mean=8.58341078256888,
-        series_std=7.16319377895976)
-    df['correct'] = standardise(
-        df['correct'],
-        series_mean=7.769209908777974,
-        series_std=6.4754325307512834)
-
-    # Create feature tensor
-    x = torch.tensor(df.values, dtype=torch.float32)
-
-    # Create and load model
-    model = LangyNet(3, 16)
-    model.load_state_dict(torch.load(
-        'model_data/model_state_dict.pt',
-        map_location=torch.device('cpu')))
-    model.eval()
-
-    # Make prediction for p_trans
-    y_hat = model(x)
-
-    # Prepare return
-    candidates = []
-    for i, t in enumerate(learning_traces):
-        candidates.append({
-            'translation': learning_traces[i].translation,
-            'y_hat': y_hat[i].item(),
-            'delta': learning_traces[i].delta
-        })
-
-    return candidates
-
-
 @login_required
 def test(request, langy_session_id):
     langy_session = get_object_or_404(LangySession, pk=langy_session_id)
@@ -168,23 +90,53 @@ def test(request, langy_session_id):
     foreign_language = request.user.active_language.foreign_language
 
     # Use LearningTrace data to determine which words (Translation objects) to include in a test
-    # Call traces_to_candidates to use the model to make predictions for p_trans
-    candidates = traces_to_candidates(request.user.traces_unique(foreign_language))
-    translations = []  # store Translations to use
+    # Predictions for p_trans are made in batches ahead of time, see the predict_p_trans command
+    # Only words seen since their last Prediction are scored now
+    predicted_at = timezone.now()
+    current_traces = request.user.current_traces.filter(translation__foreign_language = foreign_language)
+    try:
+        candidates = update_predictions(list(stale_current_traces(current_traces)), predicted_at)
+    except Overloaded:
+        context = {
+            'num_words': NUM_WORDS,
+            'error_message': 'Langy is busy right now. Please try again in a moment.',
+        }
+        return render(request, 'wordtest/info.html', context, status=503)
+    except VocabularyMissing:
+        # Deployment is missing its build_vocabulary or build_embeddings step
+        context = {
+            'num_words': NUM_WORDS,
+            'error_message': 'Word tests are not available yet, as the word test vocabulary has not been built.',
+        }
+        return render(request, 'wordtest/info.html', context, status=503)
+
+    # Add the weakest and most recently seen words from earlier Predictions
+    # Enough for either half of the test, whatever the other half takes
+    saved = (Prediction.objects
+        .filter(user = request.user)
+        .filter(translation__foreign_language = foreign_language)
+        .filter(predicted_at__lt = predicted_at)
+        .select_related('translation__translatable_word', 'translation__foreign_language'))
+    saved_candidates = {}
+    for prediction in list(saved.order_by('p_trans')[:NUM_WORDS]) + list(saved.order_by('delta')[:NUM_WORDS]):
+        saved_candidates[prediction.id] = {
+            'translation': prediction.translation,
+            'y_hat': prediction.p_trans,
+            'delta': prediction.delta,
+        }
+    candidates += saved_candidates.values()
 
     # Prepare a total of NUM_WORDS Translations to test the user on
-
     # First half: test on words with a low predicted p_trans
-    num_low_p_trans = NUM_WORDS // 2
-    candidates = sorted(candidates, key=lambda c: c['y_hat'])
-    for i in range(num_low_p_trans):
-        translations.append(candidates.pop(0)['translation'])
-
     # Second half: test on words recently seen
+    num_low_p_trans = NUM_WORDS // 2
     num_low_delta = NUM_WORDS - num_low_p_trans
-    candidates = sorted(candidates, key=lambda c: c['delta'])
-    for i in range(num_low_delta):
-        translations.append(candidates.pop(0)['translation'])
+    selected = select_candidates(
+        [c['y_hat'] for c in candidates],
+        [c['delta'] for c in candidates],
+        num_low_p_trans,
+        num_low_delta)
+    translations = [candidates[i]['translation'] for i in selected]
 
     context = {
         'langy_session': langy_session,
@@ -196,10 +148,8 @@ def test(request, langy_session_id):
 @login_required
 def submit_answers(request, langy_session_id):
     if request.method == 'POST':
-        # Get, update and save LangySession
+        # Get LangySession
         langy_session = get_object_or_404(LangySession, pk=langy_session_id)
-        langy_session.end_time = timezone.now()
-        langy_session.save()
 
         # Get data from the request
         json_data = json.loads(request.body)
@@ -207,42 +157,25 @@ def submit_answers(request, langy_session_id):
         if (len(answers)==0):
             return HttpResponseBadRequest('No answers received in request')
         
+        # Acceptable answers for every Translation in the language, built once per process
+        translation_ids = [int(answer['translation_id']) for answer in answers]
+        answer_index = get_answer_index(langy_session.foreign_language, translation_ids)
+        if any(translation_id not in answer_index.answers for translation_id in translation_ids):
+            raise Http404('No Translation matches the given query.')
+
+        # Update and save LangySession, now the answers are known to be valid
+        langy_session.end_time = timezone.now()
+        langy_session.save()
+
         # Prepare to create a response with results and create new LearningTraces
         response_results = []
+        translation_ids_counts = {}
         for answer in answers:
-            translation = get_object_or_404(Translation, pk=answer['translation_id'])
-
-            # Get user answer, ignore capitalisation
-            user_english = answer['user_english'].lower()
-
-            # Get correct answer(s)
-            true_english = translation.translatable_word.english_word.lower()
-            synonyms = [syn.english_word for syn in translation.translatable_word.synonyms.all()]
-            if len(synonyms) != 0:
-                # Find the closest word to the user's input
-                max_sim = jellyfish.jaro_winkler_similarity(user_english, true_english)
-                for syn in synonyms:
-                    sim = jellyfish.jaro_winkler_similarity(user_english, syn)
-                    if sim > max_sim:
-                        max_sim = sim
-                        true_english = syn
-
-            # Evaluate user answer
-            correct = user_english == true_english
-            typo = False
-
-            # Typos: plurals
-            # Allow missing or additional 's'
-            # Some foreign words e.g. Swedish "djur" (animal/animals) are the same for singular/plural
-            if (user_english == true_english+'s' or user_english+'s' == true_english):
-                correct = True
-                typo = True
-            
-            # Typos: typing error tolerance
-            # Allow one accidental character insertion, deletion, substitution or transposition
-            if jellyfish.damerau_levenshtein_distance(user_english, true_english) == 1:
-                correct = True
-                typo = True
+            translation_id = int(answer['translation_id'])
+
+            # Evaluate user answer against the closest acceptable answer, ignoring capitalisation
+            # Plurals and single typing errors are accepted as typos
+            true_english, correct, typo = answer_index.match(translation_id, answer['user_english'])
 
             # Add result to list for response
             response_results.append({
@@ -252,27 +185,22 @@ def submit_answers(request, langy_session_id):
                 'typo': typo,
             })
 
-            # Prepare to create a new LearningTrace
-            # Find previous LearningTrace object for this Translation
-            prev = (request.user.traces
-                .filter(translation=translation)
-                .filter(translation__foreign_language = request.user.active_language.foreign_language)
-                .last())
-            if prev is None:
-                continue  # next answer
-
-            LearningTrace.objects.create(
-                session = langy_session,
-                user = request.user,
-                # Tracing
-                translation = translation,
-                prev = prev,
-                # Statistics
-                seen = prev.seen + 1,
-                interacted = prev.interacted,
-                tested = prev.tested + 1,
-                correct = prev.correct + 1 if correct else prev.correct,
-            )
+            # Count statistics for the new LearningTrace
+            # A Translation answered more than once has one LearningTrace per LangySession
+            counts = translation_ids_counts.setdefault(translation_id, {'seen': 0, 'tested': 0})
+            counts['seen'] += 1
+            counts['tested'] += 1
+            if correct:
+                counts['correct'] = counts.get('correct', 0) + 1
+
+        # Create new LearningTraces from the previous ones, in one transaction
+        # Translations the user has never seen before are not tracked
+        track_translations(
+            request.user,
+            langy_session,
+            request.user.active_language.foreign_language,
+            translation_ids_counts,
+            require_previous=True)
 
         return JsonResponse({
             'results': response_results